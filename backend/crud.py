@@ -1,8 +1,27 @@
 from datetime import datetime
+from typing import Any, Dict, List, Optional
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from backend import models, schemas
+from backend import models, pagination, schemas
+
+# Keyset order of the list endpoints (see backend/pagination.py)
+PATIENT_KEY = (models.Patient.created_at, models.Patient.id)
+CONSULTATION_KEY = (models.Consultation.started_at, models.Consultation.id)
+
+
+def _save(db: Session, obj, commit: bool):
+    """
+    Commit and refresh obj, or (commit=False) leave it pending for the
+    caller's unit of work: one flush and one commit for the whole workflow.
+    Ids are assigned up front, so pending rows can already reference each other.
+    """
+    if commit:
+        db.commit()
+        db.refresh(obj)
+    return obj
+
 
 # ============================================================
 # Patient CRUD
@@ -17,12 +36,38 @@ def get_patient_by_email(db: Session, email: str):
     return db.query(models.Patient).filter(models.Patient.email == email).first()
 
 
-def get_patients(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Patient).offset(skip).limit(limit).all()
+def patient_filters(since=None, until=None, risk_level=None) -> list:
+    """WHERE clauses for get_patients / count_patients."""
+    filters = []
+    if since is not None:
+        filters.append(models.Patient.created_at >= since)
+    if until is not None:
+        filters.append(models.Patient.created_at < until)
+    if risk_level is not None:
+        # Patients with at least one assessment at this level
+        filters.append(
+            models.Patient.consultations.any(
+                models.Consultation.assessments.any(models.HealthAssessment.overall_risk_level == risk_level)
+            )
+        )
+    return filters
+
+
+def get_patients(db: Session, limit: int = 100, after=None, filters=(), skip: int = 0):
+    """Patients in (created_at, id) order, starting after the after key (or skipping skip rows)."""
+    query = db.query(models.Patient).filter(*filters)
+    if after is not None:
+        query = query.filter(pagination.after(PATIENT_KEY, after))
+    return query.order_by(*PATIENT_KEY).offset(skip).limit(limit).all()
+
 
+def count_patients(db: Session, filters=()) -> int:
+    return db.query(func.count(models.Patient.id)).filter(*filters).scalar()
 
-def create_patient(db: Session, patient: schemas.PatientCreate):
+
+def create_patient(db: Session, patient: schemas.PatientCreate, commit: bool = True):
     db_patient = models.Patient(
+        id=models.new_id(),
         name=patient.name,
         medical_record_number=patient.medical_record_number,
         age=patient.age,
@@ -31,9 +76,7 @@ def create_patient(db: Session, patient: schemas.PatientCreate):
         phone=patient.phone,
     )
     db.add(db_patient)
-    db.commit()
-    db.refresh(db_patient)
-    return db_patient
+    return _save(db, db_patient, commit)
 
 
 # ============================================================
@@ -41,12 +84,10 @@ def create_patient(db: Session, patient: schemas.PatientCreate):
 # ============================================================
 
 
-def create_medical_record(db: Session, record: schemas.MedicalRecordCreate):
-    db_record = models.MedicalRecord(**record.model_dump())
+def create_medical_record(db: Session, record: schemas.MedicalRecordCreate, commit: bool = True):
+    db_record = models.MedicalRecord(id=models.new_id(), **record.model_dump())
     db.add(db_record)
-    db.commit()
-    db.refresh(db_record)
-    return db_record
+    return _save(db, db_record, commit)
 
 
 def get_patient_medical_records(db: Session, patient_id: str):
@@ -72,12 +113,12 @@ def get_latest_medical_record(db: Session, patient_id: str):
 # ============================================================
 
 
-def create_consultation(db: Session, consultation: schemas.ConsultationCreate):
-    db_consultation = models.Consultation(patient_id=consultation.patient_id, role=consultation.role)
+def create_consultation(db: Session, consultation: schemas.ConsultationCreate, commit: bool = True):
+    db_consultation = models.Consultation(
+        id=models.new_id(), patient_id=consultation.patient_id, role=consultation.role
+    )
     db.add(db_consultation)
-    db.commit()
-    db.refresh(db_consultation)
-    return db_consultation
+    return _save(db, db_consultation, commit)
 
 
 def get_consultation(db: Session, consultation_id: str):
@@ -89,6 +130,15 @@ def update_consultation(db: Session, consultation_id: str, update: schemas.Consu
     if db_consultation is None:
         return None
 
+    apply_consultation_update(db_consultation, update)
+
+    db.commit()
+    db.refresh(db_consultation)
+    return db_consultation
+
+
+def apply_consultation_update(db_consultation: models.Consultation, update: schemas.ConsultationUpdate):
+    """Apply update to a loaded (or still pending) consultation without touching the database."""
     update_data = update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_consultation, key, value)
@@ -97,8 +147,6 @@ def update_consultation(db: Session, consultation_id: str, update: schemas.Consu
     if update.stage == "report" and db_consultation.completed_at is None:
         db_consultation.completed_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(db_consultation)
     return db_consultation
 
 
@@ -111,8 +159,32 @@ def get_patient_consultations(db: Session, patient_id: str):
     )
 
 
-def get_consultations(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Consultation).offset(skip).limit(limit).all()
+def consultation_filters(stage=None, role=None, since=None, until=None, risk_level=None) -> list:
+    """WHERE clauses for get_consultations / count_consultations."""
+    filters = []
+    if stage is not None:
+        filters.append(models.Consultation.stage == stage)
+    if role is not None:
+        filters.append(models.Consultation.role == role)
+    if since is not None:
+        filters.append(models.Consultation.started_at >= since)
+    if until is not None:
+        filters.append(models.Consultation.started_at < until)
+    if risk_level is not None:
+        filters.append(models.Consultation.assessments.any(models.HealthAssessment.overall_risk_level == risk_level))
+    return filters
+
+
+def get_consultations(db: Session, limit: int = 100, after=None, filters=(), skip: int = 0):
+    """Consultations in (started_at, id) order, starting after the after key (or skipping skip rows)."""
+    query = db.query(models.Consultation).filter(*filters)
+    if after is not None:
+        query = query.filter(pagination.after(CONSULTATION_KEY, after))
+    return query.order_by(*CONSULTATION_KEY).offset(skip).limit(limit).all()
+
+
+def count_consultations(db: Session, filters=()) -> int:
+    return db.query(func.count(models.Consultation.id)).filter(*filters).scalar()
 
 
 # ============================================================
@@ -120,12 +192,53 @@ def get_consultations(db: Session, skip: int = 0, limit: int = 100):
 # ============================================================
 
 
-def create_health_assessment(db: Session, assessment: schemas.HealthAssessmentCreate):
-    db_assessment = models.HealthAssessment(**assessment.model_dump())
+def risk_timeseries_rows(individual_risks: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    patient_risk_timeseries values (disease, score, level) of an
+    individual_risks list; a repeated disease keeps its last score.
+    """
+    rows = {}
+    for risk in individual_risks or []:
+        disease = risk.get("disease") or "Unknown"
+        rows[disease] = {
+            "disease": disease,
+            "score": float(risk.get("risk_score") or 0),
+            "level": risk.get("risk_level"),
+        }
+    return list(rows.values())
+
+
+def create_health_assessment(
+    db: Session, assessment: schemas.HealthAssessmentCreate, commit: bool = True, patient_id: Optional[str] = None
+):
+    """
+    Stage the assessment and its patient_risk_timeseries rows. The database
+    time is read once and stamped on both, so they agree on assessed_at.
+    Pass patient_id when the consultation may still be pending (unit of
+    work); otherwise it is looked up. Returns None when the consultation
+    does not exist.
+    """
+    # No autoflush: rows staged by the caller's unit of work stay pending until its commit
+    with db.no_autoflush:
+        if patient_id is None:
+            row = db.execute(
+                select(func.now(), models.Consultation.patient_id).where(
+                    models.Consultation.id == assessment.consultation_id
+                )
+            ).first()
+            if row is None:
+                return None
+            assessed_at, patient_id = row
+        else:
+            assessed_at = db.execute(select(func.now())).scalar()
+
+    db_assessment = models.HealthAssessment(id=models.new_id(), assessed_at=assessed_at, **assessment.model_dump())
+    db_assessment.risk_timeseries = [
+        models.PatientRiskTimeseries(patient_id=patient_id, assessed_at=assessed_at, **values)
+        for values in risk_timeseries_rows(assessment.individual_risks)
+    ]
     db.add(db_assessment)
-    db.commit()
-    db.refresh(db_assessment)
-    return db_assessment
+    return _save(db, db_assessment, commit)
 
 
 def get_consultation_assessments(db: Session, consultation_id: str):
@@ -146,9 +259,7 @@ def get_assessment(db: Session, assessment_id: str):
 # ============================================================
 
 
-def create_audit_log(db: Session, log: schemas.AuditLogCreate):
-    db_log = models.AuditLog(**log.model_dump())
+def create_audit_log(db: Session, log: schemas.AuditLogCreate, commit: bool = True):
+    db_log = models.AuditLog(id=models.new_id(), **log.model_dump())
     db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
-    return db_log
+    return _save(db, db_log, commit)
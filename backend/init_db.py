@@ -1,18 +1,18 @@
 """
 Database initialization script.
-Creates all tables in PostgreSQL database.
+Creates all tables in PostgreSQL database by applying every pending
+schema migration (see backend/migrations).
 """
 
-from backend.database import Base, engine
-from backend.models import Consultation  # noqa: F401
-from backend.models import AuditLog, HealthAssessment, MedicalRecord, Patient  # noqa: F401
+from backend.database import engine
+from backend.migrations import upgrade
 
 
 def init_db():
     """Create all database tables"""
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("[SUCCESS] Database tables created successfully!")
+    applied = upgrade(engine)
+    print(f"[SUCCESS] Database schema up to date ({len(applied)} migration(s) applied)")
 
 
 if __name__ == "__main__":
@@ -1,20 +1,39 @@
-from typing import List
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 import uvicorn
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from starlette.responses import Response, StreamingResponse
 
 from backend import crud, models, schemas  # noqa: F401
-from backend.database import Base, engine, get_db
-from backend.routers import analytics, chat
+from backend.database import engine, get_db, pool_status
+from backend.migrations import ensure_schema
+from backend.pagination import (
+    DEPRECATION_HEADER,
+    NEXT_CURSOR_HEADER,
+    TOTAL_COUNT_HEADER,
+    InvalidCursor,
+    decode_time_cursor,
+    next_page,
+)
+from backend.routers import analytics, chat, export
 from backend.services import HealthAnalysisService
-from backend.utils.pdf_generator import PDFReportGenerator
-from src.agents.heart_agent import generate_shap_plot
+from src.coordinator.agent_pool import AgentTimeoutError
+from src.core.circuit_breaker import get_default_router
+from src.core.clinical_rules import get_rule_store
+from src.core.llm_cache import get_default_cache
+from src.models.model_loader import ModelUnavailableError, get_model_registry
+
+# Check the schema version (refuses to start behind the code; DB_AUTO_MIGRATE=1 upgrades instead)
+ensure_schema(engine)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Load models at import so a forking server (gunicorn --preload) shares them with its workers
+if os.getenv("MODEL_PRELOAD", "").lower() in ("1", "true", "yes"):
+    get_model_registry().preload()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -28,6 +47,7 @@ app = FastAPI(
 # Include Routers
 app.include_router(analytics.router)
 app.include_router(chat.router)
+app.include_router(export.router)
 
 # CORS middleware
 app.add_middleware(
@@ -36,6 +56,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers only let scripts read custom response headers listed here
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, DEPRECATION_HEADER, export.WATERMARK_HEADER],
 )
 
 
@@ -58,6 +80,47 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/llm-cache", tags=["Health"])
+def llm_cache_stats():
+    """LLM response cache hit/miss counters"""
+    cache = get_default_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/health/llm-models", tags=["Health"])
+def llm_model_health():
+    """Circuit-breaker state, success rate and latency per LLM model"""
+    return get_default_router().snapshot()
+
+
+@app.get("/health/shap-plot-cache", tags=["Health"])
+def shap_plot_cache_stats():
+    """Rendered SHAP plot cache size and hit/miss counters"""
+    from src.models.explainers import plot_cache_stats
+
+    return plot_cache_stats()
+
+
+@app.get("/health/models", tags=["Health"])
+def model_health():
+    """Load status per disease model; missing models disable their agent"""
+    return get_model_registry().status()
+
+
+@app.get("/health/db-pool", tags=["Health"])
+def db_pool_health():
+    """Connection pool utilization and checkout wait times"""
+    return pool_status()
+
+
+@app.get("/health/rules", tags=["Health"])
+def rules_health():
+    """Active clinical rule file version (hot-reloaded when the file changes)"""
+    return get_rule_store().status()
+
+
 # ============================================================
 # Patient Endpoints
 # ============================================================
@@ -87,11 +150,51 @@ def get_patient(patient_id: str, db: Session = Depends(get_db)):
     return db_patient
 
 
+def _cursor_key(cursor: Optional[str]):
+    """(timestamp, id) key of a list cursor; 400 when it is malformed."""
+    if not cursor:
+        return None
+    try:
+        return decode_time_cursor(cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _page_start(cursor: Optional[str], skip: Optional[int], response: Response):
+    """
+    (after key, offset) of a list page. skip is the old offset paging, kept
+    for existing clients: it still works but is flagged as deprecated.
+    """
+    if skip is None:
+        return _cursor_key(cursor), 0
+    if cursor:
+        raise HTTPException(status_code=400, detail="Pass either cursor or skip, not both")
+    response.headers[DEPRECATION_HEADER] = "true"
+    return None, skip
+
+
+SKIP_QUERY = Query(None, ge=0, deprecated=True, description="Deprecated offset paging; use cursor")
+
+
 @app.get("/api/patients", response_model=List[schemas.PatientResponse], tags=["Patients"])
-def list_patients(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all patients"""
-    patients = crud.get_patients(db, skip=skip, limit=limit)
-    return patients
+def list_patients(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    since: Optional[datetime] = Query(None, description="Only patients created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only patients created before this time"),
+    risk_level: Optional[str] = Query(None, description="Only patients with an assessment at this level"),
+    include_total: bool = Query(False, description="Send X-Total-Count (counts every matching row)"),
+    skip: Optional[int] = SKIP_QUERY,
+    db: Session = Depends(get_db),
+):
+    """List patients, oldest first, one keyset page at a time"""
+    filters = crud.patient_filters(since=since, until=until, risk_level=risk_level)
+    after, offset = _page_start(cursor, skip, response)
+    patients = crud.get_patients(db, limit=limit + 1, after=after, filters=filters, skip=offset)
+    if include_total:
+        response.headers[TOTAL_COUNT_HEADER] = str(crud.count_patients(db, filters))
+    return next_page(patients, limit, lambda patient: (patient.created_at, patient.id), response)
 
 
 # ============================================================
@@ -171,9 +274,26 @@ def update_consultation(
     response_model=List[schemas.ConsultationResponse],
     tags=["Consultations"],
 )
-def list_consultations(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all consultations"""
-    return crud.get_consultations(db, skip=skip, limit=limit)
+def list_consultations(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    stage: Optional[str] = Query(None, description="intro, consultation, medical_form or report"),
+    role: Optional[str] = Query(None, description="Doctor or Patient"),
+    since: Optional[datetime] = Query(None, description="Only consultations started at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only consultations started before this time"),
+    risk_level: Optional[str] = Query(None, description="Only consultations with an assessment at this level"),
+    include_total: bool = Query(False, description="Send X-Total-Count (counts every matching row)"),
+    skip: Optional[int] = SKIP_QUERY,
+    db: Session = Depends(get_db),
+):
+    """List consultations, oldest first, one keyset page at a time"""
+    filters = crud.consultation_filters(stage=stage, role=role, since=since, until=until, risk_level=risk_level)
+    after, offset = _page_start(cursor, skip, response)
+    consultations = crud.get_consultations(db, limit=limit + 1, after=after, filters=filters, skip=offset)
+    if include_total:
+        response.headers[TOTAL_COUNT_HEADER] = str(crud.count_consultations(db, filters))
+    return next_page(consultations, limit, lambda consultation: (consultation.started_at, consultation.id), response)
 
 
 # ============================================================
@@ -189,7 +309,10 @@ def list_consultations(skip: int = 0, limit: int = 100, db: Session = Depends(ge
 )
 def create_assessment(assessment: schemas.HealthAssessmentCreate, db: Session = Depends(get_db)):
     """Create a new health assessment"""
-    return crud.create_health_assessment(db=db, assessment=assessment)
+    db_assessment = crud.create_health_assessment(db=db, assessment=assessment)
+    if db_assessment is None:
+        raise HTTPException(status_code=404, detail="Consultation not found")
+    return db_assessment
 
 
 @app.get(
@@ -218,9 +341,31 @@ async def analyze_health(request: schemas.AnalyzeHealthRequest, db: Session = De
     5. Generate LLM reports
     6. Store assessment
     7. Return complete results
+
+    Returns 503 when every routed risk model timed out (nothing is stored).
     """
     service = HealthAnalysisService(db)
-    return await service.analyze_health(request)
+    try:
+        return await service.analyze_health(request)
+    except AgentTimeoutError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@app.post("/api/analyze/batch", response_model=schemas.BatchAnalyzeResponse, tags=["Analysis"])
+def analyze_health_batch(request: schemas.BatchAnalyzeRequest):
+    """
+    Vectorized risk scoring for a roster of patients.
+    Returns one ML risk report per patient, in request order.
+    Nothing is persisted and no LLM reports are generated.
+    """
+    from src.core.clinical_ranges import ClinicalRangeError
+
+    try:
+        return HealthAnalysisService.analyze_batch(request)
+    except ClinicalRangeError as e:
+        raise HTTPException(status_code=422, detail=e.failures)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 
 # ============================================================
@@ -232,6 +377,8 @@ async def analyze_health(request: schemas.AnalyzeHealthRequest, db: Session = De
 def generate_pdf(data: schemas.AnalyzeHealthResponse):
     """Generate a PDF report from analysis results"""
     # model_dump() for Pydantic v2, dict() for v1. Using dict() for safety as schemas use v1 style config
+    from backend.utils.pdf_generator import PDFReportGenerator  # reportlab is imported on demand
+
     data_dict = data.dict()
     pdf_buffer = PDFReportGenerator.generate_report(data_dict)
     return StreamingResponse(
@@ -241,14 +388,66 @@ def generate_pdf(data: schemas.AnalyzeHealthResponse):
     )
 
 
-@app.post("/api/explain/heart", tags=["Utilities"])
-def explain_heart_risk(patient_data: dict):
-    """Generate SHAP plot for heart disease prediction"""
-    img_str = generate_shap_plot(patient_data)
-    if img_str:
-        return Response(content=img_str, media_type="text/plain")
-    else:
-        raise HTTPException(status_code=500, detail="Could not generate SHAP plot")
+EXPLAINABLE_DISEASES = ("heart", "diabetes", "kidney", "liver", "stroke")
+
+
+def _check_explainable(disease: str):
+    if disease not in EXPLAINABLE_DISEASES:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown disease '{disease}'. Expected one of {EXPLAINABLE_DISEASES}"
+        )
+
+
+@contextmanager
+def _explanation_errors():
+    """Map explainer failures to HTTP errors: 503 for a missing model, 422 for bad patient values."""
+    from src.core.clinical_ranges import ClinicalRangeError
+
+    try:
+        yield
+    except ModelUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ClinicalRangeError as e:
+        raise HTTPException(status_code=422, detail=e.failures)
+    except (ValueError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid patient data: {e}")
+
+
+@app.post("/api/explain/{disease}", tags=["Utilities"])
+def explain_disease_risk(
+    disease: str,
+    patient: Dict[str, Any],
+    response_format: str = Query("png", alias="format", pattern="^(png|json)$"),
+    top_k: int = Query(10, ge=1, le=50),
+):
+    """
+    SHAP explanation of one patient for one of the disease models (heart, diabetes, kidney, liver, stroke).
+
+    - format=png (default): base64 PNG bar chart (served from a bounded cache)
+    - format=json: the top_k SHAP contributions, in risk-score points
+    """
+    _check_explainable(disease)
+
+    # shap/matplotlib are imported on demand
+    from src.coordinator import attribution_engine
+
+    with _explanation_errors():
+        if response_format == "json":
+            return attribution_engine.explain_batch(disease, [patient], top_k)[0]
+        img_str = attribution_engine.generate_plot(disease, patient)
+    return Response(content=img_str, media_type="text/plain")
+
+
+@app.post("/api/explain/{disease}/batch", response_model=schemas.ExplainBatchResponse, tags=["Utilities"])
+def explain_disease_risk_batch(disease: str, request: schemas.ExplainBatchRequest):
+    """Top-k SHAP feature attributions for every patient, in request order, from one explainer call"""
+    _check_explainable(disease)
+
+    from src.coordinator import attribution_engine
+
+    with _explanation_errors():
+        explanations = attribution_engine.explain_batch(disease, request.patients, request.top_k)
+    return schemas.ExplainBatchResponse(explanations=explanations)
 
 
 # ============================================================
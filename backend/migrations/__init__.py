@@ -0,0 +1,222 @@
+"""
+Versioned schema migrations.
+
+Each module in backend/migrations/versions is one migration, named
+v<NNNN>_<description>.py, with an upgrade(ctx) function. Applied versions
+are recorded in the schema_migrations table, so every migration runs once
+per database, in version order:
+
+    python -m backend.migrations status
+    python -m backend.migrations upgrade [--to N]
+
+A migration runs in one transaction unless it sets TRANSACTIONAL = False.
+Non-transactional migrations run on an autocommit connection. Use that mode
+to create indexes concurrently (PostgreSQL cannot do that inside a
+transaction) and to backfill large tables in short batches, each committed
+on its own, so no lock is held for the whole table. These migrations may
+stop part-way, so their steps must be safe to re-run; the MigrationContext
+helpers are.
+
+Each migration freezes its own DDL and data logic instead of importing
+backend.models or backend.crud, so what it does never changes after it
+ships.
+
+At startup, ensure_schema() only reads schema_migrations (no metadata
+reflection) and refuses to start while migrations are pending: run the
+upgrade once, as a deploy step, not in every worker. A backfill would
+otherwise run at each worker start, with the other workers waiting on the
+lock. DB_AUTO_MIGRATE=1 applies pending migrations at startup instead,
+for development and tests. On PostgreSQL, concurrent upgrades are
+serialized with an advisory lock.
+"""
+
+import importlib
+import logging
+import os
+import pkgutil
+import re
+from contextlib import contextmanager
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PACKAGE = "backend.migrations.versions"
+VERSION_PATTERN = re.compile(r"^v(\d{4})_\w+$")
+# pg_advisory_lock key serializing concurrent upgrades
+ADVISORY_LOCK_KEY = 4_810_327_011
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[["MigrationContext"], None]
+    transactional: bool = True
+
+
+class MigrationContext:
+    """DDL and batching helpers handed to upgrade(); every helper is safe to re-run."""
+
+    def __init__(self, connection, transactional: bool = True):
+        self.connection = connection
+        self.transactional = transactional
+        self.dialect = connection.dialect.name
+
+    def execute(self, sql: str, **params):
+        return self.connection.execute(text(sql), params)
+
+    def has_table(self, table: str) -> bool:
+        return inspect(self.connection).has_table(table)
+
+    def has_column(self, table: str, column: str) -> bool:
+        return any(c["name"] == column for c in inspect(self.connection).get_columns(table))
+
+    def add_column(self, table: str, column: str, ddl: str) -> bool:
+        """ALTER TABLE ... ADD COLUMN unless it exists; returns True when added."""
+        if self.has_column(table, column):
+            return False
+        self.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+        return True
+
+    def create_index(self, name: str, table: str, columns: Sequence[str], unique: bool = False):
+        """
+        CREATE INDEX IF NOT EXISTS; CONCURRENTLY on PostgreSQL when the
+        migration is non-transactional, so writes continue while it builds.
+        An invalid index left by an interrupted concurrent build is rebuilt.
+        """
+        concurrently = self.dialect == "postgresql" and not self.transactional
+        if concurrently:
+            invalid = self.execute(
+                "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid"
+                " WHERE c.relname = :name AND NOT i.indisvalid",
+                name=name,
+            ).first()
+            if invalid:
+                self.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+        self.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {'CONCURRENTLY ' if concurrently else ''}"
+            f"IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+        )
+
+    def backfill(self, table: str, assignments: str, where: str, batch_size: int = 1000, key: str = "id") -> int:
+        """
+        UPDATE table SET assignments WHERE where, batch_size rows per
+        statement until no row matches (the assignments must make where
+        false). Each batch commits on its own in a non-transactional
+        migration. Returns the number of rows updated.
+        """
+        total = 0
+        while True:
+            updated = self.execute(
+                f"UPDATE {table} SET {assignments} WHERE {key} IN"
+                f" (SELECT {key} FROM {table} WHERE {where} LIMIT :batch_size)",
+                batch_size=batch_size,
+            ).rowcount
+            total += updated
+            if updated < batch_size:
+                return total
+
+
+def load_migrations() -> List[Migration]:
+    """Every migration module in backend/migrations/versions, by version."""
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    migrations = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        match = VERSION_PATTERN.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{MIGRATIONS_PACKAGE}.{module_info.name}")
+        migrations.append(
+            Migration(
+                version=int(match.group(1)),
+                name=module_info.name,
+                upgrade=module.upgrade,
+                transactional=getattr(module, "TRANSACTIONAL", True),
+            )
+        )
+
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions in {MIGRATIONS_PACKAGE}: {versions}")
+    return migrations
+
+
+def applied_versions(bind) -> set:
+    """Versions recorded in schema_migrations (empty on a new database)."""
+    with bind.connect() as conn:
+        if not inspect(conn).has_table(schema_migrations.name):
+            return set()
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending_migrations(bind) -> List[Migration]:
+    applied = applied_versions(bind)
+    return [m for m in load_migrations() if m.version not in applied]
+
+
+@contextmanager
+def _upgrade_lock(bind):
+    if bind.dialect.name != "postgresql":
+        yield
+        return
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+
+
+def _apply(bind, migration: Migration):
+    logger.info("Applying migration %s", migration.name)
+    if migration.transactional:
+        with bind.begin() as conn:
+            migration.upgrade(MigrationContext(conn))
+            conn.execute(schema_migrations.insert().values(version=migration.version, name=migration.name))
+    else:
+        with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            migration.upgrade(MigrationContext(conn, transactional=False))
+            conn.execute(schema_migrations.insert().values(version=migration.version, name=migration.name))
+
+
+def upgrade(bind, target: Optional[int] = None) -> List[str]:
+    """Apply pending migrations up to target (default: all); returns their names."""
+    with _upgrade_lock(bind):
+        with bind.begin() as conn:
+            schema_migrations.create(conn, checkfirst=True)
+
+        # Re-read under the lock: another process may have just upgraded
+        applied = []
+        for migration in pending_migrations(bind):
+            if target is not None and migration.version > target:
+                break
+            _apply(bind, migration)
+            applied.append(migration.name)
+    return applied
+
+
+def ensure_schema(bind) -> List[str]:
+    """
+    Startup check: raise when the database is behind the code, or apply the
+    pending migrations when DB_AUTO_MIGRATE is on (default off).
+    """
+    pending = pending_migrations(bind)
+    if not pending:
+        return []
+    if os.getenv("DB_AUTO_MIGRATE", "0").lower() in ("1", "true", "yes"):
+        return upgrade(bind)
+    raise RuntimeError(
+        f"Database schema is missing migrations {[m.name for m in pending]};"
+        " run `python -m backend.migrations upgrade`"
+    )
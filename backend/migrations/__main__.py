@@ -0,0 +1,39 @@
+"""
+Schema migration CLI.
+
+Usage:
+    python -m backend.migrations status
+    python -m backend.migrations upgrade [--to VERSION]
+"""
+
+import argparse
+import logging
+import sys
+
+from backend.database import engine
+from backend.migrations import applied_versions, load_migrations, upgrade
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.migrations", description="Versioned schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="list migrations and whether they are applied")
+    upgrade_parser = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade_parser.add_argument("--to", type=int, help="stop after this version")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+
+    if args.command == "status":
+        applied = applied_versions(engine)
+        for migration in load_migrations():
+            print(f"  [{'x' if migration.version in applied else ' '}] {migration.name}")
+    else:
+        names = upgrade(engine, target=args.to)
+        print(f"Applied {len(names)} migration(s)" + (f": {', '.join(names)}" if names else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
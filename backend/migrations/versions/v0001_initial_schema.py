@@ -0,0 +1,98 @@
+"""
+Create the core tables: patients, consultations, medical_records,
+health_assessments and audit_logs.
+
+The DDL is frozen here as the schema stood before v0002, independent of
+backend/models.py: later migrations add the patient identification columns
+and the indexes. Tables that already exist are left alone, so databases
+created by the old create_all-at-startup code are adopted as they are;
+v0002 onwards then bring them up to date.
+"""
+
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text, func
+
+metadata = MetaData()
+
+Table(
+    "patients",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("age", Integer, nullable=False),
+    Column("gender", String(10), nullable=False),
+    Column("email", String(255), unique=True, nullable=True),
+    Column("phone", String(20), nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+Table(
+    "consultations",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("patient_id", String, ForeignKey("patients.id"), nullable=False),
+    Column("role", String(20), nullable=False),
+    Column("stage", String(50)),
+    Column("confidence", Float),
+    Column("conversation_history", JSON),
+    Column("started_at", DateTime(timezone=True), server_default=func.now()),
+    Column("completed_at", DateTime(timezone=True), nullable=True),
+)
+
+Table(
+    "medical_records",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("patient_id", String, ForeignKey("patients.id"), nullable=False),
+    Column("bmi", Float, nullable=True),
+    Column("blood_pressure", Integer, nullable=True),
+    Column("blood_glucose", Float, nullable=True),
+    Column("hba1c", Float, nullable=True),
+    Column("cholesterol", Float, nullable=True),
+    Column("creatinine", Float, nullable=True),
+    Column("urea", Float, nullable=True),
+    Column("bilirubin_total", Float, nullable=True),
+    Column("alt", Float, nullable=True),
+    Column("ast", Float, nullable=True),
+    Column("hypertension", Boolean),
+    Column("diabetes", Boolean),
+    Column("heart_disease", Boolean),
+    Column("smoking_status", String(20), nullable=True),
+    Column("chest_pain", Boolean),
+    Column("breathlessness", Boolean),
+    Column("fatigue", Boolean),
+    Column("edema", Boolean),
+    Column("recorded_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "health_assessments",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("consultation_id", String, ForeignKey("consultations.id"), nullable=False),
+    Column("overall_risk_score", Float, nullable=False),
+    Column("overall_risk_level", String(20), nullable=False),
+    Column("primary_concerns", JSON),
+    Column("individual_risks", JSON, nullable=False),
+    Column("patient_report", Text, nullable=True),
+    Column("doctor_report", Text, nullable=True),
+    Column("soap_json", JSON, nullable=True),
+    Column("conversation_summary", Text, nullable=True),
+    Column("assessed_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "audit_logs",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("event_type", String(50), nullable=False),
+    Column("entity_type", String(50), nullable=False),
+    Column("entity_id", String, nullable=False),
+    Column("user_role", String(20), nullable=True),
+    Column("ip_address", String(45), nullable=True),
+    Column("event_data", JSON, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def upgrade(ctx):
+    metadata.create_all(bind=ctx.connection)
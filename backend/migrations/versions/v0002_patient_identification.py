@@ -0,0 +1,17 @@
+"""
+Add patient name and medical_record_number columns (formerly
+scripts/migrate_database.py) and give existing patients a placeholder name.
+"""
+
+TRANSACTIONAL = False  # the name backfill commits batch by batch
+
+
+def upgrade(ctx):
+    ctx.add_column("patients", "name", "VARCHAR(200)")
+    if ctx.add_column("patients", "medical_record_number", "VARCHAR(50)"):
+        ctx.create_index("uq_patients_medical_record_number", "patients", ["medical_record_number"], unique=True)
+
+    ctx.backfill("patients", "name = 'Patient-' || SUBSTR(id, 1, 8)", "name IS NULL")
+
+    if ctx.dialect == "postgresql":
+        ctx.execute("ALTER TABLE patients ALTER COLUMN name SET NOT NULL")
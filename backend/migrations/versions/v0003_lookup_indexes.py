@@ -0,0 +1,24 @@
+"""
+Indexes for the hot lookup paths (see the Index declarations in
+backend/models.py), built concurrently on PostgreSQL.
+"""
+
+TRANSACTIONAL = False  # CREATE INDEX CONCURRENTLY cannot run in a transaction
+
+INDEXES = [
+    ("ix_consultations_patient_id_started_at", "consultations", ["patient_id", "started_at DESC"]),
+    ("ix_medical_records_patient_id_recorded_at", "medical_records", ["patient_id", "recorded_at DESC"]),
+    (
+        "ix_health_assessments_consultation_id_assessed_at",
+        "health_assessments",
+        ["consultation_id", "assessed_at DESC"],
+    ),
+    ("ix_health_assessments_assessed_at_id", "health_assessments", ["assessed_at", "id"]),
+    ("ix_audit_logs_entity_id", "audit_logs", ["entity_id"]),
+    ("ix_audit_logs_created_at", "audit_logs", ["created_at"]),
+]
+
+
+def upgrade(ctx):
+    for name, table, columns in INDEXES:
+        ctx.create_index(name, table, columns)
@@ -0,0 +1,16 @@
+"""
+Indexes for keyset pagination of the patient and consultation lists,
+built concurrently on PostgreSQL.
+"""
+
+TRANSACTIONAL = False  # CREATE INDEX CONCURRENTLY cannot run in a transaction
+
+INDEXES = [
+    ("ix_patients_created_at_id", "patients", ["created_at", "id"]),
+    ("ix_consultations_started_at_id", "consultations", ["started_at", "id"]),
+]
+
+
+def upgrade(ctx):
+    for name, table, columns in INDEXES:
+        ctx.create_index(name, table, columns)
@@ -0,0 +1,100 @@
+"""
+Create patient_risk_timeseries and backfill it from the individual_risks of
+existing assessments, in id-ordered batches committed one by one.
+
+Assessments that already have rows are skipped, so an interrupted backfill
+resumes where it stopped. Re-run it with scripts/backfill_risk_timeseries.py
+for assessments written around the deploy by code that predates the table.
+
+The table definition and the row extraction are frozen here: they must not
+follow later changes to backend.models or backend.crud.
+"""
+
+from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Index, MetaData, String, Table, exists, insert, select
+
+TRANSACTIONAL = False  # the backfill commits batch by batch
+
+BATCH_SIZE = 1000
+
+metadata = MetaData()
+
+# The columns of the existing tables this migration reads
+patients = Table("patients", metadata, Column("id", String, primary_key=True))
+consultations = Table(
+    "consultations",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("patient_id", String),
+)
+health_assessments = Table(
+    "health_assessments",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("consultation_id", String),
+    Column("individual_risks", JSON),
+    Column("assessed_at", DateTime(timezone=True)),
+)
+
+patient_risk_timeseries = Table(
+    "patient_risk_timeseries",
+    metadata,
+    Column("assessment_id", String, ForeignKey("health_assessments.id"), primary_key=True),
+    Column("disease", String(100), primary_key=True),
+    Column("patient_id", String, ForeignKey("patients.id"), nullable=False),
+    Column("assessed_at", DateTime(timezone=True), nullable=False),
+    Column("score", Float, nullable=False),
+    Column("level", String(20), nullable=True),
+    Index("ix_patient_risk_timeseries_patient_id_disease_assessed_at", "patient_id", "disease", "assessed_at"),
+    Index("ix_patient_risk_timeseries_disease_assessed_at", "disease", "assessed_at"),
+)
+
+
+def risk_rows(individual_risks):
+    """(disease, score, level) values of an individual_risks list; a repeated disease keeps its last score."""
+    rows = {}
+    for risk in individual_risks or []:
+        disease = risk.get("disease") or "Unknown"
+        rows[disease] = {
+            "disease": disease,
+            "score": float(risk.get("risk_score") or 0),
+            "level": risk.get("risk_level"),
+        }
+    return list(rows.values())
+
+
+def backfill(connection, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Write the timeseries rows of every assessment that has none; returns the
+    number of assessments filled. On an autocommit connection each batch
+    commits on its own.
+    """
+    assessment, timeseries = health_assessments, patient_risk_timeseries
+    query = (
+        select(assessment.c.id, assessment.c.assessed_at, assessment.c.individual_risks, consultations.c.patient_id)
+        .join(consultations, consultations.c.id == assessment.c.consultation_id)
+        .where(~exists().where(timeseries.c.assessment_id == assessment.c.id))
+        .order_by(assessment.c.id)
+        .limit(batch_size)
+    )
+
+    total, last_id = 0, None
+    while True:
+        batch = query if last_id is None else query.where(assessment.c.id > last_id)
+        rows = connection.execute(batch).all()
+        if not rows:
+            return total
+
+        values = [
+            {"assessment_id": row.id, "patient_id": row.patient_id, "assessed_at": row.assessed_at, **risk}
+            for row in rows
+            for risk in risk_rows(row.individual_risks)
+        ]
+        if values:
+            connection.execute(insert(timeseries), values)
+        total += len(rows)
+        last_id = rows[-1].id
+
+
+def upgrade(ctx):
+    patient_risk_timeseries.create(ctx.connection, checkfirst=True)
+    backfill(ctx.connection)
@@ -1,16 +1,22 @@
 import uuid
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, null
 
 from backend.database import Base
 
 
+# Ids are generated in Python, so rows staged in one unit of work can
+# reference each other before the flush
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+
 class Patient(Base):
     __tablename__ = "patients"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=new_id)
 
     # Patient Identification
     name = Column(String(200), nullable=False)
@@ -26,17 +32,22 @@ class Patient(Base):
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # NULL is a SQL default so the INSERT returns it instead of leaving it to a later SELECT
+    updated_at = Column(DateTime(timezone=True), default=null(), onupdate=func.now())
 
     # Relationships
     consultations = relationship("Consultation", back_populates="patient", cascade="all, delete-orphan")
     medical_records = relationship("MedicalRecord", back_populates="patient", cascade="all, delete-orphan")
 
+    # Fetch updated_at with UPDATE ... RETURNING: sessions keep objects loaded
+    # after commit (expire_on_commit=False), so it must not be left expired
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class Consultation(Base):
     __tablename__ = "consultations"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=new_id)
     patient_id = Column(String, ForeignKey("patients.id"), nullable=False)
 
     # Consultation metadata
@@ -59,7 +70,7 @@ class Consultation(Base):
 class MedicalRecord(Base):
     __tablename__ = "medical_records"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=new_id)
     patient_id = Column(String, ForeignKey("patients.id"), nullable=False)
 
     # Vitals
@@ -100,7 +111,7 @@ class MedicalRecord(Base):
 class HealthAssessment(Base):
     __tablename__ = "health_assessments"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=new_id)
     consultation_id = Column(String, ForeignKey("consultations.id"), nullable=False)
 
     # Overall Risk
@@ -122,12 +133,34 @@ class HealthAssessment(Base):
 
     # Relationships
     consultation = relationship("Consultation", back_populates="assessments")
+    risk_timeseries = relationship("PatientRiskTimeseries", cascade="all, delete-orphan")
+
+
+class PatientRiskTimeseries(Base):
+    """
+    One disease score of one assessment: individual_risks denormalized with
+    the patient and the assessment time, so trend and cohort queries are
+    index scans instead of JSON parsing. Written with the assessment by
+    crud.create_health_assessment; older assessments are backfilled by
+    migration v0005.
+    """
+
+    __tablename__ = "patient_risk_timeseries"
+
+    assessment_id = Column(String, ForeignKey("health_assessments.id"), primary_key=True)
+    disease = Column(String(100), primary_key=True)
+
+    patient_id = Column(String, ForeignKey("patients.id"), nullable=False)
+    assessed_at = Column(DateTime(timezone=True), nullable=False)  # = HealthAssessment.assessed_at
+
+    score = Column(Float, nullable=False)
+    level = Column(String(20), nullable=True)  # Low, Moderate, High, Critical
 
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=new_id)
 
     # Event details
     event_type = Column(String(50), nullable=False)  # consultation_started, assessment_completed, etc.
@@ -143,3 +176,41 @@ class AuditLog(Base):
 
     # Timestamp
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# ============================================================
+# Indexes for the hot lookup paths
+# ============================================================
+# Composite (parent id, timestamp DESC) indexes serve "rows of X, newest
+# first" lookups (crud.get_patient_medical_records, get_latest_medical_record,
+# get_patient_consultations, get_consultation_assessments) with one index
+# seek and no sort. The analytics history joins consultations on patient_id
+# and assessments on consultation_id through the same indexes.
+# Existing databases get them from migrations v0003 and v0004, and the
+# patient_risk_timeseries table with its indexes from v0005.
+
+Index("ix_consultations_patient_id_started_at", Consultation.patient_id, Consultation.started_at.desc())
+# Keyset order of the list endpoints (created_at, id) / (started_at, id)
+Index("ix_patients_created_at_id", Patient.created_at, Patient.id)
+Index("ix_consultations_started_at_id", Consultation.started_at, Consultation.id)
+Index("ix_medical_records_patient_id_recorded_at", MedicalRecord.patient_id, MedicalRecord.recorded_at.desc())
+Index(
+    "ix_health_assessments_consultation_id_assessed_at",
+    HealthAssessment.consultation_id,
+    HealthAssessment.assessed_at.desc(),
+)
+Index("ix_health_assessments_assessed_at_id", HealthAssessment.assessed_at, HealthAssessment.id)
+Index("ix_audit_logs_entity_id", AuditLog.entity_id)
+Index("ix_audit_logs_created_at", AuditLog.created_at)
+# Trend of one disease for a patient, and cohort aggregates over a time window
+Index(
+    "ix_patient_risk_timeseries_patient_id_disease_assessed_at",
+    PatientRiskTimeseries.patient_id,
+    PatientRiskTimeseries.disease,
+    PatientRiskTimeseries.assessed_at,
+)
+Index(
+    "ix_patient_risk_timeseries_disease_assessed_at",
+    PatientRiskTimeseries.disease,
+    PatientRiskTimeseries.assessed_at,
+)
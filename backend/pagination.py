@@ -0,0 +1,88 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A page is ordered by a unique key, e.g. (assessed_at, id), and the next page
+starts strictly after the last row's key. Unlike OFFSET, the database seeks
+straight to the cursor through an index, so page 1000 costs the same as
+page 1 and rows inserted meanwhile do not shift pages.
+
+The cursor is the last key, JSON-encoded in URL-safe base64 and returned in
+the X-Next-Cursor response header (absent on the last page). Endpoints
+fetch limit + 1 rows; the extra row only tells whether a next page exists.
+Counting every matching row is a full scan, so X-Total-Count is only sent
+when asked for (?include_total=true).
+
+The patient and consultation lists still accept the old ?skip= offset for
+existing clients; those responses carry a Deprecation header (and an
+X-Next-Cursor to switch to).
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Callable, List, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+DEPRECATION_HEADER = "Deprecation"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded."""
+
+
+def encode_cursor(key: Sequence) -> str:
+    """Opaque cursor for a row key; datetimes are stored as ISO strings."""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List:
+    """Key values stored by encode_cursor (datetimes come back as ISO strings)."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(f"invalid cursor {cursor!r}") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(f"invalid cursor {cursor!r}")
+    return values
+
+
+def parse_datetime(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor(f"invalid cursor value {value!r}") from e
+
+
+def after(columns: Sequence, key: Sequence, descending: bool = False):
+    """
+    WHERE clause for rows strictly after key in (columns) order, spelled
+    as (a > x) OR (a = x AND b > y) so every backend can use the index.
+    """
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, key)):
+        beyond = column < value if descending else column > value
+        clauses.append(and_(*[c == v for c, v in zip(columns[:i], key[:i])], beyond))
+    return or_(*clauses)
+
+
+def decode_time_cursor(cursor: str) -> Tuple[datetime, str]:
+    """(timestamp, id) key of a cursor made by encode_cursor((timestamp, id))."""
+    timestamp, row_id = decode_cursor(cursor, 2)
+    return parse_datetime(timestamp), row_id
+
+
+def next_page(rows: Sequence, limit: int, key: Callable, response) -> Sequence:
+    """
+    Trim rows fetched with limit + 1 to one page and, when there are more,
+    set X-Next-Cursor from key(last row).
+    """
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+    return rows
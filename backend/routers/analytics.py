@@ -1,55 +1,138 @@
-from typing import Any, Dict, List
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from backend import models
 from backend.database import get_db
+from backend.pagination import InvalidCursor, after, decode_time_cursor, next_page
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
 
+def _window(query, column, since: Optional[datetime], until: Optional[datetime]):
+    """Rows with since <= column < until."""
+    if since is not None:
+        query = query.where(column >= since)
+    if until is not None:
+        query = query.where(column < until)
+    return query
+
+
+def _after_cursor(query, key, cursor: Optional[str]):
+    """Rows after a (timestamp, id) keyset cursor; 400 when it cannot be decoded."""
+    if not cursor:
+        return query
+    try:
+        return query.where(after(key, decode_time_cursor(cursor)))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/patients/{patient_id}/history", response_model=List[Dict[str, Any]])
-def get_patient_history(patient_id: str, db: Session = Depends(get_db)):
+def get_patient_history(
+    patient_id: str,
+    response: Response,
+    since: Optional[datetime] = Query(None, description="Only assessments at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only assessments before this time"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: Session = Depends(get_db),
+):
     """
     Get longitudinal risk history for a patient.
-    Returns a list of assessments sorted by date.
+    Returns a list of assessments sorted by date, one page at a time: pass the
+    X-Next-Cursor response header back as ?cursor= for the next page.
     """
-    # 1. Fetch all consultations for the patient
-    consultations = db.query(models.Consultation).filter(models.Consultation.patient_id == patient_id).all()
-
-    history = []
-
-    for consult in consultations:
-        # Get assessments for this consultation
-        assessments = (
-            db.query(models.HealthAssessment).filter(models.HealthAssessment.consultation_id == consult.id).all()
-        )
-
-        for assessment in assessments:
-            # Parse individual risks if stored as JSON string (though model says JSON type)
-            # SQLAlchemy handles JSON type automatically for supported backends,
-            # but safety check doesn't hurt if we migrate DBs.
-            risks = assessment.individual_risks
-
-            # Extract scores per disease
-            # Expected format of risks: [{"disease": "Kidney Disease", "risk_score": 88.0, ...}, ...]
-
-            risk_map = {
-                "date": assessment.assessed_at.isoformat(),
-                "overall_score": assessment.overall_risk_score,
-                "overall_level": assessment.overall_risk_level,
+    assessment, timeseries = models.HealthAssessment, models.PatientRiskTimeseries
+    key = (assessment.assessed_at, assessment.id)
+
+    page = select(assessment.id, assessment.assessed_at, assessment.overall_risk_score, assessment.overall_risk_level)
+    page = page.join(models.Consultation, models.Consultation.id == assessment.consultation_id)
+    page = page.where(models.Consultation.patient_id == patient_id)
+    page = _after_cursor(_window(page, assessment.assessed_at, since, until), key, cursor)
+    page = page.order_by(*key).limit(limit + 1).subquery()
+
+    # Disease scores come from patient_risk_timeseries (primary key lookups), not the JSON column
+    query = (
+        select(page, timeseries.disease, timeseries.score)
+        .outerjoin(timeseries, timeseries.assessment_id == page.c.id)
+        .order_by(page.c.assessed_at, page.c.id)
+    )
+
+    history = {}
+    for row in db.execute(query):
+        risk_map = history.get((row.assessed_at, row.id))
+        if risk_map is None:
+            risk_map = history[(row.assessed_at, row.id)] = {
+                "date": row.assessed_at.isoformat(),
+                "overall_score": row.overall_risk_score,
+                "overall_level": row.overall_risk_level,
             }
+        if row.disease is not None:
+            risk_map[row.disease] = row.score
+
+    return [risk_map for _, risk_map in next_page(list(history.items()), limit, lambda item: item[0], response)]
+
 
-            if risks:
-                for r in risks:
-                    disease_name = r.get("disease", "Unknown")
-                    score = r.get("risk_score", 0)
-                    risk_map[disease_name] = score
+@router.get("/patients/{patient_id}/trend", response_model=List[Dict[str, Any]])
+def get_patient_trend(
+    patient_id: str,
+    response: Response,
+    disease: str = Query(..., description="Disease name, e.g. Heart Disease"),
+    since: Optional[datetime] = Query(None, description="Only assessments at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only assessments before this time"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: Session = Depends(get_db),
+):
+    """
+    Risk score and level of one disease for a patient over time, oldest
+    first, one keyset page at a time (one index range scan per page).
+    """
+    timeseries = models.PatientRiskTimeseries
+    key = (timeseries.assessed_at, timeseries.assessment_id)
+
+    query = select(timeseries.assessment_id, timeseries.assessed_at, timeseries.score, timeseries.level)
+    query = query.where(timeseries.patient_id == patient_id, timeseries.disease == disease)
+    query = _after_cursor(_window(query, timeseries.assessed_at, since, until), key, cursor)
+    query = query.order_by(*key).limit(limit + 1)
+
+    rows = next_page(db.execute(query).all(), limit, lambda row: (row.assessed_at, row.assessment_id), response)
+    return [{"date": row.assessed_at.isoformat(), "score": row.score, "level": row.level} for row in rows]
+
+
+@router.get("/diseases/{disease}/summary", response_model=Dict[str, Any])
+def get_disease_summary(
+    disease: str,
+    since: Optional[datetime] = Query(None, description="Only assessments at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only assessments before this time"),
+    db: Session = Depends(get_db),
+):
+    """
+    Cohort view of one disease over a time window: number of assessments,
+    patients and mean score, overall and per risk level.
+    """
+    timeseries = models.PatientRiskTimeseries
+    stats = (
+        func.count().label("assessments"),
+        func.count(timeseries.patient_id.distinct()).label("patients"),
+        func.avg(timeseries.score).label("average_score"),
+    )
 
-            history.append(risk_map)
+    def cohort(*columns):
+        query = select(*columns, *stats).where(timeseries.disease == disease)
+        return _window(query, timeseries.assessed_at, since, until)
 
-    # Sort by date
-    history.sort(key=lambda x: x["date"])
+    def summary(row) -> Dict[str, Any]:
+        average = round(row.average_score, 2) if row.average_score is not None else None
+        return {"assessments": row.assessments, "patients": row.patients, "average_score": average}
 
-    return history
+    levels = db.execute(cohort(timeseries.level).group_by(timeseries.level)).all()
+    return {
+        "disease": disease,
+        **summary(db.execute(cohort()).one()),
+        "levels": {row.level or "Unknown": summary(row) for row in levels},
+    }
@@ -1,8 +1,12 @@
+import json
+import logging
 from datetime import datetime
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
 from backend import schemas
 from src.agents.kira_agent import KiraAgent
-import logging
 
 router = APIRouter(prefix="/api/chat", tags=["Kira Chat"])
 agent = KiraAgent()
@@ -19,6 +23,25 @@ async def chat_with_kira(request: schemas.ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/stream")
+async def stream_chat_with_kira(request: schemas.ChatRequest):
+    """
+    Server-Sent Events variant of chat: one `data: {"token": ...}` event per
+    chunk as the LLM produces it, then an `event: done` terminator.
+    """
+
+    async def events():
+        async for token in agent.astream_chat(request.message, request.history):
+            yield f"data: {json.dumps({'token': token})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/appointments", response_model=schemas.AppointmentResponse)
 async def book_appointment(appointment: schemas.AppointmentCreate):
     # Mock booking
@@ -0,0 +1,185 @@
+"""
+Bulk export of health assessments for analytics pipelines.
+
+Rows are read through a server-side cursor (stream_results / yield_per, so
+psycopg2 uses a named cursor) and written to the response batch by batch:
+memory stays constant however many rows are exported.
+
+Incremental exports: every response carries X-Export-Watermark, the upper
+bound (exclusive) of the assessed_at range it covers. Pass it back as
+?since= to get only the rows assessed since the previous export. The
+watermark trails transactions that are still open (see export_watermark),
+so a row committed after the export started is picked up by the next one.
+It never moves back past the ?since= it was given.
+
+Configuration:
+- EXPORT_WATERMARK_LAG_SECONDS: how far the watermark trails the database
+  clock on backends other than PostgreSQL (default 60)
+"""
+
+import csv
+import io
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, text
+
+from backend import models
+from backend.database import get_session_factory
+
+router = APIRouter(prefix="/api/export", tags=["Export"])
+
+WATERMARK_HEADER = "X-Export-Watermark"
+
+EXPORT_COLUMNS = [
+    "id",
+    "patient_id",
+    "consultation_id",
+    "assessed_at",
+    "overall_risk_score",
+    "overall_risk_level",
+    "primary_concerns",
+    "individual_risks",
+]
+JSON_COLUMNS = ("primary_concerns", "individual_risks")
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _assessment_query(since: Optional[datetime], until: datetime):
+    assessment = models.HealthAssessment
+    query = (
+        select(
+            assessment.id,
+            models.Consultation.patient_id,
+            assessment.consultation_id,
+            assessment.assessed_at,
+            assessment.overall_risk_score,
+            assessment.overall_risk_level,
+            assessment.primary_concerns,
+            assessment.individual_risks,
+        )
+        .join(models.Consultation, models.Consultation.id == assessment.consultation_id)
+        .where(assessment.assessed_at < until)
+        .order_by(assessment.assessed_at, assessment.id)
+    )
+    if since is not None:
+        query = query.where(assessment.assessed_at >= since)
+    return query
+
+
+def _record(row) -> dict:
+    record = dict(row._mapping)
+    record["assessed_at"] = record["assessed_at"].isoformat() if record["assessed_at"] else None
+    return record
+
+
+def _ndjson(rows) -> str:
+    return "".join(json.dumps(_record(row)) + "\n" for row in rows)
+
+
+def _csv(rows, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        record = _record(row)
+        for column in JSON_COLUMNS:
+            record[column] = json.dumps(record[column])
+        writer.writerow([record[column] for column in EXPORT_COLUMNS])
+    return buffer.getvalue()
+
+
+def export_watermark(db) -> datetime:
+    """
+    Default upper bound of an export: no assessment still being written can
+    end up below it.
+
+    assessed_at is the database time at the start of the writer's
+    transaction, but the row only becomes visible when that transaction
+    commits. With a bare now() watermark, an assessment whose transaction
+    began before the watermark and committed after the export's snapshot
+    would be missed by this export and excluded by the next one's ?since=.
+    On PostgreSQL the watermark is therefore the start of the oldest
+    transaction open on the database (pg_stat_activity.xact_start), capped
+    at now(); a long-idle transaction holds it back until it ends. Other
+    backends cannot see open transactions, so the watermark is now() minus
+    EXPORT_WATERMARK_LAG_SECONDS.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return db.execute(
+            text(
+                "SELECT LEAST(now(), COALESCE(MIN(xact_start), now())) FROM pg_stat_activity"
+                " WHERE datname = current_database() AND xact_start IS NOT NULL"
+            )
+        ).scalar()
+
+    lag = timedelta(seconds=float(os.getenv("EXPORT_WATERMARK_LAG_SECONDS", "60")))
+    return db.execute(select(func.now())).scalar() - lag
+
+
+def _like(value: datetime, other: datetime) -> datetime:
+    """value as a naive or aware datetime, matching other (naive database times are UTC)."""
+    if (value.tzinfo is None) == (other.tzinfo is None):
+        return value
+    if other.tzinfo is None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(tzinfo=timezone.utc)
+
+
+def stream_assessments(session_factory, fmt: str, since: Optional[datetime], until: datetime, batch_size: int):
+    """Yield the export body, one chunk per fetched batch of rows."""
+    db = session_factory()
+    try:
+        result = db.execute(
+            _assessment_query(since, until).execution_options(stream_results=True, yield_per=batch_size)
+        )
+        if fmt == "csv":
+            yield _csv([], header=True)
+        for rows in result.partitions():
+            yield _csv(rows, header=False) if fmt == "csv" else _ndjson(rows)
+    finally:
+        db.close()
+
+
+@router.get("/assessments")
+def export_assessments(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    since: Optional[datetime] = Query(
+        None, description="Only assessments at or after this time (a previous watermark)"
+    ),
+    until: Optional[datetime] = Query(
+        None, description="Only assessments before this time (default: a watermark behind open transactions)"
+    ),
+    batch_size: int = Query(1000, ge=1, le=50000, description="Rows fetched per round trip"),
+    session_factory=Depends(get_session_factory),
+):
+    """
+    Stream every assessment (with patient_id and the individual_risks JSON),
+    oldest first, as NDJSON (one object per line) or CSV (JSON columns as
+    JSON strings). The X-Export-Watermark header is the next ?since=.
+    """
+    if until is None:
+        db = session_factory()
+        try:
+            until = export_watermark(db)
+        finally:
+            db.close()
+        # A transaction opened since the previous export can hold the watermark
+        # behind that export's; never hand back an earlier ?since=
+        if since is not None:
+            until = max(until, _like(since, until))
+
+    return StreamingResponse(
+        stream_assessments(session_factory, format, since, until, batch_size),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            WATERMARK_HEADER: until.isoformat(),
+            "Content-Disposition": f"attachment; filename=assessments.{format}",
+        },
+    )
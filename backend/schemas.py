@@ -3,6 +3,15 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
+from src.core.clinical_ranges import CLINICAL_RANGES
+
+
+def clinical_field(name: str, default=None):
+    """Field bounded by the clinical range table (src/core/clinical_ranges.py)."""
+    spec = CLINICAL_RANGES[name]
+    return Field(default, ge=spec.low, le=spec.high)
+
+
 # ============================================================
 # Patient Schemas
 # ============================================================
@@ -11,7 +20,7 @@ from pydantic import BaseModel, EmailStr, Field
 class PatientBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=200)
     medical_record_number: Optional[str] = Field(None, max_length=50)
-    age: int = Field(..., ge=0, le=120)
+    age: int = clinical_field("age", ...)
     gender: str = Field(..., pattern="^(Male|Female)$")
     email: Optional[EmailStr] = None
     phone: Optional[str] = None
@@ -36,16 +45,16 @@ class PatientResponse(PatientBase):
 
 
 class MedicalRecordBase(BaseModel):
-    bmi: Optional[float] = Field(None, ge=10.0, le=60.0)
-    blood_pressure: Optional[int] = Field(None, ge=60, le=250)
-    blood_glucose: Optional[float] = Field(None, ge=50.0, le=500.0)
-    hba1c: Optional[float] = Field(None, ge=3.0, le=15.0)
-    cholesterol: Optional[float] = Field(None, ge=100.0, le=400.0)
-    creatinine: Optional[float] = Field(None, ge=0.1, le=10.0)
-    urea: Optional[float] = None
-    bilirubin_total: Optional[float] = None
-    alt: Optional[float] = None
-    ast: Optional[float] = None
+    bmi: Optional[float] = clinical_field("bmi")
+    blood_pressure: Optional[int] = clinical_field("blood_pressure")
+    blood_glucose: Optional[float] = clinical_field("blood_glucose")
+    hba1c: Optional[float] = clinical_field("hba1c")
+    cholesterol: Optional[float] = clinical_field("cholesterol")
+    creatinine: Optional[float] = clinical_field("creatinine")
+    urea: Optional[float] = clinical_field("urea")
+    bilirubin_total: Optional[float] = clinical_field("total_bilirubin")
+    alt: Optional[float] = clinical_field("alt")
+    ast: Optional[float] = clinical_field("ast")
 
     hypertension: bool = False
     diabetes: bool = False
@@ -152,6 +161,62 @@ class AnalyzeHealthResponse(BaseModel):
     assessment: HealthAssessmentResponse
 
 
+class BatchAnalyzeItem(BaseModel):
+    """One patient in a batch scoring request"""
+
+    patient_data: PatientCreate
+    medical_data: MedicalRecordBase
+
+
+class BatchAnalyzeRequest(BaseModel):
+    """Request for vectorized risk scoring of many patients"""
+
+    patients: List[BatchAnalyzeItem] = Field(..., min_length=1, max_length=5000)
+
+
+class PatientRiskReport(BaseModel):
+    """ML risk report for a single patient (same shape as run_selected_agents)"""
+
+    individual_risks: List[Dict[str, Any]]
+    overall_risk: Dict[str, Any]
+    incomplete: bool = False  # routed agents timed out; overall level is never Low then
+    timed_out: List[str] = []
+
+
+class BatchAnalyzeResponse(BaseModel):
+    """Per-patient risk reports, in request order"""
+
+    results: List[PatientRiskReport]
+
+
+class ExplainBatchRequest(BaseModel):
+    """Patients to explain (disease-model inputs, e.g. age, blood_pressure, cholesterol)"""
+
+    patients: List[Dict[str, Any]] = Field(..., min_length=1, max_length=1000)
+    top_k: int = Field(10, ge=1, le=50)
+
+
+class FeatureContribution(BaseModel):
+    feature: str
+    value: Any
+    contribution: float  # SHAP contribution in risk-score points
+
+
+class PatientExplanation(BaseModel):
+    """Top SHAP contributions for one patient; base_risk_score + sum of all contributions = risk_score"""
+
+    disease: str
+    risk_score: float
+    base_risk_score: float
+    contributions: List[FeatureContribution]
+
+
+class ExplainBatchResponse(BaseModel):
+    """Per-patient explanations, in request order"""
+
+    explanations: List[PatientExplanation]
+
+
 # ============================================================
 # Audit Log Schema
 # ============================================================
@@ -1,8 +1,13 @@
+import asyncio
+from typing import Dict, List, Tuple
+
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from backend import crud, schemas
+from backend.task_graph import TaskGraph
 from src.agents.doctor_agent import DoctorAgent
-from src.coordinator.executor import run_selected_agents
+from src.coordinator.agent_pool import AgentTimeoutError
 from src.coordinator.patient_state import PatientState
 from src.core.llm_client import GeminiClient
 
@@ -17,6 +22,18 @@ class HealthAnalysisService:
         self.db = db
         self.llm = GeminiClient()
         self.doctor_agent = DoctorAgent(self.llm)
+        # Threadpool calls using self.db that may still be running
+        self._db_calls: List[asyncio.Future] = []
+
+    def _run_db(self, fn, *args):
+        """
+        Run blocking session work in the threadpool. Cancelling the caller
+        does not stop the thread, so the call is shielded and tracked: the
+        session is only touched again once every tracked call has ended.
+        """
+        call = asyncio.ensure_future(run_in_threadpool(fn, *args))
+        self._db_calls.append(call)
+        return asyncio.shield(call)
 
     async def analyze_health(self, request: schemas.AnalyzeHealthRequest) -> schemas.AnalyzeHealthResponse:
         """
@@ -28,66 +45,144 @@ class HealthAnalysisService:
         5. Generate LLM reports
         6. Store assessment
         7. Return complete results
+
+        Nothing here blocks the event loop: DB work and CPU-bound ML
+        inference run in the threadpool, LLM calls use the async client.
+        Intake rows are staged in the session and committed together with
+        the assessment (one flush, one commit), so no pooled connection is
+        held across the LLM calls and a failed analysis writes nothing.
+        Steps are wired as a TaskGraph so latency is the longest chain.
+        """
+
+        patient_state = self._convert_to_patient_state(request)
+        history = request.conversation_history
+
+        # Every step starts as soon as its inputs exist:
+        #   intake ─────────────────────────────┐
+        #   ml_report ──┬── reports ────────────┼── assessment
+        #   summary ────┴── soap ───────────────┘
+        graph = TaskGraph()
+        # 1-3. Intake writes (blocking DB I/O)
+        graph.add("intake", lambda: self._run_db(self._store_intake, request))
+        # 4-5. ML risk assessment (CPU-bound)
+        graph.add("ml_report", lambda: run_in_threadpool(self._ml_report, patient_state))
+        # 6. Comprehensive reports (template-based, no LLM) and LLM summary/SOAP
+        graph.add(
+            "reports",
+            lambda ml_report: run_in_threadpool(self._generate_reports, ml_report, request.patient_data.name),
+            deps=["ml_report"],
+        )
+        graph.add("summary", lambda: self._summarize(history))
+        graph.add(
+            "soap",
+            lambda ml_report, summary: self.doctor_agent.agenerate_soap_json(
+                ml_report=ml_report, conversation_summary=summary
+            ),
+            deps=["ml_report", "summary"],
+        )
+        # 7-10. Store assessment, complete consultation, audit, refresh
+        graph.add(
+            "assessment",
+            lambda intake, ml_report, reports, summary, soap: self._run_db(
+                self._store_assessment,
+                request,
+                *intake,
+                ml_report,
+                {"patient_report": reports[0], "doctor_report": reports[1]},
+                soap,
+                summary,
+            ),
+            deps=["intake", "ml_report", "reports", "summary", "soap"],
+        )
+
+        try:
+            results = await graph.run()
+        except Exception:
+            # The graph cancelled the other nodes, but a DB thread (e.g. the
+            # intake) may still be using the session, which is not thread-safe:
+            # wait for it, then drop the staged rows so nothing is left behind
+            await asyncio.gather(*self._db_calls, return_exceptions=True)
+            await run_in_threadpool(self.db.rollback)
+            raise
+        patient, medical_record, consultation = results["intake"]
+
+        return schemas.AnalyzeHealthResponse(
+            patient=patient,
+            medical_record=medical_record,
+            consultation=consultation,
+            assessment=results["assessment"],
+        )
+
+    @staticmethod
+    def _ml_report(patient_state: PatientState) -> Dict:
+        """
+        Run the disease agents. An assessment is never stored when every
+        routed agent timed out: there is no risk to record.
+        """
+        # Imported on first analysis so app startup does not pay for pandas/sklearn
+        from src.coordinator.executor import run_selected_agents
+
+        ml_report = run_selected_agents(patient_state)
+        if ml_report["overall_risk"]["score"] is None:
+            raise AgentTimeoutError(ml_report["timed_out"])
+        return ml_report
+
+    def _store_intake(self, request: schemas.AnalyzeHealthRequest):
+        """
+        Look up the patient and stage the intake rows (patient, medical record,
+        consultation) as pending objects. Nothing is written here: the rows
+        are flushed and committed together with the assessment.
         """
 
         # 1. Create or Get patient
         patient = None
         if request.patient_data.email:
             patient = crud.get_patient_by_email(self.db, request.patient_data.email)
+            # End the read transaction: the session must not hold a pooled
+            # connection while the LLM calls run
+            self.db.commit()
 
         if not patient:
-            patient = crud.create_patient(self.db, request.patient_data)
+            patient = crud.create_patient(self.db, request.patient_data, commit=False)
         else:
             # Update patient name/mrn if provided and currently missing or different
-            should_update = False
             if request.patient_data.name and patient.name != request.patient_data.name:
                 patient.name = request.patient_data.name
-                should_update = True
 
             if (
                 request.patient_data.medical_record_number
                 and patient.medical_record_number != request.patient_data.medical_record_number
             ):
                 patient.medical_record_number = request.patient_data.medical_record_number
-                should_update = True
-
-            if should_update:
-                self.db.commit()
-                self.db.refresh(patient)
 
         # 2. Create medical record
         medical_record_data = schemas.MedicalRecordCreate(patient_id=patient.id, **request.medical_data.model_dump())
-        medical_record = crud.create_medical_record(self.db, medical_record_data)
+        medical_record = crud.create_medical_record(self.db, medical_record_data, commit=False)
 
         # 3. Create consultation
         consultation_data = schemas.ConsultationCreate(patient_id=patient.id, role=request.role)
-        consultation = crud.create_consultation(self.db, consultation_data)
+        consultation = crud.create_consultation(self.db, consultation_data, commit=False)
 
         # Update consultation with conversation history
         if request.conversation_history:
-            crud.update_consultation(
-                self.db,
-                consultation.id,
+            crud.apply_consultation_update(
+                consultation,
                 schemas.ConsultationUpdate(
                     conversation_history=request.conversation_history,
                     stage="medical_form",
                 ),
             )
 
-        # 4. Convert to PatientState for ML pipeline
-        patient_state = self._convert_to_patient_state(request)
-
-        # 5. Run ML risk assessment
-        ml_report = run_selected_agents(patient_state)
+        return patient, medical_record, consultation
 
-        # 6. Generate comprehensive reports with enhanced explainability
+    @staticmethod
+    def _generate_reports(ml_report: Dict, patient_name: str) -> Tuple[str, str]:
+        """Generate comprehensive reports with enhanced explainability (no LLM)."""
         from src.agents.enhanced_report_generator import (
             generate_comprehensive_doctor_report,
             generate_comprehensive_patient_report,
         )
 
-        patient_name = request.patient_data.name
-
         try:
             # Generate patient-friendly report
             patient_report = generate_comprehensive_patient_report(ml_report=ml_report, patient_name=patient_name)
@@ -100,14 +195,30 @@ class HealthAnalysisService:
             patient_report = "Report generation currently unavailable. Please review the numerical risk scores above."
             doctor_report = "Clinical report generation unavailable. Risk stratification scores are valid."
 
-        llm_reports = {"patient_report": patient_report, "doctor_report": doctor_report}
-
-        # Generate SOAP note (keep existing logic)
-        conversation_summary = ""
-        if request.conversation_history:
-            conversation_summary = self.doctor_agent.summarize_case(request.conversation_history)
-
-        soap_json = self.doctor_agent.generate_soap_json(ml_report=ml_report, conversation_summary=conversation_summary)
+        return patient_report, doctor_report
+
+    async def _summarize(self, conversation_history: List[Dict[str, str]]) -> str:
+        """Summarize the conversation (async LLM call); empty when there is no conversation."""
+        if not conversation_history:
+            return ""
+        return await self.doctor_agent.asummarize_case(conversation_history)
+
+    def _store_assessment(
+        self,
+        request: schemas.AnalyzeHealthRequest,
+        patient,
+        medical_record,
+        consultation,
+        ml_report: Dict,
+        llm_reports: Dict[str, str],
+        soap_json: Dict,
+        conversation_summary: str,
+    ):
+        """
+        Stage the assessment, complete the consultation and write the audit
+        log, then commit the whole analysis at once (blocking DB I/O): one
+        flush, with server defaults returned by the INSERTs, and one commit.
+        """
 
         # 7. Create health assessment
         assessment_data = schemas.HealthAssessmentCreate(
@@ -121,10 +232,10 @@ class HealthAnalysisService:
             soap_json=soap_json,
             conversation_summary=conversation_summary,
         )
-        assessment = crud.create_health_assessment(self.db, assessment_data)
+        assessment = crud.create_health_assessment(self.db, assessment_data, commit=False, patient_id=patient.id)
 
         # 8. Mark consultation as completed
-        crud.update_consultation(self.db, consultation.id, schemas.ConsultationUpdate(stage="report"))
+        crud.apply_consultation_update(consultation, schemas.ConsultationUpdate(stage="report"))
 
         # 9. Create audit log
         crud.create_audit_log(
@@ -138,57 +249,73 @@ class HealthAnalysisService:
                     "patient_id": patient.id,
                     "consultation_id": consultation.id,
                     "overall_risk_level": assessment.overall_risk_level,
+                    "timed_out": ml_report.get("timed_out", []),
                 },
             ),
+            commit=False,
         )
 
-        # 10. Refresh and return
-        self.db.refresh(patient)
-        self.db.refresh(medical_record)
-        self.db.refresh(consultation)
-        self.db.refresh(assessment)
+        # 10. Commit everything staged since intake
+        self.db.commit()
 
-        return schemas.AnalyzeHealthResponse(
-            patient=patient,
-            medical_record=medical_record,
-            consultation=consultation,
-            assessment=assessment,
-        )
+        return assessment
+
+    @classmethod
+    def analyze_batch(cls, request: schemas.BatchAnalyzeRequest) -> schemas.BatchAnalyzeResponse:
+        """
+        Vectorized ML risk scoring for many patients.
+        Each routed model runs once over all rows that need it.
+        No LLM calls and no database writes.
+        """
+        from src.coordinator.executor import run_selected_agents_batch
+
+        patient_states = [cls._build_patient_state(item.patient_data, item.medical_data) for item in request.patients]
+
+        ml_reports = run_selected_agents_batch(patient_states)
+
+        return schemas.BatchAnalyzeResponse(results=[schemas.PatientRiskReport(**report) for report in ml_reports])
 
     def _convert_to_patient_state(self, request: schemas.AnalyzeHealthRequest) -> PatientState:
         """Convert API request to PatientState for ML pipeline"""
+        return self._build_patient_state(request.patient_data, request.medical_data)
+
+    @staticmethod
+    def _build_patient_state(
+        patient_data: schemas.PatientCreate, medical_data: schemas.MedicalRecordBase
+    ) -> PatientState:
+        """Build a PatientState from patient demographics and medical data"""
         patient_state = PatientState()
 
         # Demographics
-        patient_state.age = request.patient_data.age
-        patient_state.gender = 1 if request.patient_data.gender == "Male" else 0
+        patient_state.age = patient_data.age
+        patient_state.gender = 1 if patient_data.gender == "Male" else 0
 
         # Vitals
-        patient_state.bmi = request.medical_data.bmi
-        patient_state.blood_pressure = request.medical_data.blood_pressure
+        patient_state.bmi = medical_data.bmi
+        patient_state.blood_pressure = medical_data.blood_pressure
 
         # Labs
-        patient_state.blood_glucose = request.medical_data.blood_glucose
-        patient_state.hba1c = request.medical_data.hba1c
-        patient_state.cholesterol = request.medical_data.cholesterol
-        patient_state.creatinine = request.medical_data.creatinine
-        patient_state.urea = request.medical_data.urea
-        patient_state.bilirubin_total = request.medical_data.bilirubin_total
-        patient_state.alt = request.medical_data.alt
-        patient_state.ast = request.medical_data.ast
+        patient_state.blood_glucose = medical_data.blood_glucose
+        patient_state.hba1c = medical_data.hba1c
+        patient_state.cholesterol = medical_data.cholesterol
+        patient_state.creatinine = medical_data.creatinine
+        patient_state.urea = medical_data.urea
+        patient_state.bilirubin_total = medical_data.bilirubin_total
+        patient_state.alt = medical_data.alt
+        patient_state.ast = medical_data.ast
 
         # Medical History
-        patient_state.hypertension = int(request.medical_data.hypertension)
-        patient_state.diabetes = int(request.medical_data.diabetes)
-        patient_state.heart_disease = int(request.medical_data.heart_disease)
+        patient_state.hypertension = int(medical_data.hypertension)
+        patient_state.diabetes = int(medical_data.diabetes)
+        patient_state.heart_disease = int(medical_data.heart_disease)
 
         # Lifestyle
-        patient_state.smoking_raw = request.medical_data.smoking_status
+        patient_state.smoking_raw = medical_data.smoking_status
 
         # Symptoms
-        patient_state.chest_pain = request.medical_data.chest_pain
-        patient_state.breathlessness = request.medical_data.breathlessness
-        patient_state.fatigue = request.medical_data.fatigue
-        patient_state.edema = request.medical_data.edema
+        patient_state.chest_pain = medical_data.chest_pain
+        patient_state.breathlessness = medical_data.breathlessness
+        patient_state.fatigue = medical_data.fatigue
+        patient_state.edema = medical_data.edema
 
         return patient_state
@@ -0,0 +1,122 @@
+"""
+Startup profiler: import-time breakdown of the backend.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+reports the slowest imports, so a change that drags a heavy library back
+onto the startup path is easy to spot.
+
+Usage:
+    python -m backend.startup_profile                 # top 25 imports of backend.main
+    python -m backend.startup_profile --top 40
+    python -m backend.startup_profile --budget 1.0    # exit 1 if the import takes longer
+    python -m backend.startup_profile --forbid shap --forbid matplotlib
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple
+
+# Libraries that must only be imported by the endpoints that need them
+DEFAULT_FORBIDDEN = ["shap", "matplotlib", "pandera", "reportlab"]
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse `-X importtime` stderr into ImportTiming rows (in output order)."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(
+            ImportTiming(
+                module=stripped,
+                self_us=int(parts[0]),
+                cumulative_us=int(parts[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return timings
+
+
+def profile_imports(module: str = "backend.main") -> List[ImportTiming]:
+    """Import `module` in a fresh interpreter and return its import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def summarize(timings: List[ImportTiming], module: str, top: int = 25) -> Dict:
+    total = next((t.cumulative_us for t in timings if t.module == module and t.depth == 0), None)
+    if total is None:
+        total = sum(t.cumulative_us for t in timings if t.depth == 0)
+
+    # Group by top-level package using self time, so nested imports are not double counted
+    packages: Dict[str, int] = {}
+    for t in timings:
+        package = t.module.split(".")[0]
+        packages[package] = packages.get(package, 0) + t.self_us
+
+    return {
+        "module": module,
+        "total_seconds": total / 1e6,
+        "slowest_imports": sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top],
+        "packages": sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top],
+        "loaded_modules": {t.module for t in timings},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time breakdown of the backend startup path")
+    parser.add_argument("--module", default="backend.main", help="module to import (default: backend.main)")
+    parser.add_argument("--top", type=int, default=25, help="number of rows to show")
+    parser.add_argument("--budget", type=float, help="fail if the import takes longer than this many seconds")
+    parser.add_argument(
+        "--forbid",
+        action="append",
+        help=f"fail if this package is imported at startup (default: {', '.join(DEFAULT_FORBIDDEN)})",
+    )
+    args = parser.parse_args(argv)
+
+    summary = summarize(profile_imports(args.module), args.module, args.top)
+
+    print(f"Import of {args.module}: {summary['total_seconds']:.3f}s\n")
+    print(f"{'cumulative (ms)':>16} {'self (ms)':>10}  module")
+    for t in summary["slowest_imports"]:
+        print(f"{t.cumulative_us / 1000:16.1f} {t.self_us / 1000:10.1f}  {'  ' * t.depth}{t.module}")
+
+    print(f"\n{'self (ms)':>16}  package")
+    for package, self_us in summary["packages"]:
+        print(f"{self_us / 1000:16.1f}  {package}")
+
+    failures = []
+    forbidden = args.forbid or DEFAULT_FORBIDDEN
+    leaked = sorted(p for p in forbidden if p in summary["loaded_modules"])
+    if leaked:
+        failures.append(f"imported at startup: {', '.join(leaked)}")
+    if args.budget is not None and summary["total_seconds"] > args.budget:
+        failures.append(f"{summary['total_seconds']:.3f}s exceeds the {args.budget:.3f}s budget")
+
+    for failure in failures:
+        print(f"\nFAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
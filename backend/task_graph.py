@@ -0,0 +1,74 @@
+"""
+Minimal dependency-aware async task graph.
+
+Every node starts as soon as the nodes it depends on have finished,
+so end-to-end latency is the longest dependency chain rather than the
+sum of all steps.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+
+class TaskGraph:
+    """
+    Usage:
+        graph = TaskGraph()
+        graph.add("summary", summarize)
+        graph.add("soap", lambda summary: make_soap(summary), deps=["summary"])
+        results = await graph.run()
+
+    Each node function receives its dependencies' results as keyword
+    arguments (named after the dependency) and must return an awaitable.
+    """
+
+    def __init__(self):
+        self._nodes: Dict[str, tuple] = {}
+
+    def add(self, name: str, fn: Callable[..., Awaitable[Any]], deps: Iterable[str] = ()) -> "TaskGraph":
+        if name in self._nodes:
+            raise ValueError(f"Task '{name}' already defined")
+        self._nodes[name] = (fn, tuple(deps))
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every node and return {name: result}. The first failure cancels the rest and is re-raised."""
+        tasks: Dict[str, asyncio.Future] = {}
+
+        async def run_node(name):
+            fn, deps = self._nodes[name]
+            inputs = {dep: await tasks[dep] for dep in deps}
+            return await fn(**inputs)
+
+        for name in self._topological_order():
+            tasks[name] = asyncio.ensure_future(run_node(name))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return {name: task.result() for name, task in tasks.items()}
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name not in self._nodes:
+                raise ValueError(f"Unknown task dependency '{name}'")
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at task '{name}'")
+            visiting.add(name)
+            for dep in self._nodes[name][1]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self._nodes:
+            visit(name)
+        return order
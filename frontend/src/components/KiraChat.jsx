@@ -34,6 +34,7 @@ const KiraChat = () => {
     setMessages(prev => [...prev, userMsg])
     setInputValue('')
     setIsLoading(true)
+    let started = false
 
     try {
       // Serialize history correctly
@@ -42,17 +43,32 @@ const KiraChat = () => {
         content: m.content
       }))
 
-      const result = await healthAPI.chatWithKira({
+      await healthAPI.streamChatWithKira({
         message: userMsg.content,
         history: history
+      }, (token) => {
+        if (!started) {
+          // First token: swap the typing indicator for the reply bubble
+          started = true
+          setIsLoading(false)
+          setMessages(prev => [...prev, { role: 'bot', content: token }])
+          return
+        }
+        setMessages(prev => {
+          const last = prev[prev.length - 1]
+          return [...prev.slice(0, -1), { ...last, content: last.content + token }]
+        })
       })
 
-      const botMsg = { role: 'bot', content: result.response }
-      setMessages(prev => [...prev, botMsg])
+      if (!started) {
+        setMessages(prev => [...prev, { role: 'bot', content: "I'm having trouble connecting right now. Please try again." }])
+      }
       
     } catch (error) {
       console.error("Chat error:", error)
-      setMessages(prev => [...prev, { role: 'bot', content: "I'm having trouble connecting right now. Please try again." }])
+      if (!started) {
+        setMessages(prev => [...prev, { role: 'bot', content: "I'm having trouble connecting right now. Please try again." }])
+      }
     } finally {
       setIsLoading(false)
     }
@@ -13,7 +13,7 @@ const ResultsPage = () => {
   const location = useLocation()
   const navigate = useNavigate()
   const { result, patientData } = location.state || {}
-  const [shapImage, setShapImage] = useState(null)
+  const [shapData, setShapData] = useState(null)
   const [loadingShap, setLoadingShap] = useState(false)
   const [loadingPdf, setLoadingPdf] = useState(false)
 
@@ -195,7 +195,7 @@ const ResultsPage = () => {
                 <div className="tool-card">
                    <h3>🔍 Visual Risk Explanation</h3>
                    <p>Generate a SHAP feature importance plot to understand specific risk factors.</p>
-                   {!shapImage ? (
+                   {!shapData ? (
                      <button 
                         className="medical-button secondary"
                         onClick={async () => {
@@ -205,8 +205,7 @@ const ResultsPage = () => {
                           }
                           setLoadingShap(true)
                           try {
-                            const b64 = await healthAPI.getSHAPExplanation(patientData);
-                            setShapImage(`data:image/png;base64,${b64}`);
+                            setShapData(await healthAPI.getSHAPContributions(patientData));
                           } catch(e) {
                              alert("Failed to generate explanation.")
                              console.error(e)
@@ -220,8 +219,27 @@ const ResultsPage = () => {
                      </button>
                    ) : (
                      <div className="shap-display">
-                        <img src={shapImage} alt="Feature Importance" style={{width: '100%', borderRadius: '8px', border: '1px solid #ddd'}} />
-                        <button className="text-button" onClick={() => setShapImage(null)} style={{marginTop: '0.5rem'}}>Close Explanation</button>
+                        <p style={{fontSize: '0.85rem', color: '#666'}}>
+                          Risk {shapData.risk_score}% vs. average {shapData.base_risk_score}% (impact in risk points)
+                        </p>
+                        {(() => {
+                          const maxImpact = Math.max(...shapData.contributions.map(c => Math.abs(c.contribution)), 1e-6)
+                          return shapData.contributions.map(c => (
+                            <div key={c.feature} style={{display: 'flex', alignItems: 'center', gap: '0.5rem', marginBottom: '0.25rem'}}>
+                              <span style={{flex: '0 0 45%', fontSize: '0.8rem', textAlign: 'right'}}>{c.feature}</span>
+                              <div style={{flex: 1, background: '#f1f1f1', borderRadius: '4px'}}>
+                                <div style={{
+                                  width: `${(Math.abs(c.contribution) / maxImpact) * 100}%`,
+                                  height: '0.75rem',
+                                  borderRadius: '4px',
+                                  background: c.contribution > 0 ? '#e53e3e' : '#3182ce'
+                                }} />
+                              </div>
+                              <span style={{flex: '0 0 3.5rem', fontSize: '0.8rem'}}>{c.contribution > 0 ? '+' : ''}{c.contribution}</span>
+                            </div>
+                          ))
+                        })()}
+                        <button className="text-button" onClick={() => setShapData(null)} style={{marginTop: '0.5rem'}}>Close Explanation</button>
                      </div>
                    )}
                 </div>
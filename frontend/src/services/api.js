@@ -56,6 +56,14 @@ export const healthAPI = {
     return response.data;
   },
 
+  // Get top SHAP contributions as JSON (rendered client-side, no server plotting)
+  getSHAPContributions: async (patientData, topK = 10) => {
+    const response = await api.post("/api/explain/heart", patientData, {
+      params: { format: "json", top_k: topK },
+    });
+    return response.data;
+  },
+
   // Generate PDF Report (returns blob)
   generatePDF: async (analysisData) => {
     // Expects AnalyzeHealthResponse
@@ -71,6 +79,46 @@ export const healthAPI = {
     return response.data;
   },
 
+  // Chat with Kira, calling onToken for each streamed chunk (Server-Sent Events)
+  streamChatWithKira: async (chatData, onToken) => {
+    const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(chatData),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Chat stream failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let text = "";
+
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const event = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        if (event.startsWith("event: done")) return text;
+
+        const data = event.split("\n").find((line) => line.startsWith("data: "));
+        if (!data) continue;
+        const { token } = JSON.parse(data.slice(6));
+        if (token) {
+          text += token;
+          onToken(token);
+        }
+      }
+    }
+    return text;
+  },
+
   // Book appointment
   bookAppointment: async (appointmentData) => {
     const response = await api.post("/api/chat/appointments", appointmentData);
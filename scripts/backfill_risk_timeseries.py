@@ -0,0 +1,35 @@
+"""
+Backfill patient_risk_timeseries from the individual_risks of assessments
+that have no timeseries rows yet.
+
+Migration v0005 runs the same backfill once. Re-run it after assessments
+were written without the table, e.g. by an older release still serving
+during the deploy, or by bulk inserts that bypass crud.create_health_assessment.
+
+Usage:
+    python -m scripts.backfill_risk_timeseries [--batch-size 1000]
+"""
+
+import argparse
+import time
+
+from backend.database import engine
+from backend.migrations.versions.v0005_patient_risk_timeseries import BATCH_SIZE, backfill
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill patient_risk_timeseries from existing assessments")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="assessments per committed batch")
+    args = parser.parse_args(argv)
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    start = time.perf_counter()
+    # Autocommit: every batch commits on its own, so no lock is held for the whole table
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        filled = backfill(conn, batch_size=args.batch_size)
+    print(f"Backfilled {filled:,} assessment(s) in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
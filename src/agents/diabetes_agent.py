@@ -1,43 +1,46 @@
-import pickle
-
 import pandas as pd
 
 from src.agents.diabetes_adapter import adapt_diabetes_features, normalize_smoking
+from src.coordinator.disease_model import DiseaseModel
 
-with open(
-    "models/diabetes_hypertension_model/diabetes_and_hypertension_prediction_model.pkl",
-    "rb",
-) as f:
-    diabetes_model = pickle.load(f)
-
-
-def risk_level(score):
-    if score < 20:
-        return "Low"
-    elif score < 50:
-        return "Moderate"
-    elif score < 75:
-        return "High"
-    else:
-        return "Critical"
 
-
-def diabetes_risk(patient_data):
+def _diabetes_row(patient_data):
     # 1️⃣ Adapt raw patient data
     features = adapt_diabetes_features(patient_data)
 
     # 2️⃣ NORMALIZE categorical inputs (CRITICAL FIX)
     features["smoking_history"] = normalize_smoking(features.get("smoking_history"))
 
+    return features
+
+
+def _feature_frame(patients):
+    """Encode patients into one DataFrame with the model's input columns."""
     # 3️⃣ Create DataFrame with correct schema
-    X = pd.DataFrame([features])
+    return pd.DataFrame([_diabetes_row(p) for p in patients])
+
+
+def load_background():
+    """
+    Column layout for the explainer. The pipeline's random forest is
+    explained with path-dependent TreeSHAP, so no training sample is needed.
+    """
+    return _feature_frame([{}])
 
+
+# No fast path: the pipeline one-hot encodes string columns
+MODEL = DiseaseModel("diabetes", "Diabetes", _feature_frame, positive_class=1, background=load_background)
+
+
+def diabetes_risk(patient_data):
+    return MODEL.risk_batch([patient_data])[0]
+
+
+def diabetes_risk_batch(patients):
     # 4️⃣ Predict risk
-    probability = diabetes_model.predict_proba(X)[0][1]
-    risk_score = float(round(probability * 100, 2))
-
-    return {
-        "disease": "Diabetes",
-        "risk_score": risk_score,
-        "risk_level": risk_level(risk_score),
-    }
+    return MODEL.risk_batch(patients)
+
+
+get_shap_explainer = MODEL.shap_explainer
+explain_batch = MODEL.explain_batch
+generate_shap_plot = MODEL.shap_plot
@@ -1,5 +1,7 @@
 import json
-from typing import Dict, List, Optional
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 FORBIDDEN_TERMS = [
     "diagnosed",
@@ -13,14 +15,50 @@ FORBIDDEN_TERMS = [
 ]
 
 
-def sanitize(text: str) -> str:
-    if not text:
+@lru_cache(maxsize=8)
+def _term_pattern(terms: Tuple[str, ...]) -> "re.Pattern":
+    # Longest first, so a term is not cut short by one of its own prefixes
+    return re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.I)
+
+
+def sanitize(text: str, terms: List[str] = FORBIDDEN_TERMS) -> str:
+    if not text or not terms:
         return text
-    lowered = text.lower()
-    for term in FORBIDDEN_TERMS:
-        if term in lowered:
-            text = text.replace(term, "[REDACTED]")
-    return text
+    return _term_pattern(tuple(terms)).sub("[REDACTED]", text)
+
+
+class StreamSanitizer:
+    """
+    Applies sanitize() to a token stream on the fly.
+
+    The longest tail that could still grow into a forbidden term is held
+    back until the next chunk (or flush), so terms split across chunk
+    boundaries are still caught.
+    """
+
+    def __init__(self, terms: List[str] = FORBIDDEN_TERMS):
+        self.terms = terms
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        self._pending += chunk
+        hold = self._partial_match_length(self._pending.lower())
+        ready = self._pending[: len(self._pending) - hold]
+        self._pending = self._pending[len(ready) :]
+        return sanitize(ready, self.terms)
+
+    def flush(self) -> str:
+        ready, self._pending = self._pending, ""
+        return sanitize(ready, self.terms)
+
+    def _partial_match_length(self, lowered: str) -> int:
+        longest = 0
+        for term in self.terms:
+            for size in range(min(len(term) - 1, len(lowered)), longest, -1):
+                if term.startswith(lowered[-size:]):
+                    longest = size
+                    break
+        return longest
 
 
 class DoctorAgent:
@@ -66,6 +104,14 @@ class DoctorAgent:
         except Exception:
             return "Summary unavailable due to temporary system load."
 
+    async def asummarize_case(self, conversation_history: List[Dict]) -> str:
+        """Async variant of summarize_case (non-blocking LLM call)."""
+        try:
+            prompt = self._summary_prompt(conversation_history)
+            return sanitize((await self.llm.agenerate(prompt)).strip())
+        except Exception:
+            return "Summary unavailable due to temporary system load."
+
     # --------------------------------------------------
     # 3. Patient + Doctor Reports
     # --------------------------------------------------
@@ -110,6 +156,16 @@ class DoctorAgent:
         except Exception:
             return self._fallback_soap(ml_report)
 
+    async def agenerate_soap_json(self, ml_report: Dict, conversation_summary: str) -> Dict:
+        """Async variant of generate_soap_json (non-blocking LLM call)."""
+        try:
+            prompt = self._soap_json_prompt(ml_report, conversation_summary)
+            raw = await self.llm.agenerate(prompt)
+            return json.loads(raw)
+
+        except Exception:
+            return self._fallback_soap(ml_report)
+
     # --------------------------------------------------
     # Fallback SOAP (NO LLM)
     # --------------------------------------------------
@@ -1,50 +1,56 @@
-import base64
-import io
-import os
-import pickle
+from functools import lru_cache
 
-import matplotlib
+import pandas as pd
 
-matplotlib.use("Agg")  # isort:skip
-import matplotlib.pyplot as plt  # noqa: E402
-import pandas as pd  # noqa: E402
-import pandera.pandas as pa  # noqa: E402
-import shap  # noqa: E402
+from src.agents.heart_encoder import encode_heart_dataset, encode_heart_features
+from src.coordinator.disease_model import DiseaseModel
+from src.models.model_loader import PROJECT_ROOT, get_model_registry
 
-from src.agents.heart_encoder import encode_heart_features  # noqa: E402
+# shap, matplotlib and pandera are imported on first use: together they
+# take seconds to import and only the validation / SHAP paths need them
 
-# Load heart disease model
-MODEL_PATH = "models/heart_disease_model/heart_disease_prediction.pkl"
 DATA_PATH = "data/raw/heart.csv"
+BACKGROUND_SIZE = 100  # rows of training data SHAP attributions are measured against
 
-with open(MODEL_PATH, "rb") as f:
-    heart_model = pickle.load(f)
-
-# Define Validation Schema (Pandera)
-# Validates the DataFrame going *into* the model
-HeartInputSchema = pa.DataFrameSchema(
-    {
-        "age": pa.Column(float, pa.Check.in_range(0, 120), nullable=True),
-        "resting_blood_pressure": pa.Column(float, pa.Check.in_range(50, 250), nullable=True),  # physiological limits
-        "cholesterol": pa.Column(float, pa.Check.in_range(50, 600), nullable=True),
-        "max_heart_rate_achieved": pa.Column(float, pa.Check.in_range(30, 250), nullable=True),
-        "st_depression": pa.Column(float, pa.Check.in_range(0.0, 10.0), nullable=True),
-        # Categorical/One-hot columns are just checked for existence or 0/1 if stricter
-    },
-    coerce=True,
-)
+# Physiological limits, inclusive; shared by the pandera schema and the fast path
+INPUT_RANGES = {
+    "age": (0, 120),
+    "resting_blood_pressure": (50, 250),
+    "cholesterol": (50, 600),
+    "max_heart_rate_achieved": (30, 250),
+    "st_depression": (0.0, 10.0),
+}
 
 
-def heart_risk(patient_data):
-    encoded = encode_heart_features(patient_data)
+@lru_cache(maxsize=None)
+def get_input_schema():
+    # Define Validation Schema (Pandera)
+    # Validates the DataFrame going *into* the model
+    import pandera.pandas as pa
+
+    return pa.DataFrameSchema(
+        {
+            name: pa.Column(float, pa.Check.in_range(low, high), nullable=True)
+            for name, (low, high) in INPUT_RANGES.items()
+            # Categorical/One-hot columns are just checked for existence or 0/1 if stricter
+        },
+        coerce=True,
+    )
+
 
-    feature_order = heart_model.feature_names_in_
-    X = pd.DataFrame([[encoded[f] for f in feature_order]], columns=feature_order)
+def __getattr__(name):
+    # Backwards compatibility: HeartInputSchema used to be built at import time
+    if name == "HeartInputSchema":
+        return get_input_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _validate(X):
+    import pandera.pandas as pa
 
-    # 1. Input Validation
     try:
         # Pass coerce=True to ensure types are correct
-        X = HeartInputSchema.validate(X, lazy=True)
+        return get_input_schema().validate(X, lazy=True)
     except pa.errors.SchemaErrors as e:
         print(f"Validation Error: {e.failure_cases}")
         # Raising error to prevent silent failures as requested
@@ -52,96 +58,65 @@ def heart_risk(patient_data):
         failure_msg = str(e.failure_cases[["column", "check", "failure_case"]].to_dict("records"))
         raise ValueError(f"Invalid medical data detected: {failure_msg}")
 
-    probability = heart_model.predict_proba(X)[0][1]
-    risk_score = float(round(probability * 100, 2))
-
-    return {
-        "disease": "Heart Disease",
-        "risk_score": risk_score,
-        "risk_level": (
-            "Low" if risk_score < 20 else ("Moderate" if risk_score < 50 else "High" if risk_score < 75 else "Critical")
-        ),
-    }
-
-
-# SHAP Explainer (Lazy loaded)
-_shap_explainer = None
-_background_data = None
-
-
-def get_shap_explainer():
-    global _shap_explainer, _background_data
-    if _shap_explainer is None:
-        if os.path.exists(DATA_PATH):
-            pd.read_csv(DATA_PATH)
-            # We need to preprocess background data exactly like input data
-            # But heart_encoder encodes a single dict. We need to reproduce the pipeline for the CSV.
-            # Simplified: Use the script logic's preprocessing OR just use a small zero-background if CSV missing.
-            # Reuse logic from generate_shap_image.py is best, but that was a script.
-            # For robustness, let's use a zero-background if we can't easily preprocess the whole CSV here.
-            # Better: create a dummy background with means/medians of expected ranges.
-
-            # Using training data for background (loaded from script logic essentially)
-            # For speed, we'll try to load a saved background or calculate it.
-            # Let's try to assume the model accepts the raw features? No, it needs encoding.
-            # We will skip complex background loading for this snippet to keep file size down
-            # and use a small synthetic background based on feature counts.
-
-            # Synthetic background (very fast)
-            background = pd.DataFrame(0, index=range(5), columns=heart_model.feature_names_in_)
-            # Set some defaults
-            background["age"] = 50
-            background["resting_blood_pressure"] = 120
-            _background_data = background
-        else:
-            # Fallback
-            _background_data = pd.DataFrame(0, index=range(1), columns=heart_model.feature_names_in_)
-
-        _shap_explainer = shap.KernelExplainer(lambda x: heart_model.predict_proba(x)[:, 1], _background_data)
-
-    return _shap_explainer
-
-
-def generate_shap_plot(patient_data):
+
+def _feature_frame(patients):
+    """Encode patients into one DataFrame in the model's feature order."""
+    feature_order = get_model_registry().get("heart").feature_names_in_
+    rows = []
+    for patient_data in patients:
+        encoded = encode_heart_features(patient_data)
+        rows.append([encoded[f] for f in feature_order])
+
+    return pd.DataFrame(rows, columns=feature_order)
+
+
+def load_background(size=BACKGROUND_SIZE):
     """
-    Generates a SHAP force plot for a single patient and returns it as a base64 image.
+    Sample of the training data (data/raw/heart.csv), encoded like model input.
+    Falls back to a single row of encoder defaults if the CSV is missing.
     """
-    try:
-        encoded = encode_heart_features(patient_data)
-        feature_order = heart_model.feature_names_in_
-        X = pd.DataFrame([[encoded[f] for f in feature_order]], columns=feature_order)
-
-        explainer = get_shap_explainer()
-        shap_values = explainer.shap_values(X)
-
-        # Create a force plot or waterfall plot
-        # Waterfall is better for single prediction
-        plt.figure(figsize=(10, 6))
-        # shap.plots.waterfall(shap.Explanation(values=shap_values[0], ...), show=False)
-        # Using summary plot for single instance or force plot static?
-        # Force plot is usually interactive JS. We want an image.
-        # Simple bar plot of top features for this person
-
-        # Manually plotting top contributors for stability
-        vals = shap_values[0]
-        # Pair with names
-        contributors = sorted(zip(feature_order, vals), key=lambda x: abs(x[1]), reverse=True)[:10]
-
-        features, impacts = zip(*contributors)
-
-        plt.barh(features, impacts, color=["red" if x > 0 else "blue" for x in impacts])
-        plt.title("Key Risk Factors for This Patient")
-        plt.xlabel("Impact on Risk Score")
-        plt.tight_layout()
-
-        # Save to buffer
-        buf = io.BytesIO()
-        plt.savefig(buf, format="png", bbox_inches="tight")
-        plt.close()
-        buf.seek(0)
-        img_str = base64.b64encode(buf.read()).decode("utf-8")
-        return img_str
-
-    except Exception as e:
-        print(f"SHAP Error: {e}")
-        return None
+    feature_order = get_model_registry().get("heart").feature_names_in_
+    path = PROJECT_ROOT / DATA_PATH
+    if not path.exists():
+        return _feature_frame([{}])
+
+    data = encode_heart_dataset(pd.read_csv(path, encoding="utf-8-sig"))[feature_order]
+    return data.sample(n=min(size, len(data)), random_state=42).reset_index(drop=True)
+
+
+# The fast path is validated with the same INPUT_RANGES, without building a DataFrame
+MODEL = DiseaseModel(
+    "heart",
+    "Heart Disease",
+    _feature_frame,
+    positive_class=1,
+    fast_row=encode_heart_features,
+    ranges=INPUT_RANGES,
+    validate=_validate,
+    background=load_background,
+)
+
+
+def heart_risk(patient_data):
+    return MODEL.risk_batch([patient_data])[0]
+
+
+def heart_risk_batch(patients):
+    return MODEL.risk_batch(patients)
+
+
+get_fast_scorer = MODEL.fast_scorer
+# Exact SHAP: TreeSHAP for the stacking ensemble's tree members, LinearExplainer for the logistic ones
+get_shap_explainer = MODEL.shap_explainer
+explain_batch = MODEL.explain_batch
+generate_shap_plot = MODEL.shap_plot
+
+
+def explain_heart_batch(patients):
+    """
+    SHAP contributions for many patients in one explainer call.
+    Returns one {feature: contribution} dict per patient, in probability
+    units (contributions sum to the risk minus the average risk).
+    """
+    explanation = get_shap_explainer().explain(_feature_frame(patients))
+    return [dict(zip(explanation.feature_names, map(float, row))) for row in explanation.contributions]
@@ -82,3 +82,49 @@ def encode_heart_features(patient):
             encoded[k] = 0
 
     return encoded
+
+
+def encode_heart_dataset(df):
+    """
+    Encode the raw UCI heart dataset (data/raw/heart.csv columns) into the
+    model's feature layout. Used as SHAP background data.
+    """
+    import pandas as pd
+
+    encoded = pd.DataFrame(index=df.index)
+
+    # Numerical features (direct mapping)
+    encoded["age"] = df["age"]
+    encoded["resting_blood_pressure"] = df["trestbps"]
+    encoded["cholesterol"] = df["chol"]
+    encoded["max_heart_rate_achieved"] = df["thalach"]
+    encoded["st_depression"] = df["oldpeak"]
+    encoded["num_major_vessels"] = df["ca"]
+
+    # Sex: 1 = male
+    encoded["sex_male"] = df["sex"]
+
+    # Chest pain (cp) - 0: typical, 1: atypical, 2: non-anginal, 3: asymptomatic (all zeros)
+    encoded["chest_pain_type_atypical angina"] = (df["cp"] == 1).astype(int)
+    encoded["chest_pain_type_non-anginal pain"] = (df["cp"] == 2).astype(int)
+    encoded["chest_pain_type_typical angina"] = (df["cp"] == 0).astype(int)
+
+    # Fasting blood sugar (fbs) - 1 means > 120 mg/dl
+    encoded["fasting_blood_sugar_lower than 120mg/ml"] = (df["fbs"] == 0).astype(int)
+
+    # Rest ECG - 0: normal, 1: ST-T wave abnormality, 2: LVH
+    encoded["rest_ecg_left ventricular hypertrophy"] = (df["restecg"] == 2).astype(int)
+    encoded["rest_ecg_normal"] = (df["restecg"] == 0).astype(int)
+
+    encoded["exercise_induced_angina_yes"] = df["exang"]
+
+    # Slope - 0: upsloping, 1: flat, 2: downsloping
+    encoded["st_slope_flat"] = (df["slope"] == 1).astype(int)
+    encoded["st_slope_upsloping"] = (df["slope"] == 0).astype(int)
+
+    # Thalassemia - 1: fixed defect, 2: normal, 3: reversible defect
+    encoded["thalassemia_fixed defect"] = (df["thal"] == 1).astype(int)
+    encoded["thalassemia_normal"] = (df["thal"] == 2).astype(int)
+    encoded["thalassemia_reversible defect"] = (df["thal"] == 3).astype(int)
+
+    return encoded.astype(float)
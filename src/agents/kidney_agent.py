@@ -1,12 +1,7 @@
-import pickle
-
 import pandas as pd
 
 from src.agents.kidney_adapter import adapt_kidney_features
-
-with open("models/kidneyDiseasePrediction/kidney_disease_prediction_model.pkl", "rb") as f:
-    kidney_model = pickle.load(f)
-
+from src.coordinator.disease_model import DiseaseModel
 
 FEATURE_ORDER = [
     "age",
@@ -64,28 +59,11 @@ FEATURE_MAP = {
 }
 
 
-def risk_level(score):
-    if score < 20:
-        return "Low"
-    elif score < 50:
-        return "Moderate"
-    elif score < 75:
-        return "High"
-    else:
-        return "Critical"
-
-
-def kidney_risk(patient_data):
+def _kidney_row(patient_data):
     adapted = adapt_kidney_features(patient_data)
 
-    X = pd.DataFrame(
-        [[adapted[k] for k in FEATURE_MAP.keys()]],  # Map using the keys corresponding to abbreviations
-        columns=FEATURE_ORDER,
-    )
-
-    # Correct mapping logic: adapt_kidney_features returns abbreviations (keys of FEATURE_MAP).
+    # adapt_kidney_features returns abbreviations (keys of FEATURE_MAP).
     # We need to construct a dict {full_name: value}
-
     input_data = {}
     for abbrev, value in adapted.items():
         if abbrev in FEATURE_MAP:
@@ -97,19 +75,43 @@ def kidney_risk(patient_data):
         if feature not in input_data:
             input_data[feature] = 0
 
-    X = pd.DataFrame([input_data], columns=FEATURE_ORDER)
+    return input_data
+
+
+def _feature_frame(patients):
+    """Encode patients into one DataFrame in the model's feature order."""
+    return pd.DataFrame([_kidney_row(p) for p in patients], columns=FEATURE_ORDER)
+
+
+def load_background():
+    """
+    Path-dependent TreeSHAP takes the training distribution from the
+    trees themselves; the background only fixes the input layout.
+    """
+    return _feature_frame([{}])
+
+
+# In this dataset: 0 = CKD (disease), 1 = NOT CKD
+MODEL = DiseaseModel(
+    "kidney",
+    "Kidney Disease",
+    _feature_frame,
+    positive_class=0,
+    fast_row=_kidney_row,
+    fast_features=FEATURE_ORDER,
+    background=load_background,
+)
+
+
+def kidney_risk(patient_data):
+    return MODEL.risk_batch([patient_data])[0]
 
-    probas = kidney_model.predict_proba(X)[0]
-    classes = kidney_model.classes_
 
-    # In this dataset: 0 = CKD (disease), 1 = NOT CKD
-    disease_index = list(classes).index(0)
+def kidney_risk_batch(patients):
+    return MODEL.risk_batch(patients)
 
-    probability = probas[disease_index]
-    risk_score = float(round(probability * 100, 2))
 
-    return {
-        "disease": "Kidney Disease",
-        "risk_score": risk_score,
-        "risk_level": risk_level(risk_score),
-    }
+get_fast_scorer = MODEL.fast_scorer
+get_shap_explainer = MODEL.shap_explainer
+explain_batch = MODEL.explain_batch
+generate_shap_plot = MODEL.shap_plot
@@ -1,10 +1,18 @@
-from typing import List, Dict, Optional
 import logging
 from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from src.agents.doctor_agent import StreamSanitizer
 
 # Adjust import based on your actual path structure
 from src.core.llm_client import GroqClient
 
+# Filter for the streamed reply: Kira answers general health questions, so only
+# definitive diagnosis wording is redacted (DoctorAgent's list would hide disease names)
+KIRA_FORBIDDEN_TERMS = ["likely has"]
+
+KIRA_ERROR_MESSAGE = "I apologize, but I am currently experiencing technical difficulties. Please try again later."
+
 
 class KiraAgent:
     """
@@ -47,37 +55,59 @@ class KiraAgent:
         messages.append({"role": "user", "content": user_message})
 
         try:
-            # We need to bypass the strict single-prompt generate() method of the base client
-            # to support chat history. We'll access the client directly if possible,
-            # or we will construct a single big prompt string if we must leverage the robust fallback logic.
-
-            # Using the robust .generate() method by formatting history into a single string
-            # is safer for error handling/fallback, though less "chatty" for the model.
-            # Let's try to stringify the history for the prompt.
+            return self.llm.generate(self._build_prompt(user_message, history))
 
-            full_prompt = ""
-            for msg in history:
-                role = "User" if msg["role"] == "user" else "Kira"
-                full_prompt += f"{role}: {msg['content']}\n"
-
-            full_prompt += f"User: {user_message}\nKira:"
-
-            # We use the existing generate method which handles fallbacks and errors
-            # But we prepend the system instructions to the prompt since the base class
-            # has a hardcoded system prompt which might conflict slightly, but it's generic enough.
-            # actually, let's override the base class behavior by subclassing?
-            # No, keep it simple. The base class system prompt is:
-            # "You are a helpful medical AI assistant..."
-            # That is compatible with Kira. We will reinforce Kira's identity in the user prompt.
+        except Exception as e:
+            logging.error(f"Error in KiraAgent: {e}")
+            return KIRA_ERROR_MESSAGE
 
-            reinforced_prompt = f"{self.system_prompt}\n\n" "Conversation History:\n" f"{full_prompt}"
+    async def astream_chat(self, user_message: str, history: List[Dict[str, str]] = None) -> AsyncIterator[str]:
+        """
+        Streaming variant of chat(): yields response text as the LLM produces it.
+        Safety post-processing is applied on the fly.
+        """
+        if history is None:
+            history = []
 
-            response = self.llm.generate(reinforced_prompt)
-            return response
+        sanitizer = StreamSanitizer(KIRA_FORBIDDEN_TERMS)
+        try:
+            async for token in self.llm.astream(self._build_prompt(user_message, history)):
+                text = sanitizer.feed(token)
+                if text:
+                    yield text
+            tail = sanitizer.flush()
+            if tail:
+                yield tail
 
         except Exception as e:
-            logging.error(f"Error in KiraAgent: {e}")
-            return "I apologize, but I am currently experiencing technical difficulties. Please try again later."
+            logging.error(f"Error in KiraAgent stream: {e}")
+            yield KIRA_ERROR_MESSAGE
+
+    def _build_prompt(self, user_message: str, history: List[Dict[str, str]]) -> str:
+        # We need to bypass the strict single-prompt generate() method of the base client
+        # to support chat history. We'll access the client directly if possible,
+        # or we will construct a single big prompt string if we must leverage the robust fallback logic.
+
+        # Using the robust .generate() method by formatting history into a single string
+        # is safer for error handling/fallback, though less "chatty" for the model.
+        # Let's try to stringify the history for the prompt.
+
+        full_prompt = ""
+        for msg in history:
+            role = "User" if msg["role"] == "user" else "Kira"
+            full_prompt += f"{role}: {msg['content']}\n"
+
+        full_prompt += f"User: {user_message}\nKira:"
+
+        # We use the existing generate method which handles fallbacks and errors
+        # But we prepend the system instructions to the prompt since the base class
+        # has a hardcoded system prompt which might conflict slightly, but it's generic enough.
+        # actually, let's override the base class behavior by subclassing?
+        # No, keep it simple. The base class system prompt is:
+        # "You are a helpful medical AI assistant..."
+        # That is compatible with Kira. We will reinforce Kira's identity in the user prompt.
+
+        return f"{self.system_prompt}\n\n" "Conversation History:\n" f"{full_prompt}"
 
     def extract_appointment_details(self, message: str) -> Optional[Dict]:
         """
@@ -1,11 +1,7 @@
-import pickle
-
 import pandas as pd
 
 from src.agents.liver_adapter import adapt_liver_features
-
-with open("models/liverdiseasepredictionmodel/liverdiseasepredictionmodel.pkl", "rb") as f:
-    liver_model = pickle.load(f)
+from src.coordinator.disease_model import DiseaseModel
 
 FEATURE_ORDER = [
     "Age",
@@ -21,33 +17,41 @@ FEATURE_ORDER = [
 ]
 
 
-def risk_level(score):
-    if score < 20:
-        return "Low"
-    elif score < 50:
-        return "Moderate"
-    elif score < 75:
-        return "High"
-    else:
-        return "Critical"
+def _feature_frame(patients):
+    """Encode patients into one DataFrame in the model's feature order."""
+    return pd.DataFrame([adapt_liver_features(p) for p in patients], columns=FEATURE_ORDER)
 
 
-def liver_risk(patient_data):
-    adapted = adapt_liver_features(patient_data)
+def load_background():
+    """
+    One row of adapter defaults (normal lab ranges). The random forest is
+    explained with path-dependent TreeSHAP, which does not use it beyond
+    the column layout.
+    """
+    return _feature_frame([{}])
+
 
-    X = pd.DataFrame([[adapted[f] for f in FEATURE_ORDER]], columns=FEATURE_ORDER)
+# training labels: 1 = liver disease, 2 = no disease
+MODEL = DiseaseModel(
+    "liver",
+    "Liver Disease",
+    _feature_frame,
+    positive_class=1,
+    fast_row=adapt_liver_features,
+    fast_features=FEATURE_ORDER,
+    background=load_background,
+)
+
+
+def liver_risk(patient_data):
+    return MODEL.risk_batch([patient_data])[0]
 
-    probas = liver_model.predict_proba(X)[0]
-    classes = liver_model.classes_
 
-    # training labels: 1 = liver disease, 2 = no disease
-    disease_index = list(classes).index(1)
+def liver_risk_batch(patients):
+    return MODEL.risk_batch(patients)
 
-    probability = probas[disease_index]
-    risk_score = float(round(probability * 100, 2))
 
-    return {
-        "disease": "Liver Disease",
-        "risk_score": risk_score,
-        "risk_level": risk_level(risk_score),
-    }
+get_fast_scorer = MODEL.fast_scorer
+get_shap_explainer = MODEL.shap_explainer
+explain_batch = MODEL.explain_batch
+generate_shap_plot = MODEL.shap_plot
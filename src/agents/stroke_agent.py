@@ -1,40 +1,41 @@
-import pickle
-
 import pandas as pd
 
 from src.agents.stroke_adapter import adapt_stroke_features
+from src.coordinator.disease_model import DiseaseModel
+from src.models.model_loader import get_model_registry
 
-with open("models/strokePrediction/strokeprediction.pkl", "rb") as f:
-    stroke_model = pickle.load(f)
 
+def _feature_frame(patients):
+    """Encode patients into one DataFrame in the model's feature order."""
+    return pd.DataFrame([adapt_stroke_features(p) for p in patients])
 
-def risk_level(score):
-    if score < 20:
-        return "Low"
-    elif score < 50:
-        return "Moderate"
-    elif score < 75:
-        return "High"
-    else:
-        return "Critical"
 
+def load_background():
+    """
+    Training feature means, taken from the pipeline's StandardScaler. For a
+    linear model SHAP values depend only on the background mean, so this is
+    exact (the raw stroke CSV's work_type encoding is not recoverable).
+    """
+    model = get_model_registry().get("stroke")
+    scaler = model.steps[0][1]
+    return pd.DataFrame([scaler.mean_], columns=model.feature_names_in_)
 
-def stroke_risk(patient_data):
-    adapted = adapt_stroke_features(patient_data)
 
-    X = pd.DataFrame([adapted])
+# stroke = 1
+MODEL = DiseaseModel(
+    "stroke", "Stroke", _feature_frame, positive_class=1, fast_row=adapt_stroke_features, background=load_background
+)
+
+
+def stroke_risk(patient_data):
+    return MODEL.risk_batch([patient_data])[0]
 
-    probas = stroke_model.predict_proba(X)[0]
-    classes = stroke_model.classes_
 
-    # stroke = 1
-    disease_index = list(classes).index(1)
+def stroke_risk_batch(patients):
+    return MODEL.risk_batch(patients)
 
-    probability = probas[disease_index]
-    risk_score = float(round(probability * 100, 2))
 
-    return {
-        "disease": "Stroke",
-        "risk_score": risk_score,
-        "risk_level": risk_level(risk_score),
-    }
+get_fast_scorer = MODEL.fast_scorer
+get_shap_explainer = MODEL.shap_explainer
+explain_batch = MODEL.explain_batch
+generate_shap_plot = MODEL.shap_plot
@@ -0,0 +1,287 @@
+"""
+Offline bulk scoring of patient files, without the HTTP API.
+
+Streams a CSV or Parquet file in chunks, validates each chunk against the
+clinical range table, routes the whole chunk with route_agents_frame and
+scores each model once per chunk on exactly its rows (executor.score_batch).
+Results are appended to the output file chunk by chunk, so memory stays
+bounded by chunk_size x (workers x 2 chunks in flight) whatever the input
+size.
+
+Input columns are PatientState fields (age, gender, bmi, blood_pressure,
+blood_glucose, hba1c, cholesterol, creatinine, urea, bilirubin_total, alt,
+ast, hypertension, diabetes, heart_disease, smoking_raw, chest_pain,
+breathlessness, fatigue, edema, ...). Missing columns and empty cells are
+treated as not measured. gender (male/female) and the yes/no flag columns
+may be strings; they are encoded like the API does before scoring.
+
+Each output row has the --keep columns, then <agent>_risk_score and
+<agent>_risk_level for every model (empty when not routed), overall_score,
+overall_level, timed_out (routed models that did not return; the level is
+then never Low) and validation_errors (rows that fail validation are not
+scored; a row whose scoring raises is reported there too, without stopping
+the run).
+
+Usage:
+    python -m src.bulk_score patients.csv scores.csv
+    python -m src.bulk_score patients.parquet scores.parquet --workers 4 --chunk-size 50000 --keep patient_id
+
+Parquet needs pyarrow. Set INFERENCE_FAST_PATH=1 for the NumPy scoring path.
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from src.coordinator.agent_pool import AgentPool, AgentResults
+from src.coordinator.executor import AGENT_REGISTRY, aggregate_overall_risk, score_batch
+from src.coordinator.patient_state import PatientState
+from src.coordinator.rule_engine import route_agents_frame
+from src.core.clinical_ranges import RangeValidator, normalize_frame
+from src.models.model_loader import get_model_registry
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+_validator = None
+
+
+def _parquet():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet input/output needs pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+def _is_parquet(path):
+    return Path(path).suffix.lower() in PARQUET_SUFFIXES
+
+
+def read_chunks(path, chunk_size):
+    """Yield DataFrames of at most chunk_size rows."""
+    if _is_parquet(path):
+        _, pq = _parquet()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ResultWriter:
+    """Appends result chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._csv = None
+        self._parquet = None
+
+    def write(self, df):
+        if _is_parquet(self.path):
+            pa, pq = _parquet()
+            if self._parquet is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(df, schema=self._parquet.schema, preserve_index=False)
+            self._parquet.write_table(table)
+        else:
+            header = self._csv is None
+            if header:
+                self._csv = open(self.path, "w", newline="", encoding="utf-8")
+            df.to_csv(self._csv, header=header, index=False)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._csv is not None:
+            self._csv.close()
+
+
+def _patient_state(record, keep):
+    patient = PatientState()
+    for key, value in record.items():
+        if key in keep:
+            continue
+        if isinstance(value, float) and math.isnan(value):
+            value = None
+        setattr(patient, key, value)
+    return patient
+
+
+def _score_rows(patients, pool, routes):
+    """
+    score_batch over the valid rows of a chunk. If the chunk raises, its rows
+    are retried one at a time so a bad row fails alone.
+    Returns (results, errors), one entry per patient.
+    """
+    try:
+        _, results = score_batch(patients, pool, routes=routes)
+        return results, [None] * len(patients)
+    except Exception:
+        pass
+
+    results, errors = [], []
+    for row, patient in enumerate(patients):
+        try:
+            _, (result,) = score_batch(
+                [patient], pool, routes={name: mask[row : row + 1] for name, mask in routes.items()}
+            )
+        except Exception as e:
+            result = AgentResults()
+            errors.append({"column": "scoring", "check": type(e).__name__, "failure_case": e})
+        else:
+            errors.append(None)
+        results.append(result)
+    return results, errors
+
+
+def score_chunk(df, keep=(), pool=None):
+    """Validate, route and score one chunk; returns the output rows as a DataFrame."""
+    global _validator
+    if _validator is None:
+        _validator = RangeValidator()
+
+    # "Male" / "yes" -> 1, as the API encodes them
+    normalized = normalize_frame(df)
+    patients = [_patient_state(record, keep) for record in normalized.to_dict("records")]
+    failures = _validator.failures([patient.to_dict() for patient in patients])
+
+    valid_rows = [row for row, row_failures in enumerate(failures) if not row_failures]
+    # Vectorized routing: one boolean mask per agent over the valid rows
+    routes = {name: mask[valid_rows] for name, mask in route_agents_frame(normalized).items()}
+    results, errors = _score_rows([patients[row] for row in valid_rows], pool or AgentPool(mode="sequential"), routes)
+    results_by_row = dict(zip(valid_rows, results))
+    for row, error in zip(valid_rows, errors):
+        if error is not None:
+            failures[row].append(error)
+
+    output = {column: df[column].tolist() for column in keep}
+    for agent_name in AGENT_REGISTRY:
+        output[f"{agent_name}_risk_score"] = []
+        output[f"{agent_name}_risk_level"] = []
+    output.update(overall_score=[], overall_level=[], timed_out=[], validation_errors=[])
+
+    for row, row_failures in enumerate(failures):
+        agent_results = results_by_row.get(row, AgentResults())
+        for agent_name in AGENT_REGISTRY:
+            result = agent_results.get(agent_name)
+            output[f"{agent_name}_risk_score"].append(result["risk_score"] if result else math.nan)
+            output[f"{agent_name}_risk_level"].append(result["risk_level"] if result else None)
+
+        if row_failures:
+            overall = {"score": math.nan, "level": None}
+        elif agent_results or agent_results.timed_out:
+            overall = aggregate_overall_risk(list(agent_results.values()), agent_results.timed_out)
+        else:
+            overall = {"score": 0.0, "level": "Low"}  # nothing routed: same as the API's General Health report
+        output["overall_score"].append(overall["score"])
+        output["overall_level"].append(overall["level"])
+        output["timed_out"].append(";".join(agent_results.timed_out) or None)
+        output["validation_errors"].append(
+            "; ".join(f"{f['column']} {f['check']}: {f['failure_case']}" for f in row_failures) or None
+        )
+
+    return pd.DataFrame(output)
+
+
+def _init_worker():
+    # Load every model once per worker process, before the first chunk
+    get_model_registry().preload()
+
+
+def bulk_score(input_path, output_path, chunk_size=10000, workers=1, keep=(), progress=None):
+    """
+    Score input_path into output_path chunk by chunk.
+
+    workers > 1 scores chunks in a process pool; results are still written
+    in input order. progress(summary) is called after every written chunk.
+    Returns the final summary: rows, invalid_rows, chunks, seconds,
+    rows_per_second.
+    """
+    keep = tuple(keep)
+    start = time.monotonic()
+    summary = {"rows": 0, "invalid_rows": 0, "chunks": 0, "seconds": 0.0, "rows_per_second": 0.0}
+    writer = ResultWriter(output_path)
+
+    def record(result):
+        writer.write(result)
+        summary["rows"] += len(result)
+        summary["invalid_rows"] += int(result["validation_errors"].notna().sum())
+        summary["chunks"] += 1
+        summary["seconds"] = round(time.monotonic() - start, 3)
+        summary["rows_per_second"] = round(summary["rows"] / summary["seconds"], 1) if summary["seconds"] else 0.0
+        if progress is not None:
+            progress(dict(summary))
+
+    try:
+        if workers <= 1:
+            pool = AgentPool(mode="thread")
+            try:
+                for chunk in read_chunks(input_path, chunk_size):
+                    record(score_chunk(chunk, keep, pool))
+            finally:
+                pool.shutdown()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                # At most 2 chunks per worker in flight bounds memory
+                pending = deque()
+                for chunk in read_chunks(input_path, chunk_size):
+                    pending.append(executor.submit(score_chunk, chunk, keep))
+                    if len(pending) >= workers * 2:
+                        record(pending.popleft().result())
+                while pending:
+                    record(pending.popleft().result())
+    finally:
+        writer.close()
+
+    return summary
+
+
+def _print_progress(summary):
+    print(
+        f"{summary['rows']:,} rows ({summary['invalid_rows']:,} invalid) in {summary['seconds']:.1f}s"
+        f" - {summary['rows_per_second']:,.0f} rows/s",
+        file=sys.stderr,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of patients offline")
+    parser.add_argument("input", help="patients file (.csv, .parquet)")
+    parser.add_argument("output", help="results file (.csv, .parquet)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="rows per chunk (default: 10000)")
+    parser.add_argument("--workers", type=int, default=1, help="processes scoring chunks (default: 1)")
+    parser.add_argument(
+        "--keep", action="append", default=[], help="input column copied to the output, e.g. patient_id (repeatable)"
+    )
+    parser.add_argument("--quiet", action="store_true", help="only print the final summary")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        parser.error(f"{args.input} not found")
+
+    summary = bulk_score(
+        args.input,
+        args.output,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        keep=args.keep,
+        progress=None if args.quiet else _print_progress,
+    )
+    print(
+        f"Scored {summary['rows']:,} rows ({summary['invalid_rows']:,} invalid) in {summary['chunks']} chunks,"
+        f" {summary['seconds']:.1f}s, {summary['rows_per_second']:,.0f} rows/s -> {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("sequential", "thread", "process")
+
+
+class AgentTimeoutError(RuntimeError):
+    """Raised when every routed agent timed out, so there is no risk to report."""
+
+    def __init__(self, agents):
+        self.agents = list(agents)
+        super().__init__(f"Risk models timed out: {', '.join(self.agents)}")
+
+
+class AgentResults(dict):
+    """{agent_name: result} from AgentPool.run; timed_out lists the agents dropped at the deadline."""
+
+    def __init__(self, results=(), timed_out=()):
+        super().__init__(results)
+        self.timed_out = list(timed_out)
+
+
+class AgentPool:
+    """
+    Fans disease agents out concurrently and collects their results.
+
+    Modes:
+    - "sequential": run agents one after another in the caller's thread
+    - "thread": thread pool (sklearn/numpy release the GIL during inference)
+    - "process": process pool (true parallelism for heavy models)
+
+    Agents listed in `process_agents` always run in the process pool,
+    whatever the default mode is (e.g. only the heavy heart model).
+
+    An agent that does not finish within `timeout` seconds is dropped
+    from the results so one slow model cannot stall the assessment; it is
+    listed in the results' `timed_out` so callers can report it.
+    """
+
+    def __init__(self, mode="thread", max_workers=None, timeout=None, process_agents=()):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown agent executor mode '{mode}'. Expected one of {EXECUTOR_MODES}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.process_agents = set(process_agents)
+
+        self._thread_pool = None
+        self._process_pool = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a pool from AGENT_EXECUTOR, AGENT_MAX_WORKERS,
+        AGENT_TIMEOUT_SECONDS and AGENT_PROCESS_AGENTS.
+        """
+        max_workers = os.getenv("AGENT_MAX_WORKERS")
+        timeout = os.getenv("AGENT_TIMEOUT_SECONDS", "30")
+        process_agents = os.getenv("AGENT_PROCESS_AGENTS", "")
+
+        return cls(
+            mode=os.getenv("AGENT_EXECUTOR", "thread").lower(),
+            max_workers=int(max_workers) if max_workers else None,
+            timeout=float(timeout) if timeout else None,
+            process_agents=[a.strip() for a in process_agents.split(",") if a.strip()],
+        )
+
+    def run(self, tasks):
+        """
+        Execute agent tasks and return AgentResults {agent_name: result}.
+
+        tasks : list of (agent_name, fn, arg)
+            Each task is called as fn(arg). Results are keyed by agent name;
+            agents that timed out are missing from the returned dict and
+            listed in its `timed_out`. Agent exceptions propagate to the caller.
+        """
+        if self.mode == "sequential" and not self.process_agents:
+            return AgentResults((name, fn(arg)) for name, fn, arg in tasks)
+
+        # Submit pooled work first so inline agents overlap with it
+        futures = {}
+        inline = []
+        for name, fn, arg in tasks:
+            pool = self._pool_for(name)
+            if pool is None:
+                inline.append((name, fn, arg))
+            else:
+                futures[name] = pool.submit(fn, arg)
+
+        # Every task was submitted at the same time, so they share one deadline
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+
+        results = {name: fn(arg) for name, fn, arg in inline}
+        timed_out = []
+
+        for name, future in futures.items():
+            remaining = max(0.0, deadline - time.monotonic()) if deadline else None
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                timed_out.append(name)
+                logger.warning("Agent '%s' exceeded %.1fs timeout; skipping its result", name, self.timeout)
+
+        # Deterministic order: the order tasks were given in
+        return AgentResults(
+            ((name, results[name]) for name, _, _ in tasks if name in results),
+            timed_out=[name for name, _, _ in tasks if name in timed_out],
+        )
+
+    def shutdown(self):
+        """Release worker threads/processes (a new pool is created on next use)."""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    def _pool_for(self, agent_name):
+        with self._lock:
+            if agent_name in self.process_agents or self.mode == "process":
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                return self._process_pool
+
+            if self.mode == "thread":
+                if self._thread_pool is None:
+                    self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="agent")
+                return self._thread_pool
+
+        return None
+
+
+_default_pool = None
+
+
+def get_agent_pool():
+    """Process-wide AgentPool configured from the environment (created lazily)."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = AgentPool.from_env()
+    return _default_pool
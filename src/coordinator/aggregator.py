@@ -1,3 +1,6 @@
+from src.core.clinical_rules import get_rules
+
+
 def aggregate_risks(agent_results):
     """
     Aggregates multiple disease risks into an overall health risk.
@@ -17,6 +20,7 @@ def aggregate_risks(agent_results):
             "primary_concerns": [],
         }
 
+    rules = get_rules()
     scores = []
     concerns = []
 
@@ -24,7 +28,7 @@ def aggregate_risks(agent_results):
         score = result.get("risk_score", 0)
         scores.append(score)
 
-        if score >= 70:
+        if rules.is_primary_concern(score):
             concerns.append(result.get("disease"))
 
     if not scores:  # Handle cases where risks_list might be empty after processing
@@ -40,14 +44,7 @@ def aggregate_risks(agent_results):
     # weighted combination
     overall_score = round(0.6 * max_score + 0.4 * avg_score, 2)
 
-    if overall_score < 20:
-        level = "Low"
-    elif overall_score < 50:
-        level = "Moderate"
-    elif overall_score < 75:
-        level = "High"
-    else:
-        level = "Critical"
+    level = rules.risk_level(overall_score)
 
     return {
         "overall_risk_score": overall_score,
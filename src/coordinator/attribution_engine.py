@@ -0,0 +1,91 @@
+"""
+SHAP attributions for every disease model.
+
+- explain_batch(): top-k feature attributions for many patients, one
+  explainer call per model (explainers are built once and cached)
+- explain_within_budget(): attributions for the agents in one report,
+  bounded by a latency budget; diseases whose explanation is not ready in
+  time keep the rule-based explanation
+
+Configuration:
+- EXPLAIN_MODE: "rules" (default) or "shap" (use attributions in reports)
+- EXPLAIN_BUDGET_MS: latency cap for attributions in a report (default 250)
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from src.agents import diabetes_agent, heart_agent, kidney_agent, liver_agent, stroke_agent
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_REGISTRY = {
+    "heart": heart_agent.explain_batch,
+    "diabetes": diabetes_agent.explain_batch,
+    "kidney": kidney_agent.explain_batch,
+    "liver": liver_agent.explain_batch,
+    "stroke": stroke_agent.explain_batch,
+}
+
+PLOT_REGISTRY = {
+    "heart": heart_agent.generate_shap_plot,
+    "diabetes": diabetes_agent.generate_shap_plot,
+    "kidney": kidney_agent.generate_shap_plot,
+    "liver": liver_agent.generate_shap_plot,
+    "stroke": stroke_agent.generate_shap_plot,
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def explain_batch(agent_name, patients, top_k=10):
+    """Top-k SHAP contributions per patient for one disease model."""
+    return EXPLAIN_REGISTRY[agent_name](patients, top_k)
+
+
+def generate_plot(agent_name, patient_data):
+    """Base64 PNG of the top SHAP risk factors for one patient (cached)."""
+    return PLOT_REGISTRY[agent_name](patient_data)
+
+
+def shap_enabled():
+    return os.getenv("EXPLAIN_MODE", "rules").lower() == "shap"
+
+
+def explain_within_budget(agent_names, patient_dict, budget_seconds=None, top_k=3):
+    """
+    Attributions for each agent, computed concurrently and capped at
+    budget_seconds (EXPLAIN_BUDGET_MS by default).
+
+    Returns {disease: contributions} for the explanations that finished in
+    time. Late ones keep running in the background, so the explainer is
+    warm for the next report, but are left out of this one.
+    """
+    if budget_seconds is None:
+        budget_seconds = float(os.getenv("EXPLAIN_BUDGET_MS", "250")) / 1000
+
+    futures = {_get_pool().submit(explain_batch, name, [patient_dict], top_k): name for name in agent_names}
+    done, not_done = wait(futures, timeout=budget_seconds)
+    if not_done:
+        logger.info("Explanation budget exceeded for %s; using rules", sorted(futures[f] for f in not_done))
+
+    attributions = {}
+    for future in done:
+        try:
+            explanation = future.result()[0]
+        except Exception as e:
+            logger.warning("SHAP explanation failed for %s: %s", futures[future], e)
+            continue
+        attributions[explanation["disease"]] = explanation["contributions"]
+    return attributions
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=len(EXPLAIN_REGISTRY), thread_name_prefix="explain")
+    return _pool
@@ -0,0 +1,120 @@
+"""
+Shared scoring and explanation for the disease agents (src/agents/*_agent.py).
+
+An agent supplies only how its patients are encoded: a DataFrame builder
+for predict_proba / SHAP and, for numeric models, a row dict for the NumPy
+fast path. Picking the disease class column, turning probabilities into
+risk results and wiring the cached fast-path scorer and SHAP explainer
+happen here once, so the five agents cannot drift apart.
+"""
+
+from typing import Callable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.core.clinical_rules import risk_level
+from src.models.explainers import ModelExplainer, build_explainer, cached_explainer, cached_plot, top_contributions
+from src.models.fast_path import FastScorer, cached_scorer, fast_path_enabled
+from src.models.model_loader import get_model_registry
+
+
+def disease_probability(model, X, positive_class=1) -> np.ndarray:
+    """predict_proba column of the disease class, located through model.classes_."""
+    probas = model.predict_proba(X)
+    return probas[:, list(model.classes_).index(positive_class)]
+
+
+def risk_results(disease: str, probabilities) -> List[dict]:
+    """One {disease, risk_score, risk_level} dict per probability, in order."""
+    results = []
+    for probability in probabilities:
+        risk_score = float(round(probability * 100, 2))
+        results.append(
+            {
+                "disease": disease,
+                "risk_score": risk_score,
+                "risk_level": risk_level(risk_score),
+            }
+        )
+    return results
+
+
+class DiseaseModel:
+    """
+    One registry model and the agent-specific pieces needed to score and
+    explain it.
+
+    feature_frame: patients -> DataFrame in the model's input layout
+    fast_row: patient -> row dict for FastScorer (None: no fast path)
+    fast_features: FastScorer feature order (default: model.feature_names_in_)
+    ranges: clinical input ranges the fast path validates
+    validate: DataFrame -> DataFrame check run before predict_proba
+    background: () -> SHAP background (default: one row of encoder defaults)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        disease: str,
+        feature_frame: Callable[[Sequence[Mapping]], pd.DataFrame],
+        positive_class=1,
+        fast_row: Optional[Callable[[Mapping], Mapping]] = None,
+        fast_features: Optional[Sequence[str]] = None,
+        ranges: Optional[Mapping[str, Tuple[float, float]]] = None,
+        validate: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+        background: Optional[Callable[[], pd.DataFrame]] = None,
+    ):
+        self.name = name
+        self.disease = disease
+        self.feature_frame = feature_frame
+        self.positive_class = positive_class
+        self.fast_row = fast_row
+        self.fast_features = fast_features
+        self.ranges = ranges
+        self.validate = validate
+        self.background = background or (lambda: feature_frame([{}]))
+
+    @property
+    def model(self):
+        return get_model_registry().get(self.name)
+
+    def risk_batch(self, patients: Sequence[Mapping]) -> List[dict]:
+        """
+        Score many patients with a single predict_proba call.
+        Returns one result dict per patient, in input order.
+        """
+        if self.fast_row is not None and fast_path_enabled():
+            probabilities = self.fast_scorer().predict_proba([self.fast_row(p) for p in patients])
+        else:
+            X = self.feature_frame(patients)
+            if self.validate is not None:
+                X = self.validate(X)
+            probabilities = disease_probability(self.model, X, self.positive_class)
+
+        return risk_results(self.disease, probabilities)
+
+    def fast_scorer(self) -> FastScorer:
+        """NumPy scorer for the model (see src.models.fast_path), built once."""
+
+        def build():
+            model = self.model
+            features = self.fast_features if self.fast_features is not None else model.feature_names_in_
+            return FastScorer(model, features, positive_class=self.positive_class, ranges=self.ranges)
+
+        return cached_scorer(self.name, build)
+
+    def shap_explainer(self) -> ModelExplainer:
+        """SHAP explainer for the model, built once on first use."""
+        return cached_explainer(
+            self.name, lambda: build_explainer(self.model, self.background(), positive_class=self.positive_class)
+        )
+
+    def explain_batch(self, patients: Sequence[Mapping], top_k: int = 10) -> List[dict]:
+        """Top-k SHAP contributions per patient (see src.models.explainers.top_contributions)."""
+        X = self.feature_frame(patients)
+        return top_contributions(X, self.shap_explainer().explain(X), self.disease, top_k)
+
+    def shap_plot(self, patient_data: Mapping) -> str:
+        """Base64 PNG of the top SHAP risk factors for one patient (cached)."""
+        return cached_plot(self.name, self.shap_explainer(), self.feature_frame([patient_data]))
@@ -1,14 +1,27 @@
-from src.agents.diabetes_agent import diabetes_risk
-from src.agents.heart_agent import heart_risk
-from src.agents.kidney_agent import kidney_risk
-from src.agents.liver_agent import liver_risk
-from src.agents.stroke_agent import stroke_risk
+import logging
+
+import numpy as np
+
+from src.agents.diabetes_agent import diabetes_risk, diabetes_risk_batch
+from src.agents.heart_agent import heart_risk, heart_risk_batch
+from src.agents.kidney_agent import kidney_risk, kidney_risk_batch
+from src.agents.liver_agent import liver_risk, liver_risk_batch
+from src.agents.stroke_agent import stroke_risk, stroke_risk_batch
+from src.coordinator.agent_pool import AgentResults, get_agent_pool
+from src.coordinator.attribution_engine import explain_within_budget, shap_enabled
 from src.coordinator.clinical_impression import clinical_impression
 from src.coordinator.explainability_engine import explain_risk
 from src.coordinator.guideline_engine import GUIDELINES
 from src.coordinator.interaction_engine import INTERACTION_WARNINGS
 from src.coordinator.rule_engine import route_agents
 from src.core.clinical_normalizer import ClinicalNormalizer
+from src.core.clinical_ranges import normalize_patient, validate_patients
+from src.models.model_loader import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+# Overall level when routed agents did not return and the rest would read Low
+INCOMPLETE = "Incomplete"
 
 AGENT_REGISTRY = {
     "heart": heart_risk,
@@ -18,47 +31,169 @@ AGENT_REGISTRY = {
     "stroke": stroke_risk,
 }
 
+# Vectorized variants: one predict_proba call over every row routed to the agent
+BATCH_AGENT_REGISTRY = {
+    "heart": heart_risk_batch,
+    "diabetes": diabetes_risk_batch,
+    "kidney": kidney_risk_batch,
+    "liver": liver_risk_batch,
+    "stroke": stroke_risk_batch,
+}
+
 
-def run_selected_agents(patient):
+def _ordered(selected_agents):
     """
-    Runs relevant disease agents and returns
-    a structured healthcare recommendation report.
+    Sort routed agents into registry order so reports are deterministic
+    regardless of routing set order or completion order.
+
+    Agents whose model is missing or failed to load are skipped, so the
+    remaining risks are still reported (see GET /health/models).
     """
+    registry = get_model_registry()
+    ordered = []
+    for name in AGENT_REGISTRY:
+        if name not in selected_agents:
+            continue
+        if not registry.is_available(name):
+            logger.warning("Skipping %s agent: model unavailable", name)
+            continue
+        ordered.append(name)
+    return ordered
 
-    # -------------------------------
-    # 1. Convert PatientState to dict
-    # -------------------------------
-    patient_dict = patient.to_dict()
 
-    # -------------------------------
-    # 2. Normalize raw clinical inputs
-    # -------------------------------
+def _prepare_patient(patient):
+    """
+    Convert PatientState to dict and normalize raw clinical inputs.
+    """
+    patient_dict = normalize_patient(patient.to_dict())
+
     patient_dict["smoking_history_norm"] = ClinicalNormalizer.normalize_smoking(patient_dict.get("smoking_raw"))
 
     # (Future-proof)
     # patient_dict["alcohol_norm"] = ClinicalNormalizer.normalize_alcohol(...)
     # patient_dict["diet_norm"] = ClinicalNormalizer.normalize_diet(...)
 
+    return patient_dict
+
+
+def run_selected_agents(patient, pool=None):
+    """
+    Runs relevant disease agents and returns
+    a structured healthcare recommendation report.
+
+    Agents are fanned out concurrently through an AgentPool
+    (configured via AGENT_EXECUTOR / AGENT_TIMEOUT_SECONDS by default).
+    Agents that time out are listed in the report's `timed_out`.
+    """
+    pool = pool or get_agent_pool()
+
     # -------------------------------
-    # 3. Select relevant agents
+    # 1-2. Convert + normalize inputs
     # -------------------------------
-    selected_agents = route_agents(patient)
+    patient_dict = _prepare_patient(patient)
+    validate_patients([patient_dict])
 
-    individual_risks = []
+    # -------------------------------
+    # 3. Select relevant agents
+    # -------------------------------
+    selected_agents = _ordered(route_agents(patient_dict))
 
     # -------------------------------
-    # 4. Run agents
+    # 4. Run agents (concurrently)
     # -------------------------------
-    for agent_name in selected_agents:
-        agent_fn = AGENT_REGISTRY[agent_name]
-        result = agent_fn(patient_dict)
+    results = pool.run([(agent_name, AGENT_REGISTRY[agent_name], patient_dict) for agent_name in selected_agents])
+
+    # SHAP-based "why" (EXPLAIN_MODE=shap), capped by EXPLAIN_BUDGET_MS
+    attributions = explain_within_budget(list(results), patient_dict) if shap_enabled() else {}
+
+    return _build_report(patient_dict, list(results.values()), attributions, timed_out=results.timed_out)
+
+
+def run_selected_agents_batch(patients, pool=None):
+    """
+    Batch variant of run_selected_agents.
+
+    Every patient is routed individually, but each agent is executed once
+    over all rows routed to it. Returns one report per patient, in input
+    order, with the same structure as run_selected_agents.
+    """
+    # One vectorized pass; ClinicalRangeError lists the failures of every row
+    validate_patients([patient.to_dict() for patient in patients])
+
+    patient_dicts, results_by_row = score_batch(patients, pool)
+
+    return [
+        _build_report(patient_dict, list(results.values()), timed_out=results.timed_out)
+        for patient_dict, results in zip(patient_dicts, results_by_row)
+    ]
+
+
+def score_batch(patients, pool=None, routes=None):
+    """
+    Route every patient and run each agent once over the rows routed to it,
+    without validation or report building (see run_selected_agents_batch).
+
+    routes: optional {agent_name: boolean mask} for the same rows, e.g.
+    route_agents_frame(df) when the patients came from a DataFrame;
+    otherwise each patient is routed with route_agents.
+
+    Returns (patient_dicts, results_by_row): results_by_row[i] is
+    AgentResults {agent_name: result} for patient i, in registry order, with
+    the agents routed to it that timed out in its `timed_out`.
+    """
+    pool = pool or get_agent_pool()
+
+    patient_dicts = [_prepare_patient(patient) for patient in patients]
 
+    # Group row indices per agent
+    rows_by_agent = {}
+    if routes is None:
+        for row, patient_dict in enumerate(patient_dicts):
+            for agent_name in _ordered(route_agents(patient_dict)):
+                rows_by_agent.setdefault(agent_name, []).append(row)
+    else:
+        for agent_name in _ordered([name for name, mask in routes.items() if mask.any()]):
+            rows_by_agent[agent_name] = np.flatnonzero(routes[agent_name]).tolist()
+
+    # One vectorized call per agent, agents fanned out concurrently
+    batch_results = pool.run(
+        [
+            (agent_name, BATCH_AGENT_REGISTRY[agent_name], [patient_dicts[row] for row in rows])
+            for agent_name, rows in rows_by_agent.items()
+        ]
+    )
+
+    results_by_row = [AgentResults() for _ in patients]
+    for agent_name in AGENT_REGISTRY:
+        for row, result in zip(rows_by_agent.get(agent_name, ()), batch_results.get(agent_name, ())):
+            results_by_row[row][agent_name] = result
+        if agent_name in batch_results.timed_out:
+            for row in rows_by_agent[agent_name]:
+                results_by_row[row].timed_out.append(agent_name)
+
+    return patient_dicts, results_by_row
+
+
+def _build_report(patient_dict, results, attributions=None, timed_out=()):
+    """
+    Assemble the structured report from raw agent results.
+
+    attributions: optional {disease: SHAP contributions}; diseases without
+    them are explained by the static rules.
+    timed_out: routed agents that did not return. The report is then marked
+    incomplete and its overall level is never Low (see aggregate_overall_risk).
+    """
+    attributions = attributions or {}
+    timed_out = list(timed_out)
+    individual_risks = []
+
+    for result in results:
         individual_risks.append(
             {
                 "disease": result["disease"],
                 "risk_score": float(result["risk_score"]),
                 "risk_level": result["risk_level"],
-                "why": explain_risk(result["disease"], patient_dict),
+                "why": explain_risk(result["disease"], patient_dict, attributions.get(result["disease"])),
                 "interaction_warnings": INTERACTION_WARNINGS.get(result["disease"], {}),
             }
         )
@@ -66,7 +201,7 @@ def run_selected_agents(patient):
     # -------------------------------
     # 5. Safety check
     # -------------------------------
-    if not individual_risks:
+    if not individual_risks and not timed_out:
         return {
             "individual_risks": [
                 {
@@ -96,28 +231,14 @@ def run_selected_agents(patient):
                 "level": "Low",
                 "primary_concerns": [],
             },
+            "incomplete": False,
+            "timed_out": [],
         }
 
     # -------------------------------
     # 6. Aggregate overall risk
     # -------------------------------
-    critical = [r["disease"] for r in individual_risks if r["risk_level"] == "Critical"]
-    moderate = [r["disease"] for r in individual_risks if r["risk_level"] == "Moderate"]
-
-    overall_score = round(sum(r["risk_score"] for r in individual_risks) / len(individual_risks), 2)
-
-    if critical:
-        level = "Critical"
-    elif moderate:
-        level = "Moderate"
-    else:
-        level = "Low"
-
-    overall_risk = {
-        "score": overall_score,
-        "level": level,
-        "primary_concerns": critical if critical else moderate,
-    }
+    overall_risk = aggregate_overall_risk(individual_risks, timed_out)
 
     # -------------------------------
     # 7. Enrich with clinical guidance
@@ -136,4 +257,40 @@ def run_selected_agents(patient):
     return {
         "individual_risks": enhanced_risks,
         "overall_risk": overall_risk,
+        "incomplete": bool(timed_out),
+        "timed_out": timed_out,
+    }
+
+
+def aggregate_overall_risk(risks, timed_out=()):
+    """
+    Overall risk from individual results (dicts with disease, risk_score,
+    risk_level): the mean score; Critical if any result is Critical, else
+    Moderate if any is Moderate, else Low.
+
+    timed_out: routed agents with no result. A missing result could be the
+    high one, so Low becomes Incomplete, and with no results at all the
+    score is None.
+    """
+    if not risks and timed_out:
+        return {"score": None, "level": INCOMPLETE, "primary_concerns": []}
+
+    critical = [r["disease"] for r in risks if r["risk_level"] == "Critical"]
+    moderate = [r["disease"] for r in risks if r["risk_level"] == "Moderate"]
+
+    overall_score = round(sum(r["risk_score"] for r in risks) / len(risks), 2)
+
+    if critical:
+        level = "Critical"
+    elif moderate:
+        level = "Moderate"
+    elif timed_out:
+        level = INCOMPLETE
+    else:
+        level = "Low"
+
+    return {
+        "score": overall_score,
+        "level": level,
+        "primary_concerns": critical if critical else moderate,
     }
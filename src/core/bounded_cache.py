@@ -0,0 +1,98 @@
+"""
+Thread-safe LRU cache bounded by entry count and total size in bytes, with
+an optional TTL.
+
+Used for rendered artefacts (e.g. SHAP plot PNGs) whose size varies, so
+an entry-count limit alone would not bound memory, and as the store behind
+InMemoryLLMCache.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class BoundedCache:
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, prefix: str, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024) -> "BoundedCache":
+        """Read <prefix>_MAX_ENTRIES and <prefix>_MAX_BYTES, falling back to the given defaults."""
+        return cls(
+            max_entries=int(os.getenv(f"{prefix}_MAX_ENTRIES", max_entries)),
+            max_bytes=int(os.getenv(f"{prefix}_MAX_BYTES", max_bytes)),
+        )
+
+    def get(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and time.monotonic() - entry[2] > self.ttl_seconds:
+                del self._entries[key]
+                self._bytes -= entry[1]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: object) -> None:
+        size = _size_of(value)
+        with self._lock:
+            if size > self.max_bytes:
+                return  # would evict everything else; not worth caching
+
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _size_of(value) -> int:
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return sys.getsizeof(value)
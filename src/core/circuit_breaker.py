@@ -0,0 +1,206 @@
+"""
+Per-model circuit breakers and health-based ordering for LLM fallback.
+
+Each model gets a breaker:
+- CLOSED: requests flow normally
+- OPEN: the model failed `failure_threshold` times in a row; it is skipped
+  until `reset_timeout` seconds have passed
+- HALF_OPEN: a single probe request is let through; success closes the
+  breaker, failure re-opens it, and a probe that ends without an outcome
+  (cancelled) is released so the next request can probe
+
+ModelRouter orders models by recent success rate and latency
+(exponentially weighted), so requests go straight to the healthiest one.
+A model that is not being called has its failures forgotten with a
+half-life (`recovery_half_life`), so one bad spell does not demote it for
+good while a fallback keeps answering.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """True if a call may be attempted now. In HALF_OPEN only one probe is allowed at a time."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+
+            # HALF_OPEN
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Give back a HALF_OPEN probe that ended without an outcome (e.g. the call was cancelled)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class ModelHealth:
+    """Breaker plus exponentially weighted success rate and latency for one model."""
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        alpha: float = 0.3,
+        recovery_half_life: Optional[float] = 60.0,
+        clock=time.monotonic,
+    ):
+        self.breaker = breaker
+        self.alpha = alpha
+        self.recovery_half_life = recovery_half_life
+        self._clock = clock
+        self._success_rate = 1.0
+        self._observed_at = clock()
+        self.latency = None  # seconds; None until the first success
+
+    @property
+    def success_rate(self) -> float:
+        """EWMA success rate, drifting back toward 1.0 while the model is not called."""
+        if not self.recovery_half_life:
+            return self._success_rate
+        idle = self._clock() - self._observed_at
+        return 1.0 - (1.0 - self._success_rate) * 0.5 ** (idle / self.recovery_half_life)
+
+    def observe(self, success: bool, latency: float = None) -> None:
+        self._success_rate = (1 - self.alpha) * self.success_rate + self.alpha * (1.0 if success else 0.0)
+        self._observed_at = self._clock()
+        if success and latency is not None:
+            self.latency = latency if self.latency is None else (1 - self.alpha) * self.latency + self.alpha * latency
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "success_rate": round(self.success_rate, 3),
+            "latency_seconds": round(self.latency, 3) if self.latency is not None else None,
+        }
+
+
+class ModelRouter:
+    """Tracks ModelHealth per model name and orders models healthiest-first."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        recovery_half_life: Optional[float] = 60.0,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.recovery_half_life = recovery_half_life
+        self._clock = clock
+        self._health: Dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        return cls(
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "3")),
+            reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+            recovery_half_life=float(os.getenv("LLM_ROUTER_RECOVERY_SECONDS", "60")) or None,
+        )
+
+    def health(self, model: str) -> ModelHealth:
+        with self._lock:
+            if model not in self._health:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout, clock=self._clock)
+                self._health[model] = ModelHealth(
+                    breaker, recovery_half_life=self.recovery_half_life, clock=self._clock
+                )
+            return self._health[model]
+
+    def order(self, models: List[str]) -> List[str]:
+        """
+        Models sorted by health: success rate (in 10% buckets), then latency,
+        then configured order. Models whose breaker is OPEN are left out.
+        """
+
+        def key(indexed):
+            index, model = indexed
+            health = self.health(model)
+            latency = health.latency if health.latency is not None else float("inf")
+            return (-round(health.success_rate, 1), latency, index)
+
+        available = [(i, m) for i, m in enumerate(models) if self.health(m).breaker.state != OPEN]
+        return [model for _, model in sorted(available, key=key)]
+
+    def allow(self, model: str) -> bool:
+        return self.health(model).breaker.allow_request()
+
+    def release(self, model: str) -> None:
+        self.health(model).breaker.release()
+
+    def record_success(self, model: str, latency: float) -> None:
+        health = self.health(model)
+        health.breaker.record_success()
+        health.observe(True, latency)
+
+    def record_failure(self, model: str) -> None:
+        health = self.health(model)
+        health.breaker.record_failure()
+        health.observe(False)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            models = list(self._health)
+        return {model: self.health(model).snapshot() for model in models}
+
+
+_default_router = None
+_default_router_lock = threading.Lock()
+
+
+def get_default_router() -> ModelRouter:
+    """Process-wide router so breaker state survives per-request GeminiClient instances."""
+    global _default_router
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = ModelRouter.from_env()
+    return _default_router
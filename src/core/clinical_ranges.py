@@ -0,0 +1,248 @@
+"""
+Clinical ranges for every feature in PATIENT_SCHEMA.
+
+CLINICAL_RANGES is the single declarative table: numeric features have an
+inclusive Range, categorical features and yes/no flags a Choice of accepted
+values. Missing values (None / NaN) always pass; the agents fill defaults.
+String choices the agents read as numbers carry their encoding (Choice.codes),
+and normalize_patient() / normalize_frame() apply it before scoring, so an
+accepted "Male" or "yes" scores exactly like 1.
+
+RangeValidator compiles the table once into column arrays, so a whole batch
+is validated with one vectorized comparison per call and failures are
+reported per row:
+
+    validate_patients(patient_dicts)   # raises ClinicalRangeError
+
+The API schemas (backend/schemas.py) take their Field limits from the same
+table. numpy is imported on first validation, so importing this module stays
+cheap for backend startup.
+"""
+
+import math
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+from src.core.clinical_normalizer import ClinicalNormalizer
+
+
+class Range(NamedTuple):
+    low: float
+    high: float
+    unit: str = ""
+
+
+class Choice(NamedTuple):
+    values: Tuple
+    codes: Optional[Mapping[str, int]] = None  # lower-case string -> model encoding
+
+
+FLAG = Choice((0, 1, "yes", "no"), {"yes": 1, "no": 0})
+
+CLINICAL_RANGES: Dict[str, Union[Range, Choice]] = {
+    # Demographics
+    "age": Range(0, 120, "years"),
+    "gender": Choice((0, 1, "male", "female"), {"male": 1, "female": 0}),
+    # Vitals & Measurements
+    "blood_pressure": Range(60, 250, "mmHg"),
+    "bmi": Range(10.0, 60.0, "kg/m2"),
+    # Blood Sugar & Metabolic
+    "blood_glucose": Range(50.0, 500.0, "mg/dL"),
+    "hba1c": Range(3.0, 15.0, "%"),
+    # Lipid Profile
+    "cholesterol": Range(100.0, 400.0, "mg/dL"),
+    # Liver Function
+    "total_bilirubin": Range(0.1, 50.0, "mg/dL"),
+    "direct_bilirubin": Range(0.0, 30.0, "mg/dL"),
+    "alkaline_phosphatase": Range(10.0, 2500.0, "U/L"),
+    "alt": Range(1.0, 5000.0, "U/L"),
+    "ast": Range(1.0, 5000.0, "U/L"),
+    "total_protein": Range(2.0, 12.0, "g/dL"),
+    "albumin": Range(0.0, 7.0, "g/dL"),  # also urine albumin grade 0-5 for the kidney model
+    "albumin_globulin_ratio": Range(0.1, 5.0),
+    # Kidney Function
+    "creatinine": Range(0.1, 10.0, "mg/dL"),
+    "urea": Range(1.0, 400.0, "mg/dL"),
+    "sodium": Range(100.0, 180.0, "mEq/L"),
+    "potassium": Range(1.0, 10.0, "mEq/L"),
+    "hemoglobin": Range(3.0, 20.0, "g/dL"),
+    # Medical Conditions
+    "hypertension": FLAG,
+    "heart_disease": FLAG,
+    "diabetes": FLAG,
+    "coronary_artery_disease": FLAG,
+    # Lifestyle
+    "smoking": Choice(tuple(k for k in ClinicalNormalizer.SMOKING_MAP if k)),
+    "alcohol": Choice(("never", "former", "current", 0, 1)),
+    # Social
+    "marital_status": Choice(("yes", "no", 0, 1)),
+    # The stroke model's work_type codes have no recorded names, so only codes are accepted
+    "work_type": Choice((0, 1, 2, 3, 4)),
+    "residence_type": Choice(("urban", "rural", 0, 1)),
+    # Symptoms
+    "chest_pain": FLAG,
+    "exercise_induced_angina": FLAG,
+    "fatigue": FLAG,
+    "breathlessness": FLAG,
+    "edema": FLAG,
+    "poor_appetite": Choice((0, 1, "poor", "good"), {"poor": 1, "good": 0}),
+    "anemia": FLAG,
+}
+
+# PatientState / adapter names that carry a PATIENT_SCHEMA feature
+FIELD_ALIASES = {
+    "total_bilirubin": ("bilirubin_total",),
+    "direct_bilirubin": ("bilirubin_direct",),
+    "smoking": ("smoking_raw",),
+}
+
+
+class ClinicalRangeError(ValueError):
+    """Raised when patient values fall outside CLINICAL_RANGES; failures lists them per row."""
+
+    def __init__(self, failures: List[dict]):
+        self.failures = failures
+        super().__init__(f"Invalid medical data detected: {failures}")
+
+
+def _normalize_choice(value):
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+def _choice_ok(value, allowed) -> bool:
+    """Slow path for values not found as-is: NaN (missing) and differently cased strings."""
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    return isinstance(value, str) and _normalize_choice(value) in allowed
+
+
+CHOICE_CODES: Dict[str, Mapping[str, int]] = {
+    name: spec.codes for name, spec in CLINICAL_RANGES.items() if isinstance(spec, Choice) and spec.codes
+}
+
+
+def _encode(value, codes):
+    if isinstance(value, str):
+        return codes.get(_normalize_choice(value), value)
+    return value
+
+
+def normalize_patient(row: Mapping) -> dict:
+    """Copy of a patient dict with accepted strings ("Male", "yes", ...) replaced by their model encoding."""
+    patient = dict(row)
+    for name, codes in CHOICE_CODES.items():
+        if name in patient:
+            patient[name] = _encode(patient[name], codes)
+    return patient
+
+
+def normalize_frame(df):
+    """normalize_patient for a DataFrame of patients (returns a copy)."""
+    from pandas.api.types import is_numeric_dtype
+
+    df = df.copy()
+    for name, codes in CHOICE_CODES.items():
+        if name in df and not is_numeric_dtype(df[name]):
+            df[name] = df[name].astype(object).map(lambda value: _encode(value, codes)).infer_objects()
+    return df
+
+
+class RangeValidator:
+    """CLINICAL_RANGES compiled into column arrays for batch validation."""
+
+    def __init__(
+        self,
+        table: Mapping[str, Union[Range, Choice]] = CLINICAL_RANGES,
+        aliases: Mapping[str, Sequence[str]] = FIELD_ALIASES,
+    ):
+        self._aliases = {name: tuple(aliases[name]) for name in table if aliases.get(name)}
+
+        self._range_names = [name for name, spec in table.items() if isinstance(spec, Range)]
+        self._low = [table[name].low for name in self._range_names]
+        self._high = [table[name].high for name in self._range_names]
+        self._range_checks = [f"in_range({table[name].low}, {table[name].high})" for name in self._range_names]
+
+        self._choices = {
+            name: (frozenset(_normalize_choice(v) for v in spec.values), f"isin({list(spec.values)})")
+            for name, spec in table.items()
+            if isinstance(spec, Choice)
+        }
+
+    def _column(self, rows: Sequence[Mapping], name: str) -> list:
+        values = [row.get(name) for row in rows]
+        for alias in self._aliases.get(name, ()):
+            values = [row.get(alias) if value is None else value for value, row in zip(values, rows)]
+        return values
+
+    def failures(self, rows: Sequence[Mapping]) -> List[List[dict]]:
+        """One list of failures per row (empty when the row is valid)."""
+        import numpy as np
+
+        per_row: List[List[dict]] = [[] for _ in rows]
+        if not rows:
+            return per_row
+
+        # Numeric ranges: one (rows x features) array, one comparison
+        columns = [self._column(rows, name) for name in self._range_names]
+        values = np.column_stack([self._numeric(column, c, per_row) for c, column in enumerate(columns)])
+
+        bad = (values < np.array(self._low)) | (values > np.array(self._high))
+        for r, c in zip(*np.nonzero(bad)):
+            per_row[r].append(
+                {
+                    "row": int(r),
+                    "column": self._range_names[c],
+                    "check": self._range_checks[c],
+                    "failure_case": columns[c][r],
+                }
+            )
+
+        # Categorical values: set membership per column
+        for name, (allowed, check) in self._choices.items():
+            for r, value in enumerate(self._column(rows, name)):
+                if value is None:
+                    continue
+                try:
+                    if value in allowed:
+                        continue
+                except TypeError:  # unhashable
+                    pass
+                if not _choice_ok(value, allowed):
+                    per_row[r].append({"row": r, "column": name, "check": check, "failure_case": value})
+
+        return per_row
+
+    def validate(self, rows: Sequence[Mapping]) -> None:
+        """Raise ClinicalRangeError listing every failure, ordered by row."""
+        failures = [failure for row_failures in self.failures(rows) for failure in row_failures]
+        if failures:
+            raise ClinicalRangeError(failures)
+
+    def _numeric(self, column: list, c: int, per_row: List[List[dict]]):
+        """Column as floats; non-numeric values are reported and treated as missing."""
+        import numpy as np
+
+        try:
+            return np.array(column, dtype=float)
+        except (TypeError, ValueError):
+            pass
+
+        values = np.full(len(column), np.nan)
+        for r, value in enumerate(column):
+            if value is None:
+                continue
+            try:
+                values[r] = float(value)
+            except (TypeError, ValueError):
+                per_row[r].append({"row": r, "column": self._range_names[c], "check": "numeric", "failure_case": value})
+        return values
+
+
+_validator: Optional[RangeValidator] = None
+
+
+def validate_patients(rows: Iterable[Mapping]) -> None:
+    """Validate patient dicts against CLINICAL_RANGES (compiled once)."""
+    global _validator
+    if _validator is None:
+        _validator = RangeValidator()
+    _validator.validate(list(rows))
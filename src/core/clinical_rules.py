@@ -0,0 +1,276 @@
+"""
+Clinical thresholds loaded from a versioned rule file.
+
+src/core/clinical_rules.json (or CLINICAL_RULES_PATH) holds:
+- routing: which disease agents run (any matching condition routes)
+- risk_levels: score cutoffs for Low / Moderate / High / Critical
+- primary_concern_min_score: score at which a disease is a primary concern
+- explanations: rule-based "why" sentences per disease
+
+The file is compiled once into predicate closures, with a scalar backend
+(one patient object or dict) and a vectorized one (DataFrame masks, NumPy
+score arrays). Conditions on missing values (None, NaN) never hold.
+
+Hot reload: get_rules() re-checks the file's mtime at most every
+CLINICAL_RULES_RELOAD_SECONDS (default 5; 0 disables) and recompiles when
+it changed, so every worker picks up edits without a restart. A file that
+fails to load is logged and the previous rules stay active.
+"""
+
+import bisect
+import json
+import logging
+import math
+import operator
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = Path(__file__).with_name("clinical_rules.json")
+
+COMPARISONS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+}
+UNARY_OPS = ("truthy", "always")
+
+# A predicate takes a getter (field name -> value or None)
+Predicate = Callable[[Callable[[str], object]], bool]
+
+
+def _missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _compile_condition(condition: Mapping) -> Predicate:
+    op = condition.get("op")
+    if op == "always":
+        return lambda get: True
+
+    field = condition.get("field")
+    if not field:
+        raise ValueError(f"condition {condition} has no field")
+
+    if op == "truthy":
+
+        def truthy(get):
+            value = get(field)
+            return not _missing(value) and bool(value)
+
+        return truthy
+
+    if op not in COMPARISONS:
+        raise ValueError(f"unknown op {op!r} in {condition}; expected one of {list(COMPARISONS) + list(UNARY_OPS)}")
+    if "value" not in condition:
+        raise ValueError(f"condition {condition} has no value")
+    compare, threshold = COMPARISONS[op], condition["value"]
+
+    def compare_field(get):
+        value = get(field)
+        return not _missing(value) and compare(value, threshold)
+
+    return compare_field
+
+
+def _any(predicates: List[Predicate]) -> Predicate:
+    return lambda get: any(predicate(get) for predicate in predicates)
+
+
+def _getter(patient) -> Callable[[str], object]:
+    if isinstance(patient, Mapping):
+        return patient.get
+    return lambda field: getattr(patient, field, None)
+
+
+class ClinicalRules:
+    """A compiled rule file (see module docstring for the format)."""
+
+    def __init__(self, spec: Mapping, source: Optional[str] = None):
+        self.version = str(spec["version"])
+        self.source = source
+        self.spec = spec
+
+        levels = spec["risk_levels"]
+        self._level_bounds = [float(level["below"]) for level in levels[:-1]]
+        self._level_names = [level["level"] for level in levels]
+        if "below" in levels[-1] or self._level_bounds != sorted(self._level_bounds):
+            raise ValueError("risk_levels must have ascending 'below' cutoffs and an open-ended last level")
+
+        self.primary_concern_min_score = float(spec["primary_concern_min_score"])
+
+        self.routing = {agent: list(conditions) for agent, conditions in spec["routing"].items()}
+        self._routes = {
+            agent: _any([_compile_condition(c) for c in conditions]) for agent, conditions in self.routing.items()
+        }
+
+        self._explanations = {
+            disease: [(_compile_condition(rule), rule["text"]) for rule in rules]
+            for disease, rules in spec["explanations"].items()
+        }
+        self.default_explanation = spec["default_explanation"]
+
+    @classmethod
+    def from_file(cls, path) -> "ClinicalRules":
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(json.load(f), source=str(path))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid clinical rules file {path}: {e!r}") from e
+
+    # ---------------- scalar backend ----------------
+
+    def route(self, patient) -> List[str]:
+        """Agents to run for one patient (object with attributes, or dict), in rule-file order."""
+        get = _getter(patient)
+        return [agent for agent, matches in self._routes.items() if matches(get)]
+
+    def risk_level(self, score: float) -> str:
+        return self._level_names[bisect.bisect_right(self._level_bounds, score)]
+
+    def is_primary_concern(self, score: float) -> bool:
+        return score >= self.primary_concern_min_score
+
+    def explain(self, disease: str, patient) -> List[str]:
+        """Rule-based reasons for a disease risk (the default sentence if none match)."""
+        get = _getter(patient)
+        reasons = [text for matches, text in self._explanations.get(disease, []) if matches(get)]
+        return reasons or [self.default_explanation]
+
+    # ---------------- vectorized backend ----------------
+
+    def route_frame(self, df) -> Dict:
+        """{agent: boolean numpy mask} over a DataFrame of patients."""
+        import numpy as np
+
+        masks = {}
+        for agent, conditions in self.routing.items():
+            mask = np.zeros(len(df), dtype=bool)
+            for condition in conditions:
+                mask |= _condition_mask(condition, df)
+            masks[agent] = mask
+        return masks
+
+    def risk_levels(self, scores):
+        """risk_level for an array of scores, as a numpy array of level names."""
+        import numpy as np
+
+        names = np.array(self._level_names, dtype=object)
+        return names[np.searchsorted(self._level_bounds, np.asarray(scores, dtype=float), side="right")]
+
+
+def _condition_mask(condition: Mapping, df):
+    import numpy as np
+    import pandas as pd
+
+    op = condition.get("op")
+    if op == "always":
+        return np.ones(len(df), dtype=bool)
+    field = condition["field"]
+    if field not in df:
+        return np.zeros(len(df), dtype=bool)
+
+    column = df[field]
+    if op == "truthy":
+        return (column.notna() & column.astype(bool)).to_numpy(dtype=bool)
+    if op == "==":
+        return (column == condition["value"]).to_numpy(dtype=bool)
+    # NaN (missing or non-numeric) compares False
+    return COMPARISONS[op](pd.to_numeric(column, errors="coerce"), condition["value"]).to_numpy(dtype=bool)
+
+
+class RuleStore:
+    """Holds the active ClinicalRules and reloads them when the file changes."""
+
+    def __init__(self, path=None, reload_seconds: float = 5.0):
+        self.path = Path(path or RULES_PATH)
+        self.reload_seconds = reload_seconds
+
+        self._rules: Optional[ClinicalRules] = None
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RuleStore":
+        """Build a store from CLINICAL_RULES_PATH and CLINICAL_RULES_RELOAD_SECONDS."""
+        return cls(
+            path=os.getenv("CLINICAL_RULES_PATH") or None,
+            reload_seconds=float(os.getenv("CLINICAL_RULES_RELOAD_SECONDS", "5")),
+        )
+
+    def get(self) -> ClinicalRules:
+        rules = self._rules
+        if rules is not None and (self.reload_seconds <= 0 or time.monotonic() < self._next_check):
+            return rules
+
+        with self._lock:
+            if self._rules is None or time.monotonic() >= self._next_check:
+                self._refresh()
+            return self._rules
+
+    def reload(self) -> ClinicalRules:
+        """Recompile now, whatever the file's mtime."""
+        with self._lock:
+            self._mtime = None
+            self._refresh()
+            return self._rules
+
+    def status(self) -> dict:
+        rules = self.get()
+        return {"version": rules.version, "path": str(self.path), "reload_seconds": self.reload_seconds}
+
+    def _refresh(self):
+        self._next_check = time.monotonic() + self.reload_seconds
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError as e:
+            if self._rules is None:
+                raise
+            logger.error("Clinical rules file unreadable (%s); keeping version %s", e, self._rules.version)
+            return
+
+        if mtime == self._mtime and self._rules is not None:
+            return
+        try:
+            rules = ClinicalRules.from_file(self.path)
+        except (OSError, ValueError) as e:
+            if self._rules is None:
+                raise
+            logger.error("%s; keeping version %s", e, self._rules.version)
+            self._mtime = mtime  # do not retry until the file changes again
+            return
+
+        if self._rules is not None and rules.version != self._rules.version:
+            logger.info("Clinical rules reloaded: version %s -> %s", self._rules.version, rules.version)
+        self._rules, self._mtime = rules, mtime
+
+
+_store: Optional[RuleStore] = None
+_store_lock = threading.Lock()
+
+
+def get_rule_store() -> RuleStore:
+    """Process-wide rule store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RuleStore.from_env()
+    return _store
+
+
+def get_rules() -> ClinicalRules:
+    """The active (hot-reloaded) clinical rules."""
+    return get_rule_store().get()
+
+
+def risk_level(score: float) -> str:
+    """Low / Moderate / High / Critical for a 0-100 risk score, per the active rules."""
+    return get_rules().risk_level(score)
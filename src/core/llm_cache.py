@@ -0,0 +1,223 @@
+"""
+Content-addressed cache for LLM completions.
+
+GeminiClient runs at temperature=0.0 / top_p=0.1, so identical prompts
+give effectively identical answers. Responses are cached under a hash of
+(model, system prompt, prompt) with a TTL and size-bounded LRU eviction.
+
+Backends:
+- InMemoryLLMCache: per-process BoundedCache
+- SQLiteLLMCache: on-disk, shared by every worker on the host
+
+Prompts and replies contain patient data (PHI). The SQLite file is created
+owner-only (0600) but is not encrypted: put LLM_CACHE_PATH on an encrypted
+volume, or use the memory backend where PHI must not touch disk.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+from src.core.bounded_cache import BoundedCache
+
+
+class LLMCache(ABC):
+    """
+    Base class: key derivation, TTL bookkeeping and hit/miss counters.
+    Subclasses implement _get, _set, clear and __len__.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = 86400, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, system_prompt, prompt):
+            data = part.encode("utf-8")
+            # Length-prefix each part so ("ab", "c") and ("a", "bc") never collide
+            digest.update(len(data).to_bytes(8, "big"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.get_first([key])
+
+    def get_first(self, keys: Iterable[str]) -> Optional[str]:
+        """Return the first cached value among keys; counts one hit or one miss."""
+        for key in keys:
+            value = self._get(key)
+            if value is not None:
+                self._count(hit=True)
+                return value
+        self._count(hit=False)
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self._set(key, value)
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _count(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]: ...
+
+    @abstractmethod
+    def _set(self, key: str, value: str) -> None: ...
+
+
+class InMemoryLLMCache(LLMCache):
+    """Thread-safe in-process LRU cache (a BoundedCache with a TTL)."""
+
+    def __init__(
+        self, ttl_seconds: Optional[float] = 86400, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024
+    ):
+        super().__init__(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self._entries = BoundedCache(max_entries=max_entries, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+    def _get(self, key):
+        return self._entries.get(key)
+
+    def _set(self, key, value):
+        self._entries.set(key, value)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteLLMCache(LLMCache):
+    """
+    On-disk LRU cache; safe to share between worker processes.
+    Holds PHI in plaintext, so the file is owner-only (see module docstring).
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = 86400, max_entries: int = 10000):
+        super().__init__(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        # Create owner-only before SQLite opens it; the -wal/-shm files inherit the mode
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(path, 0o600)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)")
+
+    def _get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._expired(created_at):
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return value
+
+    def _set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            # Evict least recently used rows beyond the bound
+            self._conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def cache_from_env() -> Optional[LLMCache]:
+    """
+    Build a cache from LLM_CACHE_BACKEND (memory | sqlite | none),
+    LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES and LLM_CACHE_PATH.
+    """
+    backend = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+    ttl = os.getenv("LLM_CACHE_TTL_SECONDS", "86400")
+    ttl_seconds = float(ttl) if ttl else None
+    max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+
+    if backend in ("none", "off", "disabled", ""):
+        return None
+    if backend == "memory":
+        return InMemoryLLMCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+    if backend == "sqlite":
+        path = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+        return SQLiteLLMCache(path, ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    raise ValueError(f"Unknown LLM_CACHE_BACKEND '{backend}'. Expected memory, sqlite or none")
+
+
+_default_cache = None
+_default_cache_loaded = False
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[LLMCache]:
+    """Process-wide cache shared by every GeminiClient (created lazily from the environment)."""
+    global _default_cache, _default_cache_loaded
+    with _default_cache_lock:
+        if not _default_cache_loaded:
+            _default_cache = cache_from_env()
+            _default_cache_loaded = True
+    return _default_cache
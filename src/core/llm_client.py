@@ -1,8 +1,15 @@
+import asyncio
 import os
 import time
+from typing import AsyncIterator, Optional, Union
 
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq, Groq
+
+from src.core.circuit_breaker import ModelRouter, get_default_router
+from src.core.llm_cache import LLMCache, get_default_cache
+
+SYSTEM_PROMPT = "You are a helpful medical AI assistant. Provide accurate, professional, and empathetic responses."
 
 
 class GeminiClient:
@@ -12,7 +19,7 @@ class GeminiClient:
     Note: Class name kept as 'GeminiClient' for backward compatibility.
     """
 
-    def __init__(self):
+    def __init__(self, cache: Union[LLMCache, bool, None] = None, router: Optional[ModelRouter] = None):
         load_dotenv()
 
         api_key = os.getenv("GROQ_API_KEY")
@@ -20,8 +27,10 @@ class GeminiClient:
             raise ValueError("GROQ_API_KEY not found in environment")
 
         self.client = Groq(api_key=api_key)
+        # Non-blocking client for the async request path
+        self.async_client = AsyncGroq(api_key=api_key)
 
-        # 🔥 Ordered fallback list - Groq models
+        # 🔥 Preferred fallback list - Groq models (reordered at runtime by health)
         self.models = [
             "llama-3.3-70b-versatile",  # Latest, most capable
             "llama-3.1-70b-versatile",  # Fallback
@@ -29,41 +38,174 @@ class GeminiClient:
             "llama-3.1-8b-instant",  # Fastest fallback
         ]
 
+        # Deterministic sampling makes identical prompts cacheable.
+        # None uses the process-wide cache (LLM_CACHE_BACKEND); False disables caching
+        if cache is None:
+            cache = get_default_cache()
+        self.cache = None if cache is False else cache
+
+        # Per-model circuit breakers + health-based ordering, shared process-wide
+        self.router = router if router is not None else get_default_router()
+
     def generate(self, prompt: str) -> str:
         """
-        Try multiple models before falling back to safe response.
+        Try models healthiest-first before falling back to safe response.
+        Models with an open circuit breaker are skipped without a call.
         """
-        for model_name in self.models:
-            try:
-                response = self.client.chat.completions.create(
-                    model=model_name,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": (
-                                "You are a helpful medical AI assistant. "
-                                "Provide accurate, professional, and empathetic responses."
-                            ),
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=0.0,
-                    top_p=0.1,
-                    max_tokens=2048,
-                )
+        cached = self._cache_lookup(prompt)
+        if cached is not None:
+            return cached
 
-                if response and response.choices and response.choices[0].message.content:
-                    return response.choices[0].message.content.strip()
+        for model_name in self.router.order(self.models):
+            if not self.router.allow(model_name):
+                continue
+
+            start = time.monotonic()
+            try:
+                response = self.client.chat.completions.create(**self._request(model_name, prompt))
+                text = self._completion_text(model_name, response, start)
+                if text is not None:
+                    return self._cache_store(model_name, prompt, text)
 
             except Exception as e:
                 # Log error and move to next model
                 print(f"Error with model {model_name}: {str(e)}")
-                time.sleep(1)
+                self.router.record_failure(model_name)
+            except BaseException:
+                # Cancelled / interrupted: no outcome, but a half-open probe must not stay taken
+                self.router.release(model_name)
+                raise
+
+        # 🚨 Absolute safe fallback (immediate when every breaker is open)
+        return self._fallback_response()
+
+    async def agenerate(self, prompt: str) -> str:
+        """
+        Async variant of generate(): same model order, breakers and safe
+        response, but never blocks the event loop.
+        """
+        cached = await asyncio.to_thread(self._cache_lookup, prompt)
+        if cached is not None:
+            return cached
+
+        for model_name in self.router.order(self.models):
+            if not self.router.allow(model_name):
                 continue
 
-        # 🚨 Absolute safe fallback
+            start = time.monotonic()
+            try:
+                response = await self.async_client.chat.completions.create(**self._request(model_name, prompt))
+                text = self._completion_text(model_name, response, start)
+                if text is not None:
+                    return await asyncio.to_thread(self._cache_store, model_name, prompt, text)
+
+            except Exception as e:
+                # Log error and move to next model
+                print(f"Error with model {model_name}: {str(e)}")
+                self.router.record_failure(model_name)
+            except BaseException:
+                # Cancelled / interrupted: no outcome, but a half-open probe must not stay taken
+                self.router.release(model_name)
+                raise
+
+        # 🚨 Absolute safe fallback (immediate when every breaker is open)
         return self._fallback_response()
 
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream completion tokens as the model produces them.
+
+        Same model order, breakers, cache and safe response as agenerate().
+        A model that fails before its first token falls through to the next
+        one; once tokens have been sent the stream ends instead, so two
+        different answers are never spliced together.
+        """
+        cached = await asyncio.to_thread(self._cache_lookup, prompt)
+        if cached is not None:
+            yield cached
+            return
+
+        for model_name in self.router.order(self.models):
+            if not self.router.allow(model_name):
+                continue
+
+            start = time.monotonic()
+            parts = []
+            try:
+                stream = await self.async_client.chat.completions.create(
+                    **self._request(model_name, prompt), stream=True
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not parts and delta:
+                        # Match generate(), which strips the completion
+                        delta = delta.lstrip()
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+
+            except Exception as e:
+                print(f"Error with model {model_name}: {str(e)}")
+                self.router.record_failure(model_name)
+                if parts:
+                    return
+                continue
+            except BaseException:
+                # Cancelled, or the consumer closed the stream (client disconnect)
+                self.router.release(model_name)
+                raise
+
+            if parts:
+                self.router.record_success(model_name, time.monotonic() - start)
+                await asyncio.to_thread(self._cache_store, model_name, prompt, "".join(parts).strip())
+                return
+
+            self.router.record_failure(model_name)
+
+        # 🚨 Absolute safe fallback (immediate when every breaker is open)
+        yield self._fallback_response()
+
+    def _completion_text(self, model_name: str, response, start: float) -> Optional[str]:
+        """
+        Extract the completion and record the outcome with the router.
+        An empty completion counts as a failure.
+        """
+        if response and response.choices and response.choices[0].message.content:
+            self.router.record_success(model_name, time.monotonic() - start)
+            return response.choices[0].message.content.strip()
+
+        self.router.record_failure(model_name)
+        return None
+
+    def _cache_lookup(self, prompt: str) -> Optional[str]:
+        """
+        Return a cached completion from any model in fallback order.
+        The deterministic fallback response is never cached.
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get_first(LLMCache.make_key(m, SYSTEM_PROMPT, prompt) for m in self.models)
+
+    def _cache_store(self, model_name: str, prompt: str, text: str) -> str:
+        if self.cache is not None:
+            self.cache.set(LLMCache.make_key(model_name, SYSTEM_PROMPT, prompt), text)
+        return text
+
+    def _request(self, model_name: str, prompt: str) -> dict:
+        """
+        Chat completion parameters shared by the sync and async paths.
+        """
+        return {
+            "model": model_name,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0.0,
+            "top_p": 0.1,
+            "max_tokens": 2048,
+        }
+
     def _fallback_response(self) -> str:
         """
         Deterministic, non-hallucinating fallback.
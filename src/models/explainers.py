@@ -0,0 +1,407 @@
+"""
+SHAP explainers matched to the model type.
+
+build_explainer() picks the fastest exact algorithm the model allows:
+- tree ensembles (random forest, extra trees, decision trees): exact
+  path-dependent TreeSHAP
+- linear models (logistic regression): LinearExplainer against a
+  background sample
+- pipelines: preprocessing is applied once, the final estimator is
+  explained, and attributions of expanded columns (e.g. one-hot) are summed
+  back onto the input column they came from
+- stacking ensembles with a linear meta-learner: the meta-learner's
+  log-odds is linear in the members' probabilities, so member attributions
+  are combined with the meta-learner weights
+- anything else: PermutationExplainer (approximate)
+
+Every explainer reports contributions in probability units for the
+requested class: base_value + sum(contributions) == predicted probability.
+
+shap is imported on first use (it is slow to import).
+
+Explainers are built once per model (cached_explainer) and rendered plots
+are kept in a bounded LRU cache keyed by the encoded feature vector.
+"""
+
+import base64
+import io
+import threading
+from typing import Callable, Dict, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from src.core.bounded_cache import BoundedCache
+
+
+class Explanation(NamedTuple):
+    feature_names: List[str]
+    contributions: np.ndarray  # (n_rows, n_features), probability units
+    base_values: np.ndarray  # (n_rows,)
+    probabilities: np.ndarray  # (n_rows,)
+
+
+class ModelExplainer:
+    """
+    Explains one model's predicted probability for one class.
+
+    explain_fn(X) returns (contributions, base_values) for a DataFrame
+    whose columns are `feature_names`.
+    """
+
+    def __init__(self, feature_names, explain_fn: Callable, method: str):
+        self.feature_names = list(feature_names)
+        self.method = method
+        self._explain_fn = explain_fn
+
+    def explain(self, X: pd.DataFrame) -> Explanation:
+        X = X[self.feature_names]
+        contributions, base_values = self._explain_fn(X)
+        return Explanation(
+            feature_names=self.feature_names,
+            contributions=contributions,
+            base_values=base_values,
+            probabilities=base_values + contributions.sum(axis=1),
+        )
+
+
+def build_explainer(model, background: pd.DataFrame, positive_class=1) -> ModelExplainer:
+    """
+    Build the fastest exact explainer available for `model`.
+
+    background : DataFrame of representative model inputs (a sample of the
+        training data); attributions are relative to the average prediction
+        over it.
+    positive_class : class label whose probability is explained.
+    """
+    class_index = list(model.classes_).index(positive_class)
+    explain_fn, method = _explain_fn(model, background, class_index)
+    return ModelExplainer(background.columns, explain_fn, method)
+
+
+def _explain_fn(model, background, class_index):
+    from sklearn.ensemble import StackingClassifier
+
+    if _is_pipeline(model):
+        return _pipeline_explain_fn(model, background, class_index)
+    if _is_tree(model):
+        return _tree_explain_fn(model, background, class_index), "tree"
+    if _is_linear(model):
+        return _linear_explain_fn(model, background, class_index), "linear"
+    if isinstance(model, StackingClassifier) and _stack_is_decomposable(model):
+        return _stacking_explain_fn(model, background, class_index), "stacking"
+    return _permutation_explain_fn(model, background, class_index), "permutation"
+
+
+_explainers: Dict[str, ModelExplainer] = {}
+_explainer_locks: Dict[str, threading.Lock] = {}
+_explainer_locks_guard = threading.Lock()
+
+
+def cached_explainer(name: str, build: Callable[[], ModelExplainer]) -> ModelExplainer:
+    """Return the explainer for `name`, calling build() only the first time."""
+    explainer = _explainers.get(name)
+    if explainer is not None:
+        return explainer
+
+    with _explainer_locks_guard:
+        lock = _explainer_locks.setdefault(name, threading.Lock())
+    with lock:
+        if name not in _explainers:
+            _explainers[name] = build()
+        return _explainers[name]
+
+
+def top_contributions(X: pd.DataFrame, explanation: Explanation, disease: str, top_k: int = 10) -> List[dict]:
+    """
+    Structured explanation per row: the top_k features by absolute SHAP
+    contribution, in risk-score points, for client-side rendering.
+    """
+    results = []
+    for values, contributions, base, probability in zip(
+        X[explanation.feature_names].itertuples(index=False),
+        explanation.contributions,
+        explanation.base_values,
+        explanation.probabilities,
+    ):
+        top = np.argsort(-np.abs(contributions), kind="stable")[:top_k]
+        results.append(
+            {
+                "disease": disease,
+                "risk_score": float(round(probability * 100, 2)),
+                "base_risk_score": float(round(base * 100, 2)),
+                "contributions": [
+                    {
+                        "feature": explanation.feature_names[i],
+                        "value": _json_value(values[i]),
+                        "contribution": float(round(contributions[i] * 100, 2)),
+                    }
+                    for i in top
+                ],
+            }
+        )
+    return results
+
+
+# Rendered plots keyed by (model, encoded feature vector): identical inputs give identical plots
+_plot_cache = BoundedCache.from_env("SHAP_PLOT_CACHE", max_entries=256, max_bytes=16 * 1024 * 1024)
+
+
+def plot_cache_stats() -> dict:
+    return _plot_cache.stats()
+
+
+def cached_plot(name: str, explainer: ModelExplainer, X: pd.DataFrame) -> str:
+    """Base64 PNG of the top contributions for the single row in X, cached."""
+    key = (name,) + tuple(X[explainer.feature_names].iloc[0].tolist())
+    img_str = _plot_cache.get(key)
+    if img_str is None:
+        contributions = explainer.explain(X).contributions[0]
+        img_str = render_contributions(dict(zip(explainer.feature_names, contributions)))
+        _plot_cache.set(key, img_str)
+    return img_str
+
+
+def render_contributions(contributions: Dict[str, float], top_k: int = 10) -> str:
+    # Figure (not pyplot) keeps no global state, so concurrent requests can render safely
+    from matplotlib.figure import Figure
+
+    # Manually plotting top contributors for stability
+    contributors = sorted(contributions.items(), key=lambda x: abs(x[1]), reverse=True)[:top_k]
+    features, impacts = zip(*contributors)
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.barh(features, impacts, color=["red" if x > 0 else "blue" for x in impacts])
+    ax.set_title("Key Risk Factors for This Patient")
+    ax.set_xlabel("Impact on Risk Score")
+    fig.tight_layout()
+
+    # Save to buffer
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def _json_value(value):
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    return value
+
+
+# ------------------------------------------------------------------
+# Model type checks
+# ------------------------------------------------------------------
+
+
+def _is_tree(model):
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.tree import DecisionTreeClassifier
+
+    # Gradient boosting is left out: its raw output is log-odds, not probability
+    return isinstance(model, (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier))
+
+
+def _is_linear(model):
+    from sklearn.linear_model import LogisticRegression
+
+    return isinstance(model, LogisticRegression) and len(model.classes_) == 2
+
+
+def _is_pipeline(model):
+    # sklearn and imblearn pipelines both expose `steps`
+    return hasattr(model, "steps") and hasattr(model, "named_steps")
+
+
+def _stack_is_decomposable(model):
+    return (
+        _is_linear(model.final_estimator_)
+        and not model.passthrough
+        and len(model.classes_) == 2
+        and all(method == "predict_proba" for method in model.stack_method_)
+    )
+
+
+# ------------------------------------------------------------------
+# Explainers per model type
+# ------------------------------------------------------------------
+
+
+def _tree_explain_fn(model, background, class_index):
+    import shap
+
+    # Path-dependent TreeSHAP is exact and needs no background: it uses the
+    # training sample counts stored in the trees. For sklearn forests the raw
+    # output is already the class probability.
+    explainer = shap.TreeExplainer(model, feature_perturbation="tree_path_dependent")
+
+    def explain(X):
+        raw = explainer.shap_values(X, check_additivity=False)
+        # Older shap returns one (n, features) array per class, newer ones an
+        # (n, features, classes) array: pick the class by layout, not by shape
+        if isinstance(raw, list):
+            values = np.asarray(raw[class_index])
+        else:
+            values = np.asarray(raw)
+            if values.ndim == 3:
+                values = values[:, :, class_index]
+        expected = np.atleast_1d(explainer.expected_value)
+        base = expected[class_index] if expected.size > 1 else (expected[0] if class_index == 1 else 1 - expected[0])
+        if expected.size == 1 and class_index == 0:
+            values = -values
+        return values, np.full(len(X), base, dtype=float)
+
+    return explain
+
+
+def _linear_explain_fn(model, background, class_index):
+    """LinearExplainer gives exact log-odds attributions, rescaled to probability."""
+    import shap
+
+    explainer = shap.LinearExplainer(model, background)
+    sign = 1.0 if class_index == 1 else -1.0
+
+    def explain(X):
+        logit_values = sign * np.asarray(explainer.shap_values(X))
+        base_logit = sign * float(np.atleast_1d(explainer.expected_value)[0])
+        return _logit_to_probability(logit_values, np.full(len(X), base_logit))
+
+    return explain
+
+
+def _stacking_explain_fn(model, background, class_index):
+    """
+    Meta-learner log-odds = intercept + sum_k w_k * p_k(x), so its attributions
+    are the weighted sum of each member's probability attributions.
+    """
+    final = model.final_estimator_
+    weights = final.coef_[0]
+    intercept = final.intercept_[0]
+
+    members = []
+    for estimator in model.estimators_:
+        # Binary stacking feeds the member's probability of classes_[1]
+        explain_fn, _ = _explain_fn(estimator, background, list(estimator.classes_).index(model.classes_[1]))
+        members.append(explain_fn)
+
+    sign = 1.0 if class_index == 1 else -1.0
+
+    def explain(X):
+        logit_values = np.zeros(X.shape, dtype=float)
+        base_logit = np.full(len(X), intercept, dtype=float)
+        for weight, explain_member in zip(weights, members):
+            values, base = explain_member(X)
+            logit_values += weight * values
+            base_logit += weight * base
+        return _logit_to_probability(sign * logit_values, sign * base_logit)
+
+    return explain
+
+
+def _pipeline_explain_fn(model, background, class_index):
+    transformers = [step for _, step in model.steps[:-1] if not hasattr(step, "fit_resample")]
+    final = model.steps[-1][1]
+
+    def transform(X):
+        for step in transformers:
+            X = step.transform(X)
+        return np.asarray(X.toarray() if hasattr(X, "toarray") else X, dtype=float)
+
+    input_columns = list(background.columns)
+    owners = np.arange(len(input_columns))
+    for step in transformers:
+        owners = owners[_output_owners(step, input_columns)]
+        input_columns = list(range(len(owners)))
+
+    transformed_background = transform(background)
+    columns = [f"x{i}" for i in range(transformed_background.shape[1])]
+
+    inner_fn, method = _explain_fn(final, pd.DataFrame(transformed_background, columns=columns), class_index)
+
+    def explain(X):
+        values, base = inner_fn(pd.DataFrame(transform(X), columns=columns))
+        # Sum expanded columns back onto the input column that produced them
+        grouped = np.zeros((len(X), background.shape[1]))
+        np.add.at(grouped.T, owners, values.T)
+        return grouped, base
+
+    return explain, f"pipeline/{method}"
+
+
+def _output_owners(step, input_columns):
+    """
+    For each output column of a fitted transformer, the position of the
+    input column it was derived from. Supports ColumnTransformer,
+    OneHotEncoder and 1:1 transformers (scalers, imputers).
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder
+
+    if isinstance(step, OneHotEncoder):
+        return np.repeat(np.arange(len(step.categories_)), _one_hot_sizes(step))
+
+    if not isinstance(step, ColumnTransformer):
+        return np.arange(len(input_columns))
+
+    n_outputs = max(s.stop for s in step.output_indices_.values())
+    owners = np.full(n_outputs, -1)
+    for name, transformer, selected in step.transformers_:
+        output = step.output_indices_[name]
+        if output.stop == output.start:
+            continue
+        inputs = np.array([input_columns.index(c) if isinstance(c, str) else int(c) for c in np.atleast_1d(selected)])
+        if isinstance(transformer, OneHotEncoder):
+            owners[output] = np.repeat(inputs, _one_hot_sizes(transformer))
+        elif output.stop - output.start == len(inputs):
+            owners[output] = inputs
+        else:
+            raise ValueError(f"Cannot map outputs of transformer '{name}' back to input columns")
+    return owners
+
+
+def _one_hot_sizes(encoder):
+    drop_idx = getattr(encoder, "drop_idx_", None)
+    return [
+        len(categories) - (drop_idx is not None and drop_idx[i] is not None)
+        for i, categories in enumerate(encoder.categories_)
+    ]
+
+
+def _permutation_explain_fn(model, background, class_index):
+    import shap
+
+    columns = list(background.columns)
+    masker = shap.maskers.Independent(background.values, max_samples=len(background))
+
+    def predict(values):
+        return model.predict_proba(pd.DataFrame(values, columns=columns))[:, class_index]
+
+    explainer = shap.PermutationExplainer(predict, masker)
+
+    def explain(X):
+        result = explainer(X.values, silent=True)
+        return np.asarray(result.values), np.asarray(result.base_values, dtype=float)
+
+    return explain
+
+
+def _logit_to_probability(logit_values, base_logit):
+    """
+    Rescale log-odds attributions to probability units so that
+    base_probability + sum(contributions) == predicted probability.
+    Each row keeps its relative attributions; only the scale changes.
+    """
+    logit = base_logit + logit_values.sum(axis=1)
+    probability = _sigmoid(logit)
+    base_probability = _sigmoid(base_logit)
+
+    delta = logit - base_logit
+    # Where the logit barely moves, the slope of the sigmoid is the limit of the ratio
+    slope = probability * (1 - probability)
+    safe = np.abs(delta) > 1e-9
+    scale = np.where(safe, (probability - base_probability) / np.where(safe, delta, 1.0), slope)
+    return logit_values * scale[:, None], base_probability
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
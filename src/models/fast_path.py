@@ -0,0 +1,120 @@
+"""
+NumPy fast path for scoring numeric models.
+
+The default path builds a pandas DataFrame per call (and, for heart, runs a
+pandera schema over it) before predict_proba. For one or a few rows that
+overhead dominates the model's own cost. A FastScorer instead keeps:
+
+- the model's feature layout, precomputed once as an itemgetter, so a row
+  dict is copied straight into an array in feature order
+- a reusable per-thread (1, n_features) array for single-row calls
+- the clinical range checks as index / low / high arrays, validated with
+  one vectorized comparison
+
+The array holds the same float64 values, in the same column-major layout,
+that the DataFrame path converts to, so probabilities are bit-identical
+(see tests/test_fast_path.py).
+
+Only models that take purely numeric input can use it. Pipelines with
+categorical columns (the diabetes model's OneHotEncoder on strings) keep
+the DataFrame path.
+
+Enable with INFERENCE_FAST_PATH=1.
+"""
+
+import os
+import threading
+import warnings
+from operator import itemgetter
+from typing import Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def fast_path_enabled() -> bool:
+    return os.getenv("INFERENCE_FAST_PATH", "0").lower() in ("1", "true", "yes")
+
+
+class FastScorer:
+    """
+    predict_proba for a numeric model from row dicts keyed by feature name.
+
+    ranges maps feature -> (low, high), inclusive; NaN passes, like a
+    nullable pandera column.
+    """
+
+    def __init__(
+        self,
+        model,
+        feature_names: Sequence[str],
+        positive_class=1,
+        ranges: Optional[Mapping[str, Tuple[float, float]]] = None,
+    ):
+        self.model = model
+        self.feature_names = list(feature_names)
+        self.class_index = list(model.classes_).index(positive_class)
+
+        self._row_values = itemgetter(*self.feature_names)
+        self._local = threading.local()
+
+        ranges = dict(ranges or {})
+        self._range_names = list(ranges)
+        self._range_index = np.array([self.feature_names.index(f) for f in ranges], dtype=np.intp)
+        self._low = np.array([low for low, _ in ranges.values()], dtype=float)
+        self._high = np.array([high for _, high in ranges.values()], dtype=float)
+        self._checks = [f"in_range({low}, {high})" for low, high in ranges.values()]
+
+    def fill(self, rows: Sequence[Mapping]) -> np.ndarray:
+        """Copy row dicts into a float64 array in the model's feature order."""
+        if len(rows) == 1:
+            X = getattr(self._local, "row", None)
+            if X is None:
+                X = self._local.row = np.empty((1, len(self.feature_names)))
+        else:
+            # Column-major, like a DataFrame's values: BLAS then sums in the same order
+            X = np.empty((len(rows), len(self.feature_names)), order="F")
+
+        for i, row in enumerate(rows):
+            X[i] = self._row_values(row)
+        return X
+
+    def validate(self, X: np.ndarray) -> None:
+        """Raise ValueError listing every out-of-range value (same format as the pandera path)."""
+        if not self._range_names:
+            return
+
+        values = X[:, self._range_index]
+        # Column by column, in the order pandera reports failures
+        bad_cols, bad_rows = np.nonzero(((values < self._low) | (values > self._high)).T)
+        if len(bad_rows):
+            failures = [
+                {"column": self._range_names[c], "check": self._checks[c], "failure_case": float(values[r, c])}
+                for r, c in zip(bad_rows, bad_cols)
+            ]
+            raise ValueError(f"Invalid medical data detected: {failures}")
+
+    def predict_proba(self, rows: Sequence[Mapping]) -> np.ndarray:
+        """Probability of positive_class for each row."""
+        X = self.fill(rows)
+        self.validate(X)
+        with warnings.catch_warnings():
+            # Models fitted on DataFrames warn when given an array; X is filled
+            # in exactly the fitted column order, so here the warning is noise
+            warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+            return self.model.predict_proba(X)[:, self.class_index]
+
+
+_scorers: Dict[str, FastScorer] = {}
+_scorers_lock = threading.Lock()
+
+
+def cached_scorer(name: str, build: Callable[[], FastScorer]) -> FastScorer:
+    """Return the scorer for `name`, calling build() only the first time."""
+    scorer = _scorers.get(name)
+    if scorer is not None:
+        return scorer
+
+    with _scorers_lock:
+        if name not in _scorers:
+            _scorers[name] = build()
+        return _scorers[name]
@@ -1,6 +1,170 @@
+"""
+Central registry for the disease prediction models.
+
+Models are loaded lazily on first use and cached for the life of the
+process, so importing an agent (or backend.main) no longer unpickles every
+model up front. A model whose pickle is missing or fails to load is
+reported as unavailable instead of crashing the app; the coordinator skips
+its agent.
+
+Sharing one copy between workers:
+- preload() loads every available model. Call it in the parent before
+  forking (e.g. gunicorn --preload with MODEL_PRELOAD=1) and the workers
+  share the pages copy-on-write.
+- With MODEL_MMAP_DIR set, each model is converted once to a joblib file in
+  that directory and loaded with mmap_mode="r". Its numpy arrays are then
+  backed by the OS page cache, which every worker process shares, even
+  when workers are spawned rather than forked (uvicorn --workers).
+"""
+
+import logging
+import os
 import pickle
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+MODEL_PATHS = {
+    "heart": "models/heart_disease_model/heart_disease_prediction.pkl",
+    "diabetes": "models/diabetes_hypertension_model/diabetes_and_hypertension_prediction_model.pkl",
+    "kidney": "models/kidneyDiseasePrediction/kidney_disease_prediction_model.pkl",
+    "liver": "models/liverdiseasepredictionmodel/liverdiseasepredictionmodel.pkl",
+    "stroke": "models/strokePrediction/strokeprediction.pkl",
+}
+
+NOT_LOADED = "not_loaded"
+LOADED = "loaded"
+MISSING = "missing"
+ERROR = "error"
+
+
+class ModelUnavailableError(RuntimeError):
+    """Raised when a model's file is missing or could not be loaded."""
 
 
 def load_model(path):
     with open(path, "rb") as f:
         return pickle.load(f)
+
+
+class ModelRegistry:
+    """
+    Lazily loads models by name and tracks per-model health.
+
+    paths are relative to the project root (or absolute), so loading no
+    longer depends on the working directory.
+    """
+
+    def __init__(self, paths=None, mmap_dir=None):
+        self.paths = dict(MODEL_PATHS if paths is None else paths)
+        self.mmap_dir = mmap_dir
+
+        self._models = {}
+        self._status = {name: {"status": NOT_LOADED} for name in self.paths}
+        self._locks = {name: threading.Lock() for name in self.paths}
+
+    @classmethod
+    def from_env(cls):
+        """Build a registry using MODEL_MMAP_DIR (optional joblib memory-mapping)."""
+        return cls(mmap_dir=os.getenv("MODEL_MMAP_DIR") or None)
+
+    def path(self, name):
+        if name not in self.paths:
+            raise KeyError(f"Unknown model '{name}'. Expected one of {list(self.paths)}")
+        return PROJECT_ROOT / self.paths[name]
+
+    def get(self, name):
+        """Return the loaded model, loading it on first use."""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        path = self.path(name)
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+
+            status = self._status[name]
+            if status["status"] in (MISSING, ERROR):
+                raise ModelUnavailableError(f"Model '{name}' is unavailable: {status['error']}")
+
+            if not path.exists():
+                self._status[name] = {"status": MISSING, "path": str(path), "error": f"{path} not found"}
+                logger.warning("Model '%s' not found at %s; its agent is disabled", name, path)
+                raise ModelUnavailableError(f"Model '{name}' is unavailable: {path} not found")
+
+            start = time.monotonic()
+            try:
+                model = self._load(name, path)
+            except Exception as e:
+                self._status[name] = {"status": ERROR, "path": str(path), "error": str(e)}
+                logger.error("Failed to load model '%s' from %s: %s", name, path, e)
+                raise ModelUnavailableError(f"Model '{name}' is unavailable: {e}") from e
+
+            self._models[name] = model
+            self._status[name] = {
+                "status": LOADED,
+                "path": str(path),
+                "load_seconds": round(time.monotonic() - start, 3),
+                "memory_mapped": self.mmap_dir is not None,
+            }
+            return model
+
+    def is_available(self, name):
+        """True if the model is loaded or loads successfully now."""
+        try:
+            self.get(name)
+            return True
+        except ModelUnavailableError:
+            return False
+
+    def preload(self, names=None):
+        """
+        Load every (or the given) model now, skipping unavailable ones.
+        Returns the names that loaded.
+        """
+        return [name for name in (names or self.paths) if self.is_available(name)]
+
+    def reset(self, name=None):
+        """Forget loaded models and failures so they are retried on next use."""
+        for model_name in [name] if name else list(self.paths):
+            with self._locks[model_name]:
+                self._models.pop(model_name, None)
+                self._status[model_name] = {"status": NOT_LOADED}
+
+    def status(self):
+        """Per-model health, e.g. {"liver": {"status": "missing", ...}}"""
+        return {name: dict(self._status[name]) for name in self.paths}
+
+    def _load(self, name, path):
+        if self.mmap_dir is None:
+            return load_model(path)
+
+        import joblib
+
+        cache_path = Path(self.mmap_dir) / f"{name}.joblib"
+        if not cache_path.exists() or cache_path.stat().st_mtime < path.stat().st_mtime:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrently starting workers never read a partial file
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            joblib.dump(load_model(path), tmp_path)
+            os.replace(tmp_path, cache_path)
+
+        return joblib.load(cache_path, mmap_mode="r")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Process-wide registry shared by every agent."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry.from_env()
+    return _registry
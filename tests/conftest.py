@@ -0,0 +1,29 @@
+"""
+Shared test configuration
+"""
+
+import os
+
+import pytest
+
+from src.coordinator.patient_state import PatientState
+
+# The test database is created on demand when backend.main is imported
+os.environ.setdefault("DB_AUTO_MIGRATE", "1")
+
+
+@pytest.fixture
+def make_patient():
+    """Build a PatientState from keyword values"""
+
+    def make(**values):
+        # Mirror the API conversion: history flags are always populated
+        patient = PatientState()
+        patient.hypertension = 0
+        patient.diabetes = 0
+        patient.heart_disease = 0
+        for key, value in values.items():
+            setattr(patient, key, value)
+        return patient
+
+    return make
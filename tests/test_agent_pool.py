@@ -0,0 +1,154 @@
+"""
+Unit tests for concurrent disease-agent execution
+"""
+
+import time
+
+import pytest
+
+from backend.services import HealthAnalysisService
+from src.coordinator import executor
+from src.coordinator.agent_pool import AgentPool, AgentTimeoutError
+from src.coordinator.executor import run_selected_agents, run_selected_agents_batch
+from src.coordinator.patient_state import PatientState
+from src.models.model_loader import get_model_registry
+
+
+def double(x):
+    return x * 2
+
+
+def slow(x):
+    time.sleep(x)
+    return x
+
+
+def high_risk_patient():
+    patient = PatientState()
+    values = dict(age=62, gender=1, bmi=31.0, blood_pressure=150, blood_glucose=190, hba1c=7.4, cholesterol=245,
+                  creatinine=1.9, urea=50, bilirubin_total=2.0, alt=70, ast=65, hypertension=1, diabetes=1,
+                  heart_disease=1, chest_pain=True)  # fmt: skip
+    for key, value in values.items():
+        setattr(patient, key, value)
+    return patient
+
+
+class TestAgentPool:
+    """Test AgentPool execution modes"""
+
+    @pytest.mark.parametrize("mode", ["sequential", "thread", "process"])
+    def test_results_follow_task_order(self, mode):
+        pool = AgentPool(mode=mode, timeout=30)
+        try:
+            results = pool.run([("c", double, 3), ("a", double, 1), ("b", double, 2)])
+        finally:
+            pool.shutdown()
+
+        assert list(results.items()) == [("c", 6), ("a", 2), ("b", 4)]
+
+    def test_slow_agent_is_dropped_after_timeout(self):
+        pool = AgentPool(mode="thread", timeout=0.2)
+        try:
+            start = time.monotonic()
+            results = pool.run([("fast", slow, 0.0), ("stuck", slow, 2.0)])
+            elapsed = time.monotonic() - start
+        finally:
+            pool.shutdown()
+
+        assert results == {"fast": 0.0}
+        assert results.timed_out == ["stuck"]
+        assert elapsed < 1.5
+
+    def test_agent_exceptions_propagate(self):
+        pool = AgentPool(mode="thread")
+        try:
+            with pytest.raises(TypeError):
+                pool.run([("bad", double, None)])
+        finally:
+            pool.shutdown()
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            AgentPool(mode="gpu")
+
+
+class TestParallelExecutor:
+    """Concurrent execution must not change the report"""
+
+    def test_thread_pool_matches_sequential(self):
+        pool = AgentPool(mode="thread")
+        try:
+            parallel = run_selected_agents(high_risk_patient(), pool=pool)
+        finally:
+            pool.shutdown()
+
+        sequential = run_selected_agents(high_risk_patient(), pool=AgentPool(mode="sequential"))
+
+        assert parallel == sequential
+        expected = {
+            "heart": "Heart Disease",
+            "diabetes": "Diabetes",
+            "kidney": "Kidney Disease",
+            "liver": "Liver Disease",
+            "stroke": "Stroke",
+        }
+        registry = get_model_registry()
+        assert [r["disease"] for r in parallel["individual_risks"]] == [
+            disease for name, disease in expected.items() if registry.is_available(name)
+        ]
+
+
+def stuck_agent(patient):
+    time.sleep(0.5)
+
+
+def low_risk_agent(patient):
+    return {"disease": "Diabetes", "risk_score": 5.0, "risk_level": "Low"}
+
+
+class TestTimedOutAgents:
+    """A timeout must never read as a clean bill of health"""
+
+    @pytest.fixture
+    def pool(self):
+        pool = AgentPool(mode="thread", timeout=0.1)
+        yield pool
+        pool.shutdown()
+
+    def test_every_routed_agent_timed_out(self, monkeypatch, pool, make_patient):
+        monkeypatch.setitem(executor.AGENT_REGISTRY, "heart", stuck_agent)
+
+        report = run_selected_agents(make_patient(age=50), pool=pool)
+
+        assert report["individual_risks"] == []
+        assert report["overall_risk"] == {"score": None, "level": "Incomplete", "primary_concerns": []}
+        assert report["incomplete"] and report["timed_out"] == ["heart"]
+
+    def test_low_results_with_a_timeout_are_not_low(self, monkeypatch, pool, make_patient):
+        monkeypatch.setitem(executor.AGENT_REGISTRY, "heart", stuck_agent)
+        monkeypatch.setitem(executor.AGENT_REGISTRY, "diabetes", low_risk_agent)
+
+        report = run_selected_agents(make_patient(age=50, hba1c=7.0), pool=pool)
+
+        assert [r["disease"] for r in report["individual_risks"]] == ["Diabetes"]
+        assert report["overall_risk"]["level"] == "Incomplete"
+        assert report["timed_out"] == ["heart"]
+
+    def test_batch_reports_timed_out_agents(self, monkeypatch, pool, make_patient):
+        monkeypatch.setitem(executor.BATCH_AGENT_REGISTRY, "heart", stuck_agent)
+
+        reports = run_selected_agents_batch([make_patient(age=50), make_patient(age=30)], pool=pool)
+
+        assert reports[0]["timed_out"] == ["heart"] and reports[0]["overall_risk"]["level"] == "Incomplete"
+        assert not reports[1]["incomplete"] and reports[1]["overall_risk"]["level"] == "Low"
+
+    def test_analysis_is_not_stored_without_any_risk(self, monkeypatch, make_patient):
+        report = {"individual_risks": [], "overall_risk": {"score": None}, "timed_out": ["heart"]}
+        monkeypatch.setattr(executor, "run_selected_agents", lambda patient: report)
+
+        with pytest.raises(AgentTimeoutError, match="heart"):
+            HealthAnalysisService._ml_report(make_patient(age=50))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,194 @@
+"""
+Unit tests for the patient risk history, trend and cohort analytics endpoints
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend import crud, models
+from backend.database import Base, get_db
+from backend.main import app
+from backend.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+START = datetime(2026, 1, 1, 9, 0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+
+    patient = models.Patient(id="p1", name="History Patient", age=60, gender="Male")
+    db.add(patient)
+    for visit in range(5):
+        consultation = models.Consultation(id=f"c{visit}", patient_id="p1", role="Doctor")
+        db.add(consultation)
+        risks = [
+            {"disease": "Heart Disease", "risk_score": 20.0 + visit, "risk_level": "Moderate" if visit < 3 else "High"},
+            {"disease": "Stroke", "risk_score": 5.0, "risk_level": "Low"},
+        ]
+        # Visits 3 and 4 share a timestamp: the id breaks the tie
+        assessed_at = START + timedelta(days=min(visit, 3))
+        db.add(
+            models.HealthAssessment(
+                id=f"a{visit}",
+                consultation_id=consultation.id,
+                overall_risk_score=10.0 * visit,
+                overall_risk_level="Low",
+                individual_risks=risks,
+                assessed_at=assessed_at,
+                risk_timeseries=[
+                    models.PatientRiskTimeseries(patient_id="p1", assessed_at=assessed_at, **values)
+                    for values in crud.risk_timeseries_rows(risks)
+                ],
+            )
+        )
+    db.commit()
+
+    app.dependency_overrides[get_db] = lambda: db
+    yield db
+    app.dependency_overrides.pop(get_db, None)
+    db.close()
+    engine.dispose()
+
+
+client = TestClient(app)
+
+
+class TestPatientHistory:
+    """Test /api/analytics/patients/{patient_id}/history"""
+
+    def test_history_is_sorted_with_disease_scores(self, session):
+        history = client.get("/api/analytics/patients/p1/history").json()
+
+        assert [entry["overall_score"] for entry in history] == [0.0, 10.0, 20.0, 30.0, 40.0]
+        assert history[0]["Heart Disease"] == 20.0
+        assert history[0]["Stroke"] == 5.0
+        assert history[0]["date"] == START.isoformat()
+
+    def test_one_query_per_page(self, session):
+        statements = []
+        event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        client.get("/api/analytics/patients/p1/history")
+
+        assert len(statements) == 1
+
+    def test_keyset_pages(self, session):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/analytics/patients/p1/history", params=params)
+            seen += [entry["overall_score"] for entry in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert seen == [0.0, 10.0, 20.0, 30.0, 40.0]
+
+    def test_date_range(self, session):
+        params = {"since": (START + timedelta(days=1)).isoformat(), "until": (START + timedelta(days=3)).isoformat()}
+        history = client.get("/api/analytics/patients/p1/history", params=params).json()
+
+        assert [entry["overall_score"] for entry in history] == [10.0, 20.0]
+
+    def test_invalid_cursor(self, session):
+        response = client.get("/api/analytics/patients/p1/history", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+
+
+class TestPatientTrend:
+    """Test /api/analytics/patients/{patient_id}/trend"""
+
+    def test_trend_of_one_disease(self, session):
+        trend = client.get("/api/analytics/patients/p1/trend", params={"disease": "Heart Disease"}).json()
+
+        assert [point["score"] for point in trend] == [20.0, 21.0, 22.0, 23.0, 24.0]
+        assert trend[0] == {"date": START.isoformat(), "score": 20.0, "level": "Moderate"}
+
+    def test_keyset_pages(self, session):
+        params = {"disease": "Heart Disease", "limit": 3}
+        first = client.get("/api/analytics/patients/p1/trend", params=params)
+        second = client.get(
+            "/api/analytics/patients/p1/trend", params={**params, "cursor": first.headers["X-Next-Cursor"]}
+        )
+
+        assert [point["score"] for point in first.json() + second.json()] == [20.0, 21.0, 22.0, 23.0, 24.0]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_unknown_disease_is_empty(self, session):
+        assert client.get("/api/analytics/patients/p1/trend", params={"disease": "Gout"}).json() == []
+
+
+class TestDiseaseSummary:
+    """Test /api/analytics/diseases/{disease}/summary"""
+
+    def test_counts_and_mean_by_level(self, session):
+        summary = client.get("/api/analytics/diseases/Heart Disease/summary").json()
+
+        assert summary["assessments"] == 5
+        assert summary["patients"] == 1
+        assert summary["average_score"] == 22.0
+        assert summary["levels"]["Moderate"] == {"assessments": 3, "patients": 1, "average_score": 21.0}
+        assert summary["levels"]["High"]["assessments"] == 2
+
+    def test_time_window(self, session):
+        params = {"since": (START + timedelta(days=3)).isoformat()}
+        summary = client.get("/api/analytics/diseases/Heart Disease/summary", params=params).json()
+
+        assert summary["assessments"] == 2
+        assert set(summary["levels"]) == {"High"}
+
+
+class TestCreateAssessment:
+    """Test POST /api/assessments maintains patient_risk_timeseries"""
+
+    def test_timeseries_rows_are_written_with_the_assessment(self, session):
+        payload = {
+            "consultation_id": "c0",
+            "overall_risk_score": 70.0,
+            "overall_risk_level": "High",
+            "primary_concerns": ["Heart Disease"],
+            "individual_risks": [{"disease": "Heart Disease", "risk_score": 70.0, "risk_level": "High"}],
+        }
+        response = client.post("/api/assessments", json=payload)
+
+        assert response.status_code == 201
+        rows = session.query(models.PatientRiskTimeseries).filter_by(assessment_id=response.json()["id"]).all()
+        assert [(row.patient_id, row.disease, row.score, row.level) for row in rows] == [
+            ("p1", "Heart Disease", 70.0, "High")
+        ]
+        assert rows[0].assessed_at.isoformat() == response.json()["assessed_at"]
+
+    def test_unknown_consultation(self, session):
+        payload = {
+            "consultation_id": "missing",
+            "overall_risk_score": 0.0,
+            "overall_risk_level": "Low",
+            "primary_concerns": [],
+            "individual_risks": [],
+        }
+
+        assert client.post("/api/assessments", json=payload).status_code == 404
+
+
+class TestCursor:
+    """Test cursor encoding"""
+
+    def test_round_trip(self):
+        assert decode_cursor(encode_cursor((START, "a1")), 2) == [START.isoformat(), "a1"]
+
+    def test_wrong_size_is_rejected(self):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(encode_cursor(("a1",)), 2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -6,6 +6,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from backend.main import app
+from src.models.model_loader import ModelUnavailableError
 
 client = TestClient(app)
 
@@ -19,6 +20,14 @@ class TestHealthEndpoint:
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
 
+    def test_db_pool_metrics(self):
+        """Test /health/db-pool reports pool utilization"""
+        client.get("/api/patients")
+        stats = client.get("/health/db-pool").json()
+
+        assert stats["checkouts"] >= 1
+        assert 0 <= stats["utilization"] <= 1
+
 
 class TestAnalyzeEndpoint:
     """Test main analysis endpoint"""
@@ -81,12 +90,116 @@ class TestAnalyzeEndpoint:
         assert response.status_code == 422
 
 
+class TestBatchAnalyzeEndpoint:
+    """Test vectorized batch scoring endpoint"""
+
+    def test_batch_returns_one_report_per_patient(self):
+        """Test /api/analyze/batch keeps request order and report structure"""
+        request_data = {
+            "patients": [
+                {
+                    "patient_data": {"name": "Batch One", "age": 62, "gender": "Male"},
+                    "medical_data": {
+                        "bmi": 29.0,
+                        "blood_pressure": 150,
+                        "blood_glucose": 180,
+                        "cholesterol": 230,
+                        "hypertension": True,
+                    },
+                },
+                {
+                    "patient_data": {"name": "Batch Two", "age": 30, "gender": "Female"},
+                    "medical_data": {"bmi": 22.0},
+                },
+            ]
+        }
+
+        response = client.post("/api/analyze/batch", json=request_data)
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert len(results) == 2
+        for report in results:
+            assert "individual_risks" in report
+            assert {"score", "level", "primary_concerns"} <= set(report["overall_risk"])
+        assert results[1]["individual_risks"][0]["disease"] == "General Health"
+
+    def test_batch_rejects_empty_roster(self):
+        """Test /api/analyze/batch requires at least one patient"""
+        response = client.post("/api/analyze/batch", json={"patients": []})
+        assert response.status_code == 422
+
+
+class TestExplainHeartEndpoint:
+    """Test SHAP explanation formats for /api/explain/heart"""
+
+    PATIENT = {"age": 60, "gender": 1, "blood_pressure": 140, "cholesterol": 260, "chest_pain": True}
+
+    def test_json_top_k_contributions(self):
+        response = client.post("/api/explain/heart?format=json&top_k=3", json=self.PATIENT)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert len(data["contributions"]) == 3
+        impacts = [abs(c["contribution"]) for c in data["contributions"]]
+        assert impacts == sorted(impacts, reverse=True)
+
+    def test_png_is_served_from_cache(self):
+        first = client.post("/api/explain/heart", json=self.PATIENT)
+        hits = client.get("/health/shap-plot-cache").json()["hits"]
+        second = client.post("/api/explain/heart", json=self.PATIENT)
+
+        assert first.status_code == second.status_code == 200
+        assert first.text == second.text
+        assert client.get("/health/shap-plot-cache").json()["hits"] == hits + 1
+
+
+class TestExplainDiseaseEndpoint:
+    """Test the unified explain API"""
+
+    def test_batch_attributions(self):
+        patients = [{"age": 58, "blood_pressure": 150, "creatinine": 2.1}, {"age": 30, "creatinine": 0.9}]
+        response = client.post("/api/explain/kidney/batch", json={"patients": patients, "top_k": 5})
+        assert response.status_code == 200
+
+        explanations = response.json()["explanations"]
+        assert len(explanations) == 2
+        assert all(len(e["contributions"]) == 5 for e in explanations)
+
+    def test_malformed_batch_is_rejected(self):
+        response = client.post("/api/explain/kidney/batch", json={"patients": [1, 2]})
+        assert response.status_code == 422
+
+    def test_unknown_disease(self):
+        assert client.post("/api/explain/flu/batch", json={"patients": [{}]}).status_code == 404
+        assert client.post("/api/explain/flu", json={}).status_code == 404
+
+    @pytest.mark.parametrize("disease", ["heart", "diabetes", "kidney", "liver", "stroke"])
+    @pytest.mark.parametrize("response_format", ["png", "json"])
+    def test_invalid_patient_values(self, disease, response_format):
+        response = client.post(f"/api/explain/{disease}?format={response_format}", json={"age": "old"})
+        assert response.status_code == 422
+
+    def test_missing_model(self, monkeypatch):
+        from src.coordinator import attribution_engine
+
+        def unavailable(*args):
+            raise ModelUnavailableError("Model 'liver' is unavailable: not found")
+
+        monkeypatch.setattr(attribution_engine, "generate_plot", unavailable)
+        monkeypatch.setattr(attribution_engine, "explain_batch", unavailable)
+
+        assert client.post("/api/explain/liver", json={"age": 40}).status_code == 503
+        assert client.post("/api/explain/liver/batch", json={"patients": [{"age": 40}]}).status_code == 503
+
+
 class TestDatabaseEndpoints:
     """Test database CRUD endpoints"""
 
     def test_create_patient(self):
         """Test patient creation endpoint"""
         import uuid
+
         email = f"test_{uuid.uuid4().hex[:8]}@example.com"
         patient_data = {"name": "John Doe", "age": 50, "gender": "Male", "email": email}
 
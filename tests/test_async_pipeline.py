@@ -0,0 +1,213 @@
+"""
+Unit tests for the non-blocking /api/analyze pipeline
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from backend import models, schemas
+from backend.database import Base
+from backend.services import HealthAnalysisService
+from src.agents.doctor_agent import DoctorAgent
+
+
+class FakeLLM:
+    """Async-only LLM stand-in that records calls"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.prompts = []
+
+    def generate(self, prompt):
+        raise AssertionError("blocking generate() must not be used on the async path")
+
+    async def agenerate(self, prompt):
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        if "STRICT JSON SOAP" in prompt:
+            return '{"subjective": {}, "objective": {}, "assessment": {}, "plan": {}, "disclaimer": "test"}'
+        return "Chief complaint: fatigue"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    yield session
+    session.close()
+
+
+def make_service(db, llm):
+    service = HealthAnalysisService(db)
+    service.llm = llm
+    service.doctor_agent = DoctorAgent(llm)
+    return service
+
+
+REQUEST = schemas.AnalyzeHealthRequest(
+    patient_data={"name": "Async Patient", "age": 52, "gender": "Female"},
+    medical_data={"bmi": 27.0, "blood_pressure": 135, "blood_glucose": 120, "cholesterol": 210},
+    conversation_history=[{"role": "patient", "content": "I feel tired"}],
+    role="Doctor",
+)
+
+
+class TestAsyncDoctorAgent:
+    """Test async DoctorAgent helpers"""
+
+    def test_async_summary_and_soap(self):
+        agent = DoctorAgent(FakeLLM())
+
+        summary = asyncio.run(agent.asummarize_case([{"role": "patient", "content": "tired"}]))
+        soap = asyncio.run(agent.agenerate_soap_json({"individual_risks": []}, summary))
+
+        assert summary == "Chief complaint: fatigue"
+        assert soap["disclaimer"] == "test"
+
+
+class TestAsyncAnalyzePipeline:
+    """Test HealthAnalysisService.analyze_health stays off the event loop"""
+
+    def test_analyze_uses_async_llm_and_completes(self, db):
+        llm = FakeLLM()
+        service = make_service(db, llm)
+
+        response = asyncio.run(service.analyze_health(REQUEST))
+
+        assert response.assessment.conversation_summary == "Chief complaint: fatigue"
+        assert response.assessment.soap_json["disclaimer"] == "test"
+        assert response.consultation.stage == "report"
+        assert len(llm.prompts) == 2
+
+    def test_event_loop_keeps_running_during_analysis(self, db):
+        service = make_service(db, FakeLLM(delay=0.2))
+
+        async def scenario():
+            ticks = 0
+            task = asyncio.ensure_future(service.analyze_health(REQUEST))
+            while not task.done():
+                await asyncio.sleep(0.01)
+                ticks += 1
+            await task
+            return ticks
+
+        # Two sequential 0.2s LLM calls alone allow ~40 ticks if the loop is never blocked
+        assert asyncio.run(scenario()) >= 20
+
+    def test_intake_releases_connection_before_llm_calls(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool)
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine, expire_on_commit=False)()
+        request = REQUEST.model_copy(
+            update={"patient_data": REQUEST.patient_data.model_copy(update={"email": "async@example.com"})}
+        )
+        try:
+            make_service(session, FakeLLM())._store_intake(request)
+
+            assert engine.pool.checkedout() == 0
+        finally:
+            session.close()
+            engine.dispose()
+
+
+class TestAnalyzeUnitOfWork:
+    """Test the analysis is written in one transaction"""
+
+    def test_analysis_flushes_and_commits_once(self, db):
+        engine = db.get_bind()
+        commits, statements = [], []
+        event.listen(engine, "commit", lambda conn: commits.append(conn))
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2].split()[0]))
+
+        response = asyncio.run(make_service(db, FakeLLM(delay=0)).analyze_health(REQUEST))
+
+        assert len(commits) == 1
+        # The database time for assessed_at, then one INSERT per table (the
+        # patient_risk_timeseries rows in one batch), no refresh SELECTs
+        assert statements == ["SELECT"] + ["INSERT"] * 6
+        assert response.patient.created_at is not None
+        assert response.assessment.assessed_at is not None
+        assert response.consultation.completed_at is not None
+
+    def test_analysis_writes_risk_timeseries(self, db):
+        response = asyncio.run(make_service(db, FakeLLM(delay=0)).analyze_health(REQUEST))
+
+        rows = db.query(models.PatientRiskTimeseries).all()
+        assert sorted(row.disease for row in rows) == sorted(
+            risk["disease"] for risk in response.assessment.individual_risks
+        )
+        assert {row.patient_id for row in rows} == {response.patient.id}
+        assert {row.assessed_at for row in rows} == {response.assessment.assessed_at}
+
+    def test_failed_analysis_writes_nothing(self, db):
+        service = make_service(db, FakeLLM(delay=0))
+
+        def fail(*args):
+            raise RuntimeError("report generation failed")
+
+        service._generate_reports = fail
+        with pytest.raises(RuntimeError):
+            asyncio.run(service.analyze_health(REQUEST))
+
+        assert db.query(models.Patient).count() == 0
+        assert db.query(models.Consultation).count() == 0
+
+    def test_rollback_waits_for_the_intake_thread(self, db, monkeypatch):
+        from src.coordinator import executor
+
+        events = []
+        ml_failed = threading.Event()
+
+        def fail(patient_state):
+            ml_failed.set()
+            raise RuntimeError("model crashed")
+
+        service = make_service(db, FakeLLM(delay=0))
+        store_intake = service._store_intake
+
+        def slow_intake(request):
+            # Still using the session after the graph has given up on the analysis
+            ml_failed.wait(timeout=5)
+            time.sleep(0.1)
+            result = store_intake(request)
+            events.append("intake done")
+            return result
+
+        rollback = db.rollback
+
+        def tracked_rollback():
+            events.append("rollback")
+            rollback()
+
+        monkeypatch.setattr(executor, "run_selected_agents", fail)
+        service._store_intake = slow_intake
+        db.rollback = tracked_rollback
+
+        with pytest.raises(RuntimeError, match="model crashed"):
+            asyncio.run(service.analyze_health(REQUEST))
+
+        assert events == ["intake done", "rollback"]
+        assert db.query(models.Patient).count() == 0
+
+    def test_update_loads_onupdate_columns(self, db):
+        # Sessions keep objects after commit, so updated_at must come back with the UPDATE
+        patient = models.Patient(name="Before", age=52, gender="Female")
+        db.add(patient)
+        db.commit()
+
+        patient.name = "After"
+        db.commit()
+        db.close()
+
+        assert patient.updated_at is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,87 @@
+"""
+Unit tests for SHAP attributions across all disease models
+"""
+
+import time
+
+import pytest
+
+from src.coordinator import attribution_engine
+from src.coordinator.executor import AGENT_REGISTRY, run_selected_agents
+from src.coordinator.explainability_engine import explain_risk
+from src.models.model_loader import get_model_registry
+
+PATIENT = dict(age=58, gender=1, bmi=31.5, blood_pressure=150, blood_glucose=210, hba1c=7.8, cholesterol=240,
+               creatinine=2.1, urea=55, bilirubin_total=3.0, alt=85, ast=90, hypertension=1, diabetes=1,
+               chest_pain=True)  # fmt: skip
+
+
+class TestExplainBatch:
+    """Every disease model gets attributions that add up to its risk score"""
+
+    @pytest.mark.parametrize("agent_name", sorted(attribution_engine.EXPLAIN_REGISTRY))
+    def test_contributions_add_up_to_risk(self, agent_name, make_patient):
+        if not get_model_registry().is_available(agent_name):
+            pytest.skip(f"{agent_name} model not available")
+        patient_dict = make_patient(**PATIENT).to_dict()
+
+        explanation = attribution_engine.explain_batch(agent_name, [patient_dict, patient_dict], top_k=100)
+
+        assert len(explanation) == 2
+        first = explanation[0]
+        total = first["base_risk_score"] + sum(c["contribution"] for c in first["contributions"])
+        assert total == pytest.approx(first["risk_score"], abs=0.1)
+        assert first["risk_score"] == pytest.approx(AGENT_REGISTRY[agent_name](patient_dict)["risk_score"], abs=0.01)
+
+
+class TestExplanationBudget:
+    """Test budgeted attributions in reports"""
+
+    def test_slow_explanations_fall_back_to_rules(self, monkeypatch):
+        def slow(patients, top_k):
+            time.sleep(0.5)
+            return [{"disease": "Heart Disease", "contributions": []}]
+
+        def fast(patients, top_k):
+            return [{"disease": "Stroke", "contributions": [{"feature": "age", "value": 58, "contribution": 4.2}]}]
+
+        monkeypatch.setitem(attribution_engine.EXPLAIN_REGISTRY, "heart", slow)
+        monkeypatch.setitem(attribution_engine.EXPLAIN_REGISTRY, "stroke", fast)
+
+        attributions = attribution_engine.explain_within_budget(["heart", "stroke"], {}, budget_seconds=0.1)
+
+        assert list(attributions) == ["Stroke"]
+
+    def test_report_uses_attributions_in_shap_mode(self, monkeypatch, make_patient):
+        monkeypatch.setenv("EXPLAIN_MODE", "shap")
+        monkeypatch.setenv("EXPLAIN_BUDGET_MS", "30000")
+
+        report = run_selected_agents(make_patient(**PATIENT))
+
+        heart = next(r for r in report["individual_risks"] if r["disease"] == "Heart Disease")
+        assert all("raised the predicted risk" in reason for reason in heart["why"])
+
+
+class TestExplainRisk:
+    """Test explain_risk with and without attributions"""
+
+    def test_positive_attributions_become_reasons(self):
+        attributions = [
+            {"feature": "cholesterol", "value": 260, "contribution": 5.5},
+            {"feature": "age", "value": 40, "contribution": -2.0},
+        ]
+
+        assert explain_risk("Heart Disease", {}, attributions) == [
+            "Cholesterol (260) raised the predicted risk by 5.5 points."
+        ]
+
+    def test_no_risk_raising_attributions_uses_rules(self):
+        attributions = [{"feature": "age", "value": 40, "contribution": -2.0}]
+
+        assert explain_risk("Heart Disease", {"cholesterol": 250}, attributions) == explain_risk(
+            "Heart Disease", {"cholesterol": 250}
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,60 @@
+"""
+Unit tests for vectorized (batch) risk scoring
+"""
+
+import pytest
+
+from src.coordinator.executor import (
+    AGENT_REGISTRY,
+    BATCH_AGENT_REGISTRY,
+    run_selected_agents,
+    run_selected_agents_batch,
+)
+from src.models.model_loader import get_model_registry
+
+PATIENTS = [
+    dict(age=58, gender=1, bmi=31.5, blood_pressure=150, blood_glucose=210, hba1c=7.8, cholesterol=240,
+         creatinine=2.1, urea=55, bilirubin_total=3.0, alt=85, ast=90, hypertension=1, diabetes=1,
+         heart_disease=0, chest_pain=True, breathlessness=True, fatigue=True, edema=True),
+    dict(age=25, gender=0, bmi=22.0, blood_pressure=115, blood_glucose=90, hba1c=5.1, cholesterol=170),
+    dict(age=67, gender=0, bmi=27.0, blood_pressure=135, blood_glucose=150, cholesterol=210, hypertension=1,
+         heart_disease=1),
+    dict(age=45, gender=1, bmi=29.0, blood_pressure=128, blood_glucose=105, cholesterol=190, creatinine=1.6,
+         alt=60),
+]  # fmt: skip
+
+
+class TestBatchAgents:
+    """Batch agent functions must match the single-row agents exactly"""
+
+    @pytest.mark.parametrize("agent_name", sorted(AGENT_REGISTRY))
+    def test_batch_matches_single(self, agent_name, make_patient):
+        if not get_model_registry().is_available(agent_name):
+            pytest.skip(f"{agent_name} model not available")
+        patient_dicts = [make_patient(**values).to_dict() for values in PATIENTS]
+
+        batch_results = BATCH_AGENT_REGISTRY[agent_name](patient_dicts)
+        single_results = [AGENT_REGISTRY[agent_name](p) for p in patient_dicts]
+
+        assert batch_results == single_results
+
+
+class TestBatchExecutor:
+    """run_selected_agents_batch must keep the per-patient report structure"""
+
+    def test_reports_match_single_patient_path(self, make_patient):
+        batch_reports = run_selected_agents_batch([make_patient(**values) for values in PATIENTS])
+        single_reports = [run_selected_agents(make_patient(**values)) for values in PATIENTS]
+
+        assert batch_reports == single_reports
+
+    def test_unrouted_patient_gets_general_health_report(self, make_patient):
+        reports = run_selected_agents_batch([make_patient(age=30, gender=0)])
+
+        assert len(reports) == 1
+        assert reports[0]["individual_risks"][0]["disease"] == "General Health"
+        assert reports[0]["overall_risk"]["level"] == "Low"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,51 @@
+"""
+Unit tests for the size-bounded LRU cache
+"""
+
+import pytest
+
+from src.core.bounded_cache import BoundedCache
+
+
+class TestBoundedCache:
+    """Test entry and byte bounds"""
+
+    def test_evicts_least_recently_used_by_count(self):
+        cache = BoundedCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.stats()["evictions"] == 1
+
+    def test_evicts_to_stay_under_byte_budget(self):
+        cache = BoundedCache(max_entries=100, max_bytes=10)
+        cache.set("a", b"12345")
+        cache.set("b", b"12345")
+        cache.set("c", b"123")
+
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] <= 10
+
+    def test_oversized_value_is_not_cached(self):
+        cache = BoundedCache(max_bytes=4)
+        cache.set("a", b"12345")
+
+        assert len(cache) == 0
+
+    def test_expired_entry_is_a_miss(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("src.core.bounded_cache.time.monotonic", lambda: now[0])
+        cache = BoundedCache(ttl_seconds=10)
+        cache.set("a", b"12345")
+        now[0] += 11
+
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
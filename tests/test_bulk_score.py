@@ -0,0 +1,132 @@
+"""
+Unit tests for the offline bulk-scoring CLI
+"""
+
+import pandas as pd
+import pytest
+
+from src.bulk_score import bulk_score, main
+from src.coordinator.executor import BATCH_AGENT_REGISTRY, run_selected_agents_batch
+from src.coordinator.patient_state import PatientState
+
+ROWS = [
+    dict(patient_id=100 + i, age=30 + i * 2, gender=i % 2, bmi=22 + i % 9, blood_pressure=110 + i * 3,
+         blood_glucose=90 + i * 7, hba1c=5.0 + i * 0.1, cholesterol=170 + i * 5, creatinine=0.8 + i * 0.05,
+         hypertension=i % 3 == 0, diabetes=i % 4 == 0, heart_disease=0)
+    for i in range(25)
+]  # fmt: skip
+INVALID_ROW = 7
+
+
+@pytest.fixture
+def patients_csv(tmp_path):
+    df = pd.DataFrame(ROWS)
+    df.loc[INVALID_ROW, "blood_pressure"] = 400
+    path = tmp_path / "patients.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def expected_reports():
+    patients = []
+    for row in ROWS:
+        patient = PatientState()
+        for key, value in row.items():
+            if key != "patient_id":
+                setattr(patient, key, value)
+        patients.append(patient)
+    return run_selected_agents_batch(patients)
+
+
+class TestBulkScore:
+    """Test chunked scoring into CSV"""
+
+    def test_scores_match_batch_api(self, patients_csv, tmp_path):
+        output = tmp_path / "scores.csv"
+        progress = []
+
+        summary = bulk_score(patients_csv, output, chunk_size=10, keep=["patient_id"], progress=progress.append)
+
+        result = pd.read_csv(output)
+        assert summary["rows"] == 25 and summary["chunks"] == 3 and summary["invalid_rows"] == 1
+        assert [p["rows"] for p in progress] == [10, 20, 25]
+        assert result["patient_id"].tolist() == [row["patient_id"] for row in ROWS]
+
+        for row, report in enumerate(expected_reports()):
+            if row == INVALID_ROW:
+                continue
+            assert result.loc[row, "overall_score"] == report["overall_risk"]["score"]
+            assert result.loc[row, "overall_level"] == report["overall_risk"]["level"]
+            assert pd.isna(result.loc[row, "validation_errors"])
+
+    def test_invalid_rows_are_reported_not_scored(self, patients_csv, tmp_path):
+        output = tmp_path / "scores.csv"
+        bulk_score(patients_csv, output, chunk_size=10)
+
+        invalid = pd.read_csv(output).loc[INVALID_ROW]
+        assert "blood_pressure" in invalid["validation_errors"]
+        assert pd.isna(invalid["overall_score"]) and pd.isna(invalid["heart_risk_score"])
+
+    def test_workers_give_same_output(self, patients_csv, tmp_path):
+        bulk_score(patients_csv, tmp_path / "serial.csv", chunk_size=6, keep=["patient_id"])
+        bulk_score(patients_csv, tmp_path / "parallel.csv", chunk_size=6, workers=2, keep=["patient_id"])
+
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "serial.csv"), pd.read_csv(tmp_path / "parallel.csv"))
+
+    def test_string_gender_and_flags_score_like_codes(self, patients_csv, tmp_path):
+        codes = pd.read_csv(patients_csv)
+        strings = codes.assign(
+            gender=codes["gender"].map({1: "Male", 0: "female"}),
+            hypertension=codes["hypertension"].map({True: "yes", False: "No"}),
+            diabetes=codes["diabetes"].map({True: "YES", False: "no"}),
+        )
+        strings.to_csv(tmp_path / "strings.csv", index=False)
+
+        bulk_score(patients_csv, tmp_path / "codes_scores.csv", chunk_size=10, keep=["patient_id"])
+        bulk_score(tmp_path / "strings.csv", tmp_path / "strings_scores.csv", chunk_size=10, keep=["patient_id"])
+
+        pd.testing.assert_frame_equal(
+            pd.read_csv(tmp_path / "codes_scores.csv"), pd.read_csv(tmp_path / "strings_scores.csv")
+        )
+
+    def test_scoring_error_fails_only_its_row(self, patients_csv, tmp_path, monkeypatch):
+        failing_row = 12
+        expected = expected_reports()
+        heart = BATCH_AGENT_REGISTRY["heart"]
+
+        def flaky(patients):
+            if any(p["age"] == ROWS[failing_row]["age"] for p in patients):
+                raise ValueError("could not convert string to float")
+            return heart(patients)
+
+        monkeypatch.setitem(BATCH_AGENT_REGISTRY, "heart", flaky)
+        summary = bulk_score(patients_csv, tmp_path / "scores.csv", chunk_size=10)
+
+        result = pd.read_csv(tmp_path / "scores.csv")
+        assert summary["rows"] == 25 and summary["invalid_rows"] == 2
+        assert "ValueError" in result.loc[failing_row, "validation_errors"]
+        assert pd.isna(result.loc[failing_row, "overall_score"])
+        for row, report in enumerate(expected):
+            if row not in (INVALID_ROW, failing_row):
+                assert result.loc[row, "overall_score"] == report["overall_risk"]["score"]
+
+    def test_parquet_roundtrip(self, patients_csv, tmp_path):
+        pytest.importorskip("pyarrow")
+        source = tmp_path / "patients.parquet"
+        pd.read_csv(patients_csv).to_parquet(source)
+
+        bulk_score(source, tmp_path / "scores.parquet", chunk_size=10, keep=["patient_id"])
+
+        assert len(pd.read_parquet(tmp_path / "scores.parquet")) == 25
+
+    def test_cli(self, patients_csv, tmp_path, capsys):
+        output = tmp_path / "scores.csv"
+
+        assert main([str(patients_csv), str(output), "--chunk-size", "10", "--keep", "patient_id", "--quiet"]) == 0
+
+        assert "Scored 25 rows (1 invalid) in 3 chunks" in capsys.readouterr().out
+        assert output.exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
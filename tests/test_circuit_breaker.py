@@ -0,0 +1,217 @@
+"""
+Unit tests for LLM circuit breakers and adaptive model ordering
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ModelRouter
+from src.core.llm_client import GeminiClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCompletions:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def create(self, model, messages, **kwargs):
+        self.calls.append(model)
+        if model in self.failing:
+            raise RuntimeError(f"{model} unavailable")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"answer from {model}"))])
+
+
+def make_client(monkeypatch, router, failing=()):
+    monkeypatch.setenv("GROQ_API_KEY", "test_key")
+    llm = GeminiClient(router=router)
+    llm.cache = None
+    completions = FakeCompletions(failing)
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return llm, completions
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions"""
+
+    def test_opens_after_threshold_and_probes_after_timeout(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow_request()
+
+        clock.now = 10
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()  # only one probe in flight
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 5
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert not breaker.allow_request()
+
+    def test_released_probe_can_be_retried(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 5
+        assert breaker.allow_request()
+        breaker.release()
+
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow_request()
+
+
+class TestModelRouter:
+    """Test health-based ordering"""
+
+    def test_unhealthy_model_moves_down_and_open_model_is_skipped(self):
+        router = ModelRouter(failure_threshold=3)
+        models = ["primary", "secondary", "tertiary"]
+
+        router.record_failure("primary")
+        assert router.order(models)[0] != "primary"
+
+        router.record_failure("primary")
+        router.record_failure("primary")
+        assert "primary" not in router.order(models)
+
+    def test_faster_model_preferred_at_equal_success(self):
+        router = ModelRouter()
+        router.record_success("slow", 2.0)
+        router.record_success("fast", 0.2)
+
+        assert router.order(["slow", "fast"]) == ["fast", "slow"]
+
+    def test_demoted_model_recovers_while_idle(self):
+        clock = FakeClock()
+        router = ModelRouter(recovery_half_life=60, clock=clock)
+        models = ["primary", "fallback"]
+        router.record_success("primary", 1.0)
+        router.record_failure("primary")
+        for _ in range(5):
+            router.record_success("fallback", 1.0)
+
+        assert router.order(models) == ["fallback", "primary"]
+
+        # Only the fallback is called meanwhile; the primary's failure is forgotten
+        clock.now = 300
+        router.record_success("fallback", 1.0)
+        assert router.order(models) == ["primary", "fallback"]
+
+
+class TestGeminiClientBreakers:
+    """Test generate() skips failing models and never sleeps"""
+
+    def test_outage_goes_straight_to_working_model(self, monkeypatch):
+        router = ModelRouter(failure_threshold=1, reset_timeout=60)
+        llm, completions = make_client(monkeypatch, router, failing=["llama-3.3-70b-versatile"])
+
+        assert llm.generate("first") == "answer from llama-3.1-70b-versatile"
+        completions.calls.clear()
+
+        assert llm.generate("second") == "answer from llama-3.1-70b-versatile"
+        assert completions.calls == ["llama-3.1-70b-versatile"]
+
+    def test_all_breakers_open_returns_fallback_without_calls(self, monkeypatch):
+        router = ModelRouter(failure_threshold=1, reset_timeout=60)
+        llm, completions = make_client(monkeypatch, router)
+        completions.failing = set(llm.models)
+
+        llm.generate("first")
+        completions.calls.clear()
+
+        assert llm.generate("second") == llm._fallback_response()
+        assert completions.calls == []
+
+
+class HangingCompletions:
+    """Async completions whose primary-model call never returns"""
+
+    def __init__(self, primary):
+        self.primary = primary
+        self.started = asyncio.Event()
+
+    async def create(self, model, messages, stream=False, **kwargs):
+        if model == self.primary:
+            self.started.set()
+            if stream:
+                return self._stream()
+            await asyncio.Event().wait()
+        message = SimpleNamespace(content=f"answer from {model}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def _stream(self):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="partial"))])
+        await asyncio.Event().wait()
+
+
+class TestCancelledProbe:
+    """A cancelled half-open probe must not block the model forever"""
+
+    def half_open_client(self, monkeypatch):
+        clock = FakeClock()
+        router = ModelRouter(failure_threshold=1, reset_timeout=10, clock=clock)
+        llm, _ = make_client(monkeypatch, router)
+        primary = llm.models[0]
+        llm.models = [primary]  # the probe is the only call
+        router.record_failure(primary)
+        clock.now = 10
+        completions = HangingCompletions(primary)
+        llm.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return llm, router, primary, completions
+
+    def test_cancelled_agenerate_releases_probe(self, monkeypatch):
+        llm, router, primary, completions = self.half_open_client(monkeypatch)
+
+        async def run():
+            task = asyncio.ensure_future(llm.agenerate("prompt"))
+            await asyncio.wait_for(completions.started.wait(), timeout=5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+        assert router.health(primary).breaker.state == HALF_OPEN
+        assert router.allow(primary)
+
+    def test_closed_stream_releases_probe(self, monkeypatch):
+        llm, router, primary, _ = self.half_open_client(monkeypatch)
+
+        async def run():
+            stream = llm.astream("prompt")
+            assert await stream.__anext__() == "partial"
+            await stream.aclose()  # client disconnected mid-SSE
+
+        asyncio.run(run())
+
+        assert router.allow(primary)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
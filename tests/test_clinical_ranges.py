@@ -0,0 +1,140 @@
+"""
+Unit tests for the clinical range table and its vectorized validator
+"""
+
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from backend.schemas import MedicalRecordBase
+from src.coordinator.executor import run_selected_agents_batch
+from src.coordinator.patient_state import PatientState
+from src.core.clinical_ranges import (
+    CLINICAL_RANGES,
+    ClinicalRangeError,
+    Range,
+    RangeValidator,
+    normalize_patient,
+    validate_patients,
+)
+from src.core.patient_schema import PATIENT_SCHEMA
+
+VALID = {
+    "age": 58,
+    "gender": 1,
+    "blood_pressure": 140,
+    "bmi": 31.5,
+    "blood_glucose": 180,
+    "cholesterol": 240,
+    "creatinine": 1.4,
+    "bilirubin_total": 1.1,
+    "hypertension": 1,
+    "chest_pain": True,
+    "smoking_raw": "former",
+}
+
+
+class TestClinicalRangeTable:
+    """Test the declarative table"""
+
+    def test_covers_every_patient_schema_feature(self):
+        assert set(CLINICAL_RANGES) == set(PATIENT_SCHEMA)
+
+    def test_api_schema_uses_table_limits(self):
+        high = CLINICAL_RANGES["urea"].high
+        assert MedicalRecordBase(urea=high).urea == high
+        with pytest.raises(ValidationError):
+            MedicalRecordBase(urea=high + 1)
+
+
+class TestRangeValidator:
+    """Test batch validation with per-row failures"""
+
+    def test_valid_rows(self):
+        validator = RangeValidator()
+        assert validator.failures([VALID, {}, {"age": None, "bmi": float("nan")}]) == [[], [], []]
+
+    def test_failures_reported_per_row(self):
+        rows = [VALID, {**VALID, "age": 150}, VALID, {**VALID, "blood_pressure": 20, "gender": "unknown"}]
+
+        failures = RangeValidator().failures(rows)
+
+        assert failures[0] == [] and failures[2] == []
+        assert failures[1] == [{"row": 1, "column": "age", "check": "in_range(0, 120)", "failure_case": 150}]
+        assert {f["column"] for f in failures[3]} == {"blood_pressure", "gender"}
+
+    def test_aliases_are_validated(self):
+        failures = RangeValidator().failures([{"bilirubin_total": 80.0}])
+        assert failures[0][0]["column"] == "total_bilirubin"
+
+    def test_non_numeric_value(self):
+        failures = RangeValidator().failures([VALID, {"cholesterol": "high"}])
+        assert failures[1] == [{"row": 1, "column": "cholesterol", "check": "numeric", "failure_case": "high"}]
+
+    def test_choices_are_case_insensitive(self):
+        assert RangeValidator().failures([{"smoking_raw": "Current", "residence_type": "Urban"}]) == [[]]
+
+    def test_validate_raises_value_error(self):
+        with pytest.raises(ValueError) as error:
+            validate_patients([VALID, {"hba1c": 25}])
+
+        assert isinstance(error.value, ClinicalRangeError)
+        assert error.value.failures[0]["row"] == 1
+
+    def test_custom_table(self):
+        validator = RangeValidator({"score": Range(0, 10)}, aliases={})
+        assert validator.failures([{"score": 5}, {"score": 11}])[1][0]["column"] == "score"
+
+    def test_large_batch_is_fast(self):
+        rows = [VALID] * 5000
+        validator = RangeValidator()
+
+        start = time.perf_counter()
+        validator.validate(rows)
+
+        assert time.perf_counter() - start < 1.0
+
+
+class TestNormalizePatient:
+    """Accepted string choices score exactly like their numeric encoding"""
+
+    STRINGS = {**VALID, "gender": "Male", "hypertension": "yes", "diabetes": "No", "chest_pain": "YES"}
+    CODES = {**VALID, "gender": 1, "hypertension": 1, "diabetes": 0, "chest_pain": 1}
+
+    def test_strings_become_codes(self):
+        assert normalize_patient(self.STRINGS) == self.CODES
+        assert normalize_patient({"gender": "female", "poor_appetite": " Poor "}) == {"gender": 0, "poor_appetite": 1}
+
+    def test_unknown_strings_are_left_for_the_validator(self):
+        assert normalize_patient({"gender": "unknown"}) == {"gender": "unknown"}
+
+    def test_work_type_names_are_rejected(self):
+        assert RangeValidator().failures([{"work_type": "private"}])[0][0]["column"] == "work_type"
+
+    def test_string_values_score_like_codes(self, make_patient):
+        strings, codes = run_selected_agents_batch([make_patient(**self.STRINGS), make_patient(**self.CODES)])
+
+        assert strings == codes
+        assert {r["disease"] for r in strings["individual_risks"]} >= {"Heart Disease", "Stroke"}
+
+
+class TestBatchScoringValidation:
+    """Test validation on the batch scoring path"""
+
+    def test_invalid_row_rejects_batch(self):
+        patients = []
+        for values in (VALID, {**VALID, "creatinine": 40}):
+            patient = PatientState()
+            for key, value in values.items():
+                setattr(patient, key, value)
+            patients.append(patient)
+
+        with pytest.raises(ClinicalRangeError) as error:
+            run_selected_agents_batch(patients)
+
+        assert [(f["row"], f["column"]) for f in error.value.failures] == [(1, "creatinine")]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,120 @@
+"""
+Unit tests for the versioned clinical rule file and its hot reload
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from src.coordinator.aggregator import aggregate_risks
+from src.coordinator.explainability_engine import explain_risk
+from src.core.clinical_rules import RULES_PATH, ClinicalRules, RuleStore, get_rules, risk_level
+
+client = TestClient(app)
+
+
+def load_spec():
+    with open(RULES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_spec(path, spec, mtime):
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+class TestClinicalRules:
+    """Test the compiled rules"""
+
+    @pytest.mark.parametrize(
+        "score, level",
+        [
+            (0, "Low"),
+            (19.99, "Low"),
+            (20, "Moderate"),
+            (49.9, "Moderate"),
+            (50, "High"),
+            (75, "Critical"),
+            (100, "Critical"),
+        ],
+    )
+    def test_risk_level_cutoffs(self, score, level):
+        assert risk_level(score) == level
+
+    def test_vectorized_risk_levels_match_scalar(self):
+        scores = np.linspace(0, 100, 1001)
+        rules = get_rules()
+
+        assert rules.risk_levels(scores).tolist() == [rules.risk_level(s) for s in scores]
+
+    def test_explanations(self):
+        patient = {"hba1c": 7.0, "blood_glucose": None, "bmi": 31}
+
+        assert explain_risk("Diabetes", patient) == [
+            "Elevated HbA1c suggests poor long-term glucose control.",
+            "Increased BMI is a known risk factor for insulin resistance.",
+        ]
+        assert explain_risk("Heart Disease", {"chest_pain": True}) == [
+            "Presence of chest pain raises concern for cardiac origin."
+        ]
+        assert explain_risk("Stroke", {}) == ["Risk inferred based on combined clinical feature patterns."]
+
+    def test_primary_concern_cutoff(self):
+        summary = aggregate_risks(
+            {"individual_risks": [{"disease": "A", "risk_score": 70}, {"disease": "B", "risk_score": 69.9}]}
+        )
+
+        assert summary["primary_concerns"] == ["A"]
+        assert summary["overall_risk_level"] == risk_level(summary["overall_risk_score"])
+
+    def test_invalid_rules_are_rejected(self):
+        spec = load_spec()
+        spec["routing"]["heart"] = [{"field": "age", "op": "~", "value": 40}]
+
+        with pytest.raises(ValueError):
+            ClinicalRules(spec)
+
+
+class TestRuleStore:
+    """Test hot reload from the rule file"""
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        path = tmp_path / "rules.json"
+        spec = load_spec()
+        write_spec(path, spec, mtime=1_000_000)
+        store = RuleStore(path, reload_seconds=0.001)
+        assert store.get().risk_level(60) == "High"
+
+        spec["version"] = "test-2"
+        spec["risk_levels"][2]["below"] = 55
+        write_spec(path, spec, mtime=1_000_100)
+        store._next_check = 0  # the recheck interval has elapsed
+
+        assert store.get().version == "test-2"
+        assert store.get().risk_level(60) == "Critical"
+
+    def test_broken_file_keeps_previous_rules(self, tmp_path):
+        path = tmp_path / "rules.json"
+        write_spec(path, load_spec(), mtime=1_000_000)
+        store = RuleStore(path, reload_seconds=0.001)
+        version = store.get().version
+
+        path.write_text("{not json", encoding="utf-8")
+        os.utime(path, (1_000_100, 1_000_100))
+        store._next_check = 0
+
+        assert store.get().version == version
+
+    def test_health_endpoint(self):
+        response = client.get("/health/rules")
+
+        assert response.status_code == 200
+        assert response.json()["version"] == get_rules().version
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
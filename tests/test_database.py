@@ -0,0 +1,102 @@
+"""
+Unit tests for the database engine pool configuration and metrics
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud
+from backend.database import Base, MeteredQueuePool, engine_options, pool_metrics
+
+
+@pytest.fixture
+def file_engine(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "0.05")
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **engine_options(url))
+    pool_metrics.reset()
+    yield engine
+    engine.dispose()
+
+
+class TestEngineOptions:
+    """Test environment-driven pool options"""
+
+    def test_defaults(self, monkeypatch):
+        for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_TIMEOUT", "DB_POOL_RECYCLE", "DB_POOL_PRE_PING"):
+            monkeypatch.delenv(name, raising=False)
+
+        options = engine_options("postgresql://user:pw@db/healthcare_db")
+
+        assert options["poolclass"] is MeteredQueuePool
+        assert (options["pool_size"], options["max_overflow"], options["pool_timeout"]) == (5, 10, 30.0)
+        assert options["pool_pre_ping"] is True
+        assert options["pool_recycle"] == 1800
+
+    def test_environment_overrides(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_SIZE", "20")
+        monkeypatch.setenv("DB_POOL_PRE_PING", "0")
+
+        options = engine_options("postgresql://user:pw@db/healthcare_db")
+
+        assert options["pool_size"] == 20
+        assert options["pool_pre_ping"] is False
+
+    def test_in_memory_sqlite_keeps_its_pool(self):
+        assert "poolclass" not in engine_options("sqlite://")
+
+
+class TestPoolMetrics:
+    """Test checkout wait and utilization metrics"""
+
+    def test_checkouts_and_utilization(self, file_engine):
+        with file_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            stats = pool_metrics.snapshot(file_engine.pool)
+
+        assert stats["checkouts"] == 1
+        assert stats["checked_out"] == 1
+        assert stats["utilization"] == 1.0
+        assert pool_metrics.snapshot(file_engine.pool)["checked_out"] == 0
+
+    def test_exhausted_pool_counts_timeouts(self, file_engine):
+        with file_engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                file_engine.connect()
+
+        stats = pool_metrics.snapshot(file_engine.pool)
+        assert stats["timeouts"] == 1
+        assert stats["peak_checked_out"] == 1
+
+
+class TestIndexes:
+    """Test the hot lookups are served by the model indexes"""
+
+    def query_plan(self, engine, lookup):
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2:4]))
+        db = sessionmaker(bind=engine)()
+        lookup(db)
+        db.close()
+        statement, parameters = statements[-1]
+        with engine.connect() as conn:
+            return " ".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters))
+
+    def test_lookups_use_composite_indexes(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+
+        records_plan = self.query_plan(engine, lambda db: crud.get_patient_medical_records(db, "p1"))
+        assessments_plan = self.query_plan(engine, lambda db: crud.get_consultation_assessments(db, "c1"))
+
+        assert "USING INDEX ix_medical_records_patient_id_recorded_at" in records_plan
+        assert "USING INDEX ix_health_assessments_consultation_id_assessed_at" in assessments_plan
+        assert "TEMP B-TREE" not in records_plan + assessments_plan  # no sort step
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
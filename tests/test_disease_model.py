@@ -0,0 +1,70 @@
+"""
+Unit tests for the scoring shared by the disease agents
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents import diabetes_agent, heart_agent, kidney_agent, liver_agent, stroke_agent
+from src.coordinator import disease_model
+from src.coordinator.disease_model import DiseaseModel, disease_probability, risk_results
+
+
+class FakeModel:
+    """Classifier whose class-0 probability is the x column"""
+
+    classes_ = np.array([0, 1])
+
+    def predict_proba(self, X):
+        p = X["x"].to_numpy(dtype=float)
+        return np.column_stack([p, 1 - p])
+
+
+def frame(patients):
+    return pd.DataFrame([{"x": p.get("x", 0.0)} for p in patients])
+
+
+class TestDiseaseModel:
+    """Test the shared results handling"""
+
+    def test_probability_column_follows_classes(self):
+        X = frame([{"x": 0.2}, {"x": 0.9}])
+
+        assert disease_probability(FakeModel(), X, positive_class=0).tolist() == [0.2, 0.9]
+        assert disease_probability(FakeModel(), X, positive_class=1).tolist() == pytest.approx([0.8, 0.1])
+
+    def test_risk_results(self):
+        results = risk_results("Stroke", [0.12345, 0.9])
+
+        assert [r["risk_score"] for r in results] == [12.35, 90.0]
+        assert {r["disease"] for r in results} == {"Stroke"}
+        assert all(isinstance(r["risk_score"], float) for r in results)
+
+    def test_risk_batch_validates_then_scores(self, monkeypatch):
+        registry = type("Registry", (), {"get": lambda self, name: FakeModel()})()
+        monkeypatch.setattr(disease_model, "get_model_registry", lambda: registry)
+        validated = []
+
+        def validate(X):
+            validated.append(len(X))
+            return X
+
+        model = DiseaseModel("fake", "Fake Disease", frame, positive_class=0, validate=validate)
+
+        assert [r["risk_score"] for r in model.risk_batch([{"x": 0.25}, {"x": 0.5}])] == [25.0, 50.0]
+        assert validated == [2]
+
+    @pytest.mark.parametrize("agent", [diabetes_agent, heart_agent, kidney_agent, liver_agent, stroke_agent])
+    def test_agents_share_one_implementation(self, agent):
+        assert isinstance(agent.MODEL, DiseaseModel)
+        assert agent.explain_batch.__func__ is DiseaseModel.explain_batch
+        # The process pool pickles the agent functions by reference
+        name = agent.__name__.rsplit(".", 1)[1].replace("_agent", "")
+        assert pickle.loads(pickle.dumps(getattr(agent, f"{name}_risk_batch"))) is getattr(agent, f"{name}_risk_batch")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,111 @@
+"""
+Unit tests for model-type-specific SHAP explainers
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents import heart_agent
+from src.agents.diabetes_agent import _diabetes_row
+from src.agents.kidney_agent import FEATURE_ORDER as KIDNEY_FEATURES
+from src.agents.kidney_agent import _kidney_row
+from src.agents.stroke_adapter import adapt_stroke_features
+from src.models.explainers import build_explainer
+from src.models.model_loader import get_model_registry
+
+PATIENT_VALUES = [
+    dict(age=58, gender=1, bmi=31.5, blood_pressure=150, blood_glucose=210, hba1c=7.8, cholesterol=240,
+         creatinine=2.1, urea=55, hypertension=1, diabetes=1, chest_pain=True, smoking_raw="current"),
+    dict(age=25, gender=0, bmi=22.0, blood_pressure=115, blood_glucose=90, hba1c=5.1, cholesterol=170),
+    dict(age=67, gender=0, bmi=27.0, blood_pressure=135, blood_glucose=150, cholesterol=210, hypertension=1,
+         heart_disease=1, smoking_raw="former"),
+    dict(age=45, gender=1, bmi=29.0, blood_pressure=128, blood_glucose=105, cholesterol=190, creatinine=1.6),
+]  # fmt: skip
+
+
+@pytest.fixture
+def patients(make_patient):
+    return [make_patient(**values).to_dict() for values in PATIENT_VALUES]
+
+
+def assert_additive(explainer, model, X, class_index):
+    explanation = explainer.explain(X)
+    expected = model.predict_proba(X)[:, class_index]
+    assert explanation.contributions.shape == (len(X), X.shape[1])
+    np.testing.assert_allclose(explanation.probabilities, expected, atol=1e-6)
+
+
+class TestExplainerSelection:
+    """Each model type gets an exact explainer whose attributions add up to the prediction"""
+
+    def test_stacking_heart_model(self):
+        model = get_model_registry().get("heart")
+        background = heart_agent.load_background(50)
+        explainer = build_explainer(model, background, positive_class=1)
+
+        assert explainer.method == "stacking"
+        assert_additive(explainer, model, background.iloc[:10], 1)
+
+    def test_tree_model_explains_requested_class(self, patients):
+        model = get_model_registry().get("kidney")
+        X = pd.DataFrame([_kidney_row(p) for p in patients], columns=KIDNEY_FEATURES)
+        explainer = build_explainer(model, X, positive_class=0)  # class 0 = CKD
+
+        assert explainer.method == "tree"
+        assert_additive(explainer, model, X, list(model.classes_).index(0))
+
+    @pytest.mark.parametrize("per_class_list", [False, True])
+    def test_tree_model_with_two_patients(self, per_class_list, monkeypatch, patients):
+        import shap
+
+        if per_class_list:
+            # Older shap: a list of (n, features) arrays, one per class
+            shap_values = shap.TreeExplainer.shap_values
+            monkeypatch.setattr(
+                shap.TreeExplainer,
+                "shap_values",
+                lambda self, X, **kwargs: list(np.moveaxis(np.asarray(shap_values(self, X, **kwargs)), 2, 0)),
+            )
+        model = get_model_registry().get("kidney")
+        # Two patients and two classes: the list layout stacks to (2, 2, features)
+        X = pd.DataFrame([_kidney_row(p) for p in patients[:2]], columns=KIDNEY_FEATURES)
+        explainer = build_explainer(model, X, positive_class=0)
+
+        assert_additive(explainer, model, X, list(model.classes_).index(0))
+
+    def test_linear_pipeline(self, patients):
+        model = get_model_registry().get("stroke")
+        X = pd.DataFrame([adapt_stroke_features(p) for p in patients])
+        explainer = build_explainer(model, X, positive_class=1)
+
+        assert explainer.method == "pipeline/linear"
+        assert_additive(explainer, model, X, 1)
+
+    def test_one_hot_pipeline_maps_back_to_input_columns(self, patients):
+        model = get_model_registry().get("diabetes")
+        X = pd.DataFrame([_diabetes_row(p) for p in patients])
+        explainer = build_explainer(model, X, positive_class=1)
+
+        assert explainer.method == "pipeline/tree"
+        assert explainer.feature_names == list(X.columns)
+        assert_additive(explainer, model, X, 1)
+
+
+class TestHeartExplanations:
+    """Test the cached heart explainer"""
+
+    def test_batch_matches_single_and_risk(self, patients):
+        batch = heart_agent.explain_heart_batch(patients)
+        single = [heart_agent.explain_heart_batch([p])[0] for p in patients]
+
+        for batch_row, single_row in zip(batch, single):
+            assert batch_row.keys() == single_row.keys()
+            assert np.allclose(list(batch_row.values()), list(single_row.values()))
+
+    def test_explainer_is_built_once(self):
+        assert heart_agent.get_shap_explainer() is heart_agent.get_shap_explainer()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,147 @@
+"""
+Unit tests for the streaming assessment export
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend import models
+from backend.database import Base, get_session_factory
+from backend.main import app
+from backend.routers.export import EXPORT_COLUMNS, export_watermark, stream_assessments
+
+START = datetime(2026, 2, 1, 10, 0)
+
+
+def add_assessment(db, i, assessed_at):
+    db.add(models.Consultation(id=f"c{i}", patient_id="p1", role="Doctor"))
+    db.add(
+        models.HealthAssessment(
+            id=f"a{i}",
+            consultation_id=f"c{i}",
+            overall_risk_score=10.0 * i,
+            overall_risk_level="Low",
+            primary_concerns=[],
+            individual_risks=[{"disease": "Stroke", "risk_score": 10.0 * i}],
+            assessed_at=assessed_at,
+        )
+    )
+    db.commit()
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    db = factory()
+    db.add(models.Patient(id="p1", name="Export Patient", age=50, gender="Male"))
+    for i in range(5):
+        add_assessment(db, i, START + timedelta(hours=i))
+    db.close()
+
+    app.dependency_overrides[get_session_factory] = lambda: factory
+    yield factory
+    app.dependency_overrides.pop(get_session_factory, None)
+    engine.dispose()
+
+
+client = TestClient(app)
+
+
+class TestExportAssessments:
+    """Test GET /api/export/assessments"""
+
+    def test_ndjson(self, session_factory):
+        response = client.get("/api/export/assessments")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [row["id"] for row in rows] == [f"a{i}" for i in range(5)]
+        assert rows[1]["patient_id"] == "p1"
+        assert rows[1]["individual_risks"] == [{"disease": "Stroke", "risk_score": 10.0}]
+        assert rows[1]["assessed_at"] == (START + timedelta(hours=1)).isoformat()
+
+    def test_csv(self, session_factory):
+        response = client.get("/api/export/assessments", params={"format": "csv"})
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+
+        assert list(rows[0]) == EXPORT_COLUMNS
+        assert len(rows) == 5
+        assert json.loads(rows[2]["individual_risks"])[0]["risk_score"] == 20.0
+
+    def test_incremental_export_since_watermark(self, session_factory):
+        first = client.get("/api/export/assessments", params={"until": (START + timedelta(hours=2)).isoformat()})
+        watermark = first.headers["X-Export-Watermark"]
+
+        second = client.get("/api/export/assessments", params={"since": watermark})
+
+        assert [json.loads(line)["id"] for line in first.text.splitlines()] == ["a0", "a1"]
+        assert [json.loads(line)["id"] for line in second.text.splitlines()] == ["a2", "a3", "a4"]
+        assert second.headers["X-Export-Watermark"] > watermark
+
+    def test_default_watermark_trails_open_transactions(self, session_factory, monkeypatch):
+        monkeypatch.setenv("EXPORT_WATERMARK_LAG_SECONDS", "60")
+        db = session_factory()
+        now = db.execute(select(func.now())).scalar()
+        # An assessment stamped just now could belong to a transaction the export cannot see yet
+        add_assessment(db, 5, now)
+        db.close()
+
+        response = client.get("/api/export/assessments")
+        watermark = datetime.fromisoformat(response.headers["X-Export-Watermark"])
+
+        assert timedelta(seconds=59) <= now - watermark <= timedelta(seconds=60)
+        assert "a5" not in [json.loads(line)["id"] for line in response.text.splitlines()]
+
+    def test_watermark_never_moves_back_past_since(self, session_factory):
+        db = session_factory()
+        now = db.execute(select(func.now())).scalar()
+        db.close()
+        since = now + timedelta(minutes=5)
+
+        for value in (since.isoformat(), since.isoformat() + "+00:00"):
+            response = client.get("/api/export/assessments", params={"since": value})
+
+            assert datetime.fromisoformat(response.headers["X-Export-Watermark"]) == since
+            assert response.text == ""
+
+    def test_watermark_lag_is_configurable(self, session_factory, monkeypatch):
+        db = session_factory()
+        monkeypatch.setenv("EXPORT_WATERMARK_LAG_SECONDS", "0")
+        now = export_watermark(db)
+        monkeypatch.setenv("EXPORT_WATERMARK_LAG_SECONDS", "3600")
+        lagged = export_watermark(db)
+        db.close()
+
+        assert timedelta(minutes=59) <= now - lagged <= timedelta(hours=1)
+
+
+class TestStreamAssessments:
+    """Test the export is streamed batch by batch"""
+
+    def test_one_chunk_per_batch_from_a_server_side_cursor(self, session_factory):
+        options = []
+        event.listen(
+            session_factory.kw["bind"],
+            "before_cursor_execute",
+            lambda conn, cursor, statement, params, context, many: options.append(context.execution_options),
+        )
+
+        chunks = list(stream_assessments(session_factory, "ndjson", None, START + timedelta(days=1), batch_size=2))
+
+        assert [chunk.count("\n") for chunk in chunks] == [2, 2, 1]
+        assert options[-1].get("stream_results") is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
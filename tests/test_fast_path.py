@@ -0,0 +1,294 @@
+"""
+Parity tests for the NumPy fast path over the data/raw datasets
+"""
+
+import subprocess
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents import diabetes_agent, heart_agent, kidney_agent, liver_agent, stroke_agent
+from src.agents.heart_encoder import encode_heart_features
+from src.agents.liver_adapter import adapt_liver_features
+from src.agents.stroke_adapter import adapt_stroke_features
+from src.models.fast_path import FastScorer
+from src.models.model_loader import PROJECT_ROOT, get_model_registry
+
+
+def read_csv(name):
+    path = PROJECT_ROOT / "data" / "raw" / name
+    if not path.exists():
+        pytest.skip(f"{name} not available")
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+
+def records(df):
+    """Row dicts with missing values left out, so the adapters apply their defaults."""
+    return [{k: v for k, v in row.items() if not pd.isna(v)} for row in df.to_dict("records")]
+
+
+def heart_patients():
+    df = read_csv("heart.csv")
+    cp = {0: "typical angina", 1: "atypical angina", 2: "non-anginal pain", 3: "asymptomatic"}
+    ecg = {0: "normal", 1: "st-t wave abnormality", 2: "left ventricular hypertrophy"}
+    slope = {0: "upsloping", 1: "flat", 2: "downsloping"}
+    thal = {0: "unknown", 1: "fixed defect", 2: "normal", 3: "reversible defect"}
+    return records(
+        pd.DataFrame(
+            {
+                "age": df["age"],
+                "gender": df["sex"],
+                "blood_pressure": df["trestbps"],
+                "cholesterol": df["chol"],
+                "max_heart_rate": df["thalach"],
+                "st_depression": df["oldpeak"],
+                "num_major_vessels": df["ca"],
+                "chest_pain_type": df["cp"].map(cp),
+                "fasting_blood_sugar": np.where(df["fbs"] == 1, 130, 100),
+                "rest_ecg": df["restecg"].map(ecg),
+                "exercise_induced_angina": df["exang"],
+                "st_slope": df["slope"].map(slope),
+                "thalassemia": df["thal"].map(thal),
+            }
+        )
+    )
+
+
+def kidney_patients():
+    df = read_csv("kidney_disease.csv")
+    text = df.select_dtypes(exclude="number").apply(lambda col: col.str.strip())
+    number = lambda col: pd.to_numeric(df[col], errors="coerce")  # noqa: E731
+    return records(
+        pd.DataFrame(
+            {
+                "age": df["age"],
+                "blood_pressure": df["bp"],
+                "sg": df["sg"],
+                "al": df["al"],
+                "su": df["su"],
+                "rbc": text["rbc"],
+                "pus_cell": text["pc"],
+                "pus_cell_clumps": text["pcc"],
+                "bacteria": text["ba"],
+                "bgr": df["bgr"],
+                "urea": df["bu"],
+                "creatinine": df["sc"],
+                "sodium": df["sod"],
+                "potassium": df["pot"],
+                "hemoglobin": df["hemo"],
+                "pcv": number("pcv"),
+                "wc": number("wc"),
+                "rc": number("rc"),
+                "hypertension": text["htn"],
+                "diabetes": text["dm"],
+                "coronary_artery_disease": text["cad"],
+                "poor_appetite": text["appet"],
+                "edema": text["pe"],
+                "anemia": text["ane"],
+            }
+        )
+    )
+
+
+def liver_patients():
+    df = read_csv("indian_liver_patient.csv")
+    return records(
+        pd.DataFrame(
+            {
+                "age": df["Age"],
+                "gender": df["Gender"],
+                "bilirubin_total": df["Total_Bilirubin"],
+                "bilirubin_direct": df["Direct_Bilirubin"],
+                "alkaline_phosphatase": df["Alkaline_Phosphotase"],
+                "alt": df["Alamine_Aminotransferase"],
+                "ast": df["Aspartate_Aminotransferase"],
+                "total_protein": df["Total_Protiens"],
+                "albumin": df["Albumin"],
+                "albumin_globulin_ratio": df["Albumin_and_Globulin_Ratio"],
+            }
+        )
+    )
+
+
+def stroke_patients():
+    df = read_csv("healthcare-dataset-stroke-data.csv")
+    return records(
+        pd.DataFrame(
+            {
+                "gender": (df["gender"] == "Male").astype(int),
+                "age": df["age"],
+                "hypertension": df["hypertension"],
+                "heart_disease": df["heart_disease"],
+                "work_type": df["work_type"].astype("category").cat.codes,
+                "blood_glucose": df["avg_glucose_level"],
+                "bmi": pd.to_numeric(df["bmi"], errors="coerce"),
+            }
+        )
+    )
+
+
+def diabetes_patients():
+    df = read_csv("diabetes_prediction_dataset.csv").head(2000)
+    return records(
+        pd.DataFrame(
+            {
+                "gender": (df["gender"] == "Male").astype(int),
+                "age": df["age"],
+                "hypertension": df["hypertension"],
+                "heart_disease": df["heart_disease"],
+                "smoking_history_norm": df["smoking_history"],
+                "bmi": df["bmi"],
+                "hba1c": df["HbA1c_level"],
+                "blood_glucose": df["blood_glucose_level"],
+            }
+        )
+    )
+
+
+# name -> (agent, dataset patients, DataFrame-path probabilities, fast-path rows)
+CASES = {
+    "heart": (
+        heart_agent,
+        heart_patients,
+        lambda model, patients: model.predict_proba(heart_agent._validate(heart_agent._feature_frame(patients)))[:, 1],
+        lambda patients: [encode_heart_features(p) for p in patients],
+    ),
+    "kidney": (
+        kidney_agent,
+        kidney_patients,
+        lambda model, patients: model.predict_proba(kidney_agent._feature_frame(patients))[:, 0],
+        lambda patients: [kidney_agent._kidney_row(p) for p in patients],
+    ),
+    "liver": (
+        liver_agent,
+        liver_patients,
+        lambda model, patients: model.predict_proba(liver_agent._feature_frame(patients))[:, 0],
+        lambda patients: [adapt_liver_features(p) for p in patients],
+    ),
+    "stroke": (
+        stroke_agent,
+        stroke_patients,
+        lambda model, patients: model.predict_proba(stroke_agent._feature_frame(patients))[:, 1],
+        lambda patients: [adapt_stroke_features(p) for p in patients],
+    ),
+}
+
+
+def require_model(name):
+    if not get_model_registry().is_available(name):
+        pytest.skip(f"{name} model not available")
+    return get_model_registry().get(name)
+
+
+class TestFastPathParity:
+    """The fast path returns bit-identical probabilities on every dataset row"""
+
+    @pytest.mark.parametrize("name", sorted(CASES))
+    def test_batch_probabilities_identical(self, name):
+        agent, patients_fn, reference_fn, rows_fn = CASES[name]
+        model = require_model(name)
+        patients = patients_fn()
+
+        expected = reference_fn(model, patients)
+        actual = agent.get_fast_scorer().predict_proba(rows_fn(patients))
+
+        assert np.array_equal(actual, expected)
+
+    @pytest.mark.parametrize("name", sorted(CASES))
+    def test_single_row_probabilities_identical(self, name):
+        agent, patients_fn, reference_fn, rows_fn = CASES[name]
+        model = require_model(name)
+        patients = patients_fn()[:25]
+
+        expected = np.concatenate([reference_fn(model, [p]) for p in patients])
+        # One row at a time reuses the scorer's row buffer
+        actual = np.concatenate([agent.get_fast_scorer().predict_proba(rows_fn([p])) for p in patients])
+
+        assert np.array_equal(actual, expected)
+
+    @pytest.mark.parametrize(
+        "name, batch_fn",
+        [
+            ("heart", lambda p: heart_agent.heart_risk_batch(p)),
+            ("kidney", lambda p: kidney_agent.kidney_risk_batch(p)),
+            ("liver", lambda p: liver_agent.liver_risk_batch(p)),
+            ("stroke", lambda p: stroke_agent.stroke_risk_batch(p)),
+            ("diabetes", lambda p: diabetes_agent.diabetes_risk_batch(p)),
+        ],
+    )
+    def test_agent_results_identical(self, name, batch_fn, monkeypatch):
+        require_model(name)
+        patients = {**CASES, "diabetes": (None, diabetes_patients)}[name][1]()
+
+        monkeypatch.setenv("INFERENCE_FAST_PATH", "0")
+        expected = batch_fn(patients)
+        monkeypatch.setenv("INFERENCE_FAST_PATH", "1")
+
+        assert batch_fn(patients) == expected
+
+
+class TestFastPathValidation:
+    """Test the vectorized range checks"""
+
+    def test_out_of_range_matches_pandera_message(self, monkeypatch):
+        require_model("heart")
+        patient = {"age": 200, "max_heart_rate": 150}
+
+        monkeypatch.setenv("INFERENCE_FAST_PATH", "0")
+        with pytest.raises(ValueError) as pandera_error:
+            heart_agent.heart_risk(patient)
+        monkeypatch.setenv("INFERENCE_FAST_PATH", "1")
+        with pytest.raises(ValueError) as fast_error:
+            heart_agent.heart_risk(patient)
+
+        assert str(fast_error.value) == str(pandera_error.value)
+
+    def test_reports_every_failure(self):
+        model = require_model("heart")
+        scorer = FastScorer(model, model.feature_names_in_, ranges=heart_agent.INPUT_RANGES)
+        rows = [encode_heart_features({"age": 50}), encode_heart_features({"age": 50, "cholesterol": 900})]
+        rows[0]["st_depression"] = -1
+
+        with pytest.raises(ValueError) as error:
+            scorer.predict_proba(rows)
+
+        assert "'column': 'st_depression'" in str(error.value)
+        assert "'failure_case': 900.0" in str(error.value)
+
+    def test_missing_values_pass(self):
+        model = require_model("heart")
+        scorer = FastScorer(model, model.feature_names_in_, ranges=heart_agent.INPUT_RANGES)
+        row = encode_heart_features({})
+        row["cholesterol"] = float("nan")
+
+        scorer.validate(scorer.fill([row]))
+
+
+class TestFastPathWarnings:
+    """Test the feature-name warning is only silenced inside FastScorer"""
+
+    def test_scorer_does_not_warn(self):
+        model = require_model("heart")
+        scorer = FastScorer(model, model.feature_names_in_)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            scorer.predict_proba([encode_heart_features({"age": 50})])
+
+    def test_import_installs_no_process_wide_filter(self):
+        # Feature mismatches on the DataFrame path must still be reported.
+        # A fresh interpreter, since pytest resets the filters around each test.
+        code = (
+            "import warnings, src.models.fast_path; "
+            "print(any(f[1] is not None and 'valid feature names' in f[1].pattern for f in warnings.filters))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=PROJECT_ROOT)
+
+        assert result.stdout.strip() == "False", result.stderr
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,154 @@
+"""
+Unit tests for keyset pagination and filters on the patient and consultation lists
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend import models
+from backend.database import Base, get_db
+from backend.main import app
+
+START = datetime(2026, 3, 1, 8, 0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+
+    for i in range(7):
+        # Patients 5 and 6 share a timestamp: the id breaks the tie
+        created = START + timedelta(days=min(i, 5))
+        db.add(models.Patient(id=f"p{i}", name=f"Patient {i}", age=40 + i, gender="Female", created_at=created))
+        db.add(
+            models.Consultation(
+                id=f"c{i}",
+                patient_id=f"p{i}",
+                role="Doctor" if i % 2 else "Patient",
+                stage="report" if i < 4 else "intro",
+                started_at=created,
+            )
+        )
+        if i < 4:
+            db.add(
+                models.HealthAssessment(
+                    id=f"a{i}",
+                    consultation_id=f"c{i}",
+                    overall_risk_score=25.0 * i,
+                    overall_risk_level="High" if i >= 2 else "Low",
+                    individual_risks=[],
+                )
+            )
+    db.commit()
+
+    app.dependency_overrides[get_db] = lambda: db
+    yield db
+    app.dependency_overrides.pop(get_db, None)
+    db.close()
+    engine.dispose()
+
+
+client = TestClient(app)
+
+
+def all_pages(url, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids += [row["id"] for row in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids, pages
+
+
+class TestPatientList:
+    """Test GET /api/patients"""
+
+    def test_pages_cover_every_patient_in_order(self, session):
+        ids, pages = all_pages("/api/patients", limit=3)
+
+        assert ids == [f"p{i}" for i in range(7)]
+        assert pages == 3
+
+    def test_filters_and_total(self, session):
+        response = client.get(
+            "/api/patients",
+            params={"since": (START + timedelta(days=1)).isoformat(), "risk_level": "High", "include_total": True},
+        )
+
+        assert [row["id"] for row in response.json()] == ["p2", "p3"]
+        assert response.headers["X-Total-Count"] == "2"
+
+    def test_total_is_opt_in(self, session):
+        statements = []
+        event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        response = client.get("/api/patients", params={"limit": 2})
+
+        assert "X-Total-Count" not in response.headers
+        assert len(statements) == 1
+
+    def test_invalid_cursor(self, session):
+        assert client.get("/api/patients", params={"cursor": "%%%"}).status_code == 400
+
+    def test_skip_still_pages_but_is_deprecated(self, session):
+        response = client.get("/api/patients", params={"skip": 2, "limit": 3})
+
+        assert [row["id"] for row in response.json()] == ["p2", "p3", "p4"]
+        assert response.headers["Deprecation"] == "true"
+        # The next page continues by cursor
+        next_page = client.get("/api/patients", params={"cursor": response.headers["X-Next-Cursor"], "limit": 3})
+        assert [row["id"] for row in next_page.json()] == ["p5", "p6"]
+        assert "Deprecation" not in next_page.headers
+
+    def test_skip_and_cursor_are_exclusive(self, session):
+        cursor = client.get("/api/patients", params={"limit": 1}).headers["X-Next-Cursor"]
+
+        assert client.get("/api/patients", params={"skip": 1, "cursor": cursor}).status_code == 400
+
+    def test_browser_clients_can_read_the_paging_headers(self, session):
+        response = client.get("/api/patients", params={"limit": 1}, headers={"Origin": "https://app.example"})
+
+        exposed = {h.strip().lower() for h in response.headers["Access-Control-Expose-Headers"].split(",")}
+        assert {"x-next-cursor", "x-total-count", "deprecation", "x-export-watermark"} <= exposed
+
+
+class TestConsultationList:
+    """Test GET /api/consultations"""
+
+    def test_pages_cover_every_consultation_in_order(self, session):
+        ids, _ = all_pages("/api/consultations", limit=2)
+
+        assert ids == [f"c{i}" for i in range(7)]
+
+    def test_skip_is_still_accepted(self, session):
+        response = client.get("/api/consultations", params={"skip": 5})
+
+        assert [row["id"] for row in response.json()] == ["c5", "c6"]
+        assert response.headers["Deprecation"] == "true"
+
+    def test_stage_role_and_risk_filters(self, session):
+        by_stage = client.get("/api/consultations", params={"stage": "intro", "role": "Doctor"}).json()
+        by_risk = client.get("/api/consultations", params={"risk_level": "Low", "include_total": True})
+
+        assert [row["id"] for row in by_stage] == ["c5"]
+        assert [row["id"] for row in by_risk.json()] == ["c0", "c1"]
+        assert by_risk.headers["X-Total-Count"] == "2"
+
+    def test_date_range(self, session):
+        params = {"since": START.isoformat(), "until": (START + timedelta(days=2)).isoformat()}
+
+        assert [row["id"] for row in client.get("/api/consultations", params=params).json()] == ["c0", "c1"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
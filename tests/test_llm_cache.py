@@ -0,0 +1,197 @@
+"""
+Unit tests for the LLM response cache
+"""
+
+import asyncio
+import os
+import stat
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.circuit_breaker import ModelRouter
+from src.core.llm_cache import InMemoryLLMCache, LLMCache, SQLiteLLMCache
+from src.core.llm_client import GeminiClient
+
+
+class FakeCompletions:
+    """Stands in for groq's chat.completions; fails for models in `failing`"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def create(self, model, messages, **kwargs):
+        self.calls.append(model)
+        if model in self.failing:
+            raise RuntimeError(f"{model} unavailable")
+        message = SimpleNamespace(content=f"answer from {model}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_client(monkeypatch, cache, failing=()):
+    monkeypatch.setenv("GROQ_API_KEY", "test_key")
+    llm = GeminiClient(cache=cache, router=ModelRouter())
+    completions = FakeCompletions(failing)
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return llm, completions
+
+
+class TestCacheKeys:
+    """Test content-addressed keys"""
+
+    def test_key_depends_on_every_part(self):
+        base = LLMCache.make_key("model", "system", "prompt")
+
+        assert base == LLMCache.make_key("model", "system", "prompt")
+        assert base != LLMCache.make_key("other", "system", "prompt")
+        assert base != LLMCache.make_key("model", "other", "prompt")
+        assert base != LLMCache.make_key("model", "system", "other")
+        assert LLMCache.make_key("ab", "c", "") != LLMCache.make_key("a", "bc", "")
+
+    def test_incomplete_backend_cannot_be_instantiated(self):
+        class NoStorage(LLMCache):
+            def _get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            NoStorage()
+
+
+class TestInMemoryCache:
+    """Test LRU eviction, TTL and counters"""
+
+    def test_lru_eviction(self):
+        cache = InMemoryLLMCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")  # "a" becomes most recently used
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self):
+        cache = InMemoryLLMCache(ttl_seconds=0.05)
+        cache.set("a", "1")
+        time.sleep(0.1)
+
+        assert cache.get("a") is None
+
+    def test_hit_miss_counters(self):
+        cache = InMemoryLLMCache()
+        cache.set("a", "1")
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+class TestSQLiteCache:
+    """Test on-disk backend"""
+
+    def test_persists_across_instances_and_evicts(self, tmp_path):
+        path = str(tmp_path / "llm_cache.sqlite3")
+        cache = SQLiteLLMCache(path, max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.set("c", "3")
+
+        reopened = SQLiteLLMCache(path, max_entries=2)
+        assert len(reopened) == 2
+        assert reopened.get("a") is None
+        assert reopened.get("c") == "3"
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_cache_file_is_owner_only(self, tmp_path):
+        # Prompts and replies contain PHI
+        path = tmp_path / "llm_cache.sqlite3"
+        path.touch(mode=0o644)
+        path.chmod(0o644)
+        SQLiteLLMCache(str(path)).set("a", "1")
+
+        for name in (path, tmp_path / "llm_cache.sqlite3-wal"):
+            assert stat.S_IMODE(os.stat(name).st_mode) == 0o600
+
+
+class TestGeminiClientCaching:
+    """Test generate() serves repeat prompts from the cache"""
+
+    def test_repeat_prompt_skips_network(self, monkeypatch):
+        cache = InMemoryLLMCache()
+        llm, completions = make_client(monkeypatch, cache)
+
+        first = llm.generate("Summarize: chest pain for 3 days")
+        second = llm.generate("Summarize: chest pain for 3 days")
+
+        assert first == second == "answer from llama-3.3-70b-versatile"
+        assert len(completions.calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_fallback_response_is_not_cached(self, monkeypatch):
+        cache = InMemoryLLMCache()
+        llm, completions = make_client(monkeypatch, cache)
+        completions.failing = set(llm.models)
+
+        assert llm.generate("prompt") == llm._fallback_response()
+        assert len(cache) == 0
+
+    def test_none_uses_the_default_cache(self, monkeypatch):
+        default = InMemoryLLMCache()
+        monkeypatch.setattr("src.core.llm_client.get_default_cache", lambda: default)
+
+        llm, _ = make_client(monkeypatch, None)
+
+        assert llm.cache is default
+
+    def test_false_disables_caching(self, monkeypatch):
+        monkeypatch.setattr("src.core.llm_client.get_default_cache", InMemoryLLMCache)
+        llm, completions = make_client(monkeypatch, False)
+
+        llm.generate("prompt")
+        llm.generate("prompt")
+
+        assert llm.cache is None
+        assert len(completions.calls) == 2
+
+    def test_async_cache_io_runs_off_the_event_loop(self, monkeypatch):
+        class RecordingCache(InMemoryLLMCache):
+            def __init__(self):
+                super().__init__()
+                self.threads = []
+
+            def _get(self, key):
+                self.threads.append(threading.get_ident())
+                return super()._get(key)
+
+            def _set(self, key, value):
+                self.threads.append(threading.get_ident())
+                super()._set(key, value)
+
+        cache = RecordingCache()
+        llm, completions = make_client(monkeypatch, cache)
+
+        async def create(**kwargs):
+            return completions.create(**kwargs)
+
+        llm.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        async def run():
+            loop_thread = threading.get_ident()
+            await llm.agenerate("prompt")
+            await llm.agenerate("prompt")
+            return loop_thread
+
+        loop_thread = asyncio.run(run())
+
+        assert len(completions.calls) == 1
+        assert cache.threads and loop_thread not in cache.threads
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
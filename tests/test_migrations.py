@@ -0,0 +1,207 @@
+"""
+Unit tests for the versioned schema migrations
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+
+from backend import models  # noqa: F401  (registers the tables on Base.metadata)
+from backend.database import Base
+from backend.migrations import (
+    MigrationContext,
+    applied_versions,
+    ensure_schema,
+    load_migrations,
+    pending_migrations,
+    upgrade,
+)
+from backend.migrations.versions.v0003_lookup_indexes import INDEXES
+from backend.migrations.versions.v0005_patient_risk_timeseries import backfill
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+class TestUpgrade:
+    """Test applying migrations"""
+
+    def test_versions_are_ordered_and_unique(self):
+        versions = [migration.version for migration in load_migrations()]
+
+        assert versions == sorted(set(versions))
+        assert versions[0] == 1
+
+    def test_new_database(self, engine):
+        applied = upgrade(engine)
+
+        assert applied == [migration.name for migration in load_migrations()]
+        assert applied_versions(engine) == {migration.version for migration in load_migrations()}
+        assert {name for name, _, _ in INDEXES if name.startswith("ix_medical")} <= index_names(
+            engine, "medical_records"
+        )
+        assert upgrade(engine) == []
+
+    def test_upgrade_to_target(self, engine):
+        assert upgrade(engine, target=1) == ["v0001_initial_schema"]
+        assert [m.version for m in pending_migrations(engine)][0] == 2
+
+    def test_initial_schema_is_frozen(self, engine):
+        # v0001 does not pick up what later migrations (or the models) add
+        upgrade(engine, target=1)
+
+        columns = {column["name"] for column in inspect(engine).get_columns("patients")}
+        assert "name" not in columns
+        assert "medical_record_number" not in columns
+        assert not {name for name, _, _ in INDEXES} & index_names(engine, "consultations")
+        assert not inspect(engine).has_table("patient_risk_timeseries")
+
+    def test_migrated_schema_matches_the_models(self, engine):
+        upgrade(engine)
+
+        for table in Base.metadata.sorted_tables:
+            columns = {column["name"] for column in inspect(engine).get_columns(table.name)}
+            assert columns == set(table.columns.keys()), table.name
+            assert {index.name for index in table.indexes} <= index_names(engine, table.name)
+
+    def test_legacy_database_is_adopted(self, engine):
+        # Patients table from before the name / medical_record_number columns
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE patients "
+                    "(id VARCHAR PRIMARY KEY, age INTEGER, gender VARCHAR(10), created_at DATETIME)"
+                )
+            )
+            for i in range(5):
+                conn.execute(
+                    text("INSERT INTO patients (id, age, gender) VALUES (:id, 40, 'Male')"), {"id": f"abcdefgh{i}"}
+                )
+
+        upgrade(engine)
+
+        with engine.connect() as conn:
+            names = conn.execute(text("SELECT name FROM patients")).scalars().all()
+        assert names == ["Patient-abcdefgh"] * 5
+        assert "uq_patients_medical_record_number" in index_names(engine, "patients")
+        assert inspect(engine).has_table("health_assessments")
+
+
+class TestRiskTimeseriesBackfill:
+    """Test v0005 fills patient_risk_timeseries from existing assessments"""
+
+    def seed(self, engine, assessments):
+        upgrade(engine, target=4)
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO patients (id, name, age, gender) VALUES ('p1', 'Backfill', 50, 'Male')"))
+            conn.execute(text("INSERT INTO consultations (id, patient_id, role) VALUES ('c1', 'p1', 'Doctor')"))
+            for i in range(assessments):
+                conn.execute(
+                    text(
+                        "INSERT INTO health_assessments"
+                        " (id, consultation_id, overall_risk_score, overall_risk_level, individual_risks, assessed_at)"
+                        " VALUES (:id, 'c1', 50, 'Moderate', :risks, '2026-01-01 09:00:00')"
+                    ),
+                    {
+                        "id": f"a{i}",
+                        "risks": '[{"disease": "Heart Disease", "risk_score": 61.5, "risk_level": "High"},'
+                        ' {"disease": "Stroke", "risk_score": 12}]',
+                    },
+                )
+
+    def timeseries(self, engine):
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT assessment_id, patient_id, disease, score, level FROM patient_risk_timeseries")
+            ).all()
+
+    def test_upgrade_backfills_existing_assessments(self, engine):
+        self.seed(engine, 3)
+
+        assert upgrade(engine) == ["v0005_patient_risk_timeseries"]
+
+        rows = self.timeseries(engine)
+        assert len(rows) == 6
+        assert ("a0", "p1", "Heart Disease", 61.5, "High") in rows
+        assert ("a0", "p1", "Stroke", 12.0, None) in rows
+
+    def test_backfill_resumes_in_batches(self, engine):
+        self.seed(engine, 5)
+        upgrade(engine)
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM patient_risk_timeseries WHERE assessment_id IN ('a1', 'a3', 'a4')"))
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            assert backfill(conn, batch_size=2) == 3
+
+        assert sum(statement.startswith("INSERT") for statement in statements) == 2
+        assert len(self.timeseries(engine)) == 10
+
+
+class TestMigrationContext:
+    """Test the re-runnable DDL helpers"""
+
+    def test_backfill_in_batches(self, engine):
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, flag INTEGER)"))
+            conn.execute(text("INSERT INTO items (id) VALUES (1), (2), (3), (4), (5)"))
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            updated = MigrationContext(conn, transactional=False).backfill(
+                "items", "flag = 1", "flag IS NULL", batch_size=2
+            )
+
+        assert updated == 5
+        assert sum(statement.startswith("UPDATE") for statement in statements) == 3
+
+    def test_helpers_are_idempotent(self, engine):
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+            ctx = MigrationContext(conn)
+
+            assert ctx.add_column("items", "label", "VARCHAR(20)") is True
+            assert ctx.add_column("items", "label", "VARCHAR(20)") is False
+            ctx.create_index("ix_items_label", "items", ["label"])
+            ctx.create_index("ix_items_label", "items", ["label"])
+
+        assert "ix_items_label" in index_names(engine, "items")
+
+
+class TestEnsureSchema:
+    """Test the startup schema check"""
+
+    def test_refuses_to_start_behind_by_default(self, engine, monkeypatch):
+        monkeypatch.delenv("DB_AUTO_MIGRATE", raising=False)
+
+        with pytest.raises(RuntimeError, match="python -m backend.migrations upgrade"):
+            ensure_schema(engine)
+        assert applied_versions(engine) == set()
+
+    def test_auto_migrate_is_opt_in(self, engine, monkeypatch):
+        monkeypatch.setenv("DB_AUTO_MIGRATE", "1")
+
+        assert ensure_schema(engine) == [migration.name for migration in load_migrations()]
+
+    def test_up_to_date_check_reads_only_the_version_table(self, engine):
+        upgrade(engine)
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        assert ensure_schema(engine) == []
+        assert len(statements) <= 2
+        assert all("schema_migrations" in statement for statement in statements)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
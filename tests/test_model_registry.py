@@ -0,0 +1,74 @@
+"""
+Unit tests for the lazy model registry
+"""
+
+import shutil
+
+import numpy as np
+import pytest
+
+from src.coordinator.executor import run_selected_agents
+from src.models import model_loader
+from src.models.model_loader import LOADED, MISSING, NOT_LOADED, ModelRegistry, ModelUnavailableError
+
+STROKE_PATH = "models/strokePrediction/strokeprediction.pkl"
+
+
+class TestModelRegistry:
+    """Test lazy loading and health status"""
+
+    def test_models_load_on_first_use(self):
+        registry = ModelRegistry({"stroke": STROKE_PATH})
+        assert registry.status()["stroke"]["status"] == NOT_LOADED
+
+        model = registry.get("stroke")
+
+        assert registry.get("stroke") is model
+        assert registry.status()["stroke"]["status"] == LOADED
+
+    def test_missing_model_is_reported_not_raised_at_import(self):
+        registry = ModelRegistry({"liver": "models/does_not_exist.pkl"})
+
+        with pytest.raises(ModelUnavailableError):
+            registry.get("liver")
+        assert not registry.is_available("liver")
+        assert registry.status()["liver"]["status"] == MISSING
+
+    def test_preload_skips_unavailable_models(self):
+        registry = ModelRegistry({"stroke": STROKE_PATH, "liver": "models/does_not_exist.pkl"})
+
+        assert registry.preload() == ["stroke"]
+
+    def test_memory_mapped_model_matches_pickle(self, tmp_path):
+        source = tmp_path / "stroke.pkl"
+        shutil.copy(model_loader.PROJECT_ROOT / STROKE_PATH, source)
+
+        mapped = ModelRegistry({"stroke": str(source)}, mmap_dir=str(tmp_path / "mmap")).get("stroke")
+        plain = ModelRegistry({"stroke": str(source)}).get("stroke")
+
+        X = np.random.default_rng(0).random((8, plain.n_features_in_))
+        assert (tmp_path / "mmap" / "stroke.joblib").exists()
+        assert np.array_equal(mapped.predict_proba(X), plain.predict_proba(X))
+
+
+class TestGracefulDegradation:
+    """Test the executor skips agents whose model is unavailable"""
+
+    def test_missing_model_skips_agent(self, monkeypatch, make_patient):
+        paths = dict(model_loader.MODEL_PATHS, liver="models/does_not_exist.pkl")
+        monkeypatch.setattr(model_loader, "_registry", ModelRegistry(paths))
+
+        # Abnormal liver enzymes route the liver agent alongside the others
+        report = run_selected_agents(
+            make_patient(age=58, gender=1, bmi=31.5, blood_pressure=150, blood_glucose=210, hba1c=7.8,
+                         cholesterol=240, creatinine=2.1, urea=55, bilirubin_total=3.0, alt=85, ast=90,
+                         hypertension=1, diabetes=1, chest_pain=True)
+        )  # fmt: skip
+
+        diseases = [risk["disease"] for risk in report["individual_risks"]]
+        assert "Liver Disease" not in diseases
+        assert "Heart Disease" in diseases
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
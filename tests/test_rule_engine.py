@@ -0,0 +1,90 @@
+"""
+Unit tests for scalar and vectorized agent routing
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.coordinator.patient_state import PatientState
+from src.coordinator.rule_engine import route_agents, route_agents_frame
+from src.core.clinical_rules import ClinicalRules, get_rules
+
+
+def random_frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "age": rng.integers(20, 90, n).astype(float),
+            "blood_glucose": rng.integers(70, 250, n).astype(float),
+            "hba1c": rng.normal(6.3, 1, n).round(1),
+            "creatinine": rng.normal(1.2, 0.4, n).round(2),
+            "urea": rng.integers(10, 80, n).astype(float),
+            "bilirubin_total": rng.normal(1.0, 0.4, n).round(1),
+            "alt": rng.integers(10, 100, n).astype(float),
+            "ast": rng.integers(10, 100, n).astype(float),
+            "hypertension": rng.choice([0, 1, None], n),
+            "diabetes": rng.choice([True, False, None], n),
+            "heart_disease": rng.integers(0, 2, n),
+            "chest_pain": rng.choice([True, False], n),
+            "breathlessness": rng.choice([True, False], n),
+            "edema": rng.choice([True, False], n),
+        }
+    )
+    # Knock out ~20% of the measurements
+    for column in ["age", "blood_glucose", "hba1c", "creatinine", "urea", "bilirubin_total", "alt", "ast"]:
+        df.loc[rng.random(n) < 0.2, column] = np.nan
+    return df
+
+
+class TestRouteAgents:
+    """Test the scalar router"""
+
+    def test_thresholds(self, make_patient):
+        assert route_agents(make_patient(age=41)) == ["heart"]
+        assert route_agents(make_patient(age=40)) == []
+        assert route_agents(make_patient(age=60, hba1c=7)) == ["heart", "diabetes", "stroke"]
+        assert route_agents(make_patient(alt=56)) == ["liver"]
+
+    def test_missing_values_do_not_route(self):
+        assert route_agents(PatientState()) == []
+
+
+class TestRouteAgentsFrame:
+    """The vectorized router agrees with the scalar one row by row"""
+
+    def test_matches_scalar_router(self, make_patient):
+        df = random_frame()
+
+        masks = route_agents_frame(df)
+
+        for row, record in enumerate(df.to_dict("records")):
+            patient = make_patient(
+                **{k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in record.items()}
+            )
+            expected = route_agents(patient)
+            assert [agent for agent in get_rules().routing if masks[agent][row]] == expected
+
+    def test_masks_are_boolean_arrays(self):
+        masks = route_agents_frame(random_frame(50))
+
+        assert set(masks) == set(get_rules().routing)
+        assert all(mask.dtype == bool and mask.shape == (50,) for mask in masks.values())
+
+    def test_missing_columns_never_route(self):
+        masks = route_agents_frame(pd.DataFrame({"alt": [80, 20]}))
+
+        assert masks["liver"].tolist() == [True, False]
+        assert not masks["heart"].any()
+
+    def test_rules_are_shared(self, make_patient):
+        spec = dict(get_rules().spec)
+        spec["routing"] = {"liver": [{"field": "alt", "op": ">", "value": 90}]}
+        rules = ClinicalRules(spec)
+
+        assert rules.route(make_patient(alt=80)) == []
+        assert rules.route_frame(pd.DataFrame({"alt": [80, 95]}))["liver"].tolist() == [False, True]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,43 @@
+"""
+Unit tests for the startup profiler and the deferred heavy imports
+"""
+
+import pytest
+
+from backend.startup_profile import DEFAULT_FORBIDDEN, parse_importtime, profile_imports, summarize
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     numpy.core
+import time:       300 |        420 |   numpy
+import time:        50 |        470 | backend.main
+"""
+
+
+class TestParseImporttime:
+    """Test parsing of -X importtime output"""
+
+    def test_rows_and_depth(self):
+        timings = parse_importtime(SAMPLE)
+
+        assert [(t.module, t.depth) for t in timings] == [("numpy.core", 2), ("numpy", 1), ("backend.main", 0)]
+        assert timings[1].self_us == 300
+        assert timings[1].cumulative_us == 420
+
+    def test_summary_total_and_packages(self):
+        summary = summarize(parse_importtime(SAMPLE), "backend.main")
+
+        assert summary["total_seconds"] == pytest.approx(0.00047)
+        assert summary["packages"][0] == ("numpy", 420)
+
+
+class TestStartupImports:
+    """Importing the app must not pull in the SHAP / plotting / PDF stack"""
+
+    def test_heavy_libraries_are_deferred(self):
+        loaded = summarize(profile_imports("backend.main"), "backend.main")["loaded_modules"]
+
+        assert not [package for package in DEFAULT_FORBIDDEN if package in loaded]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
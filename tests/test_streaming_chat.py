@@ -0,0 +1,161 @@
+"""
+Unit tests for streaming Kira chat (token streaming, safety filter, SSE endpoint)
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routers import chat
+from src.agents.doctor_agent import StreamSanitizer, sanitize
+from src.agents.kira_agent import KIRA_FORBIDDEN_TERMS
+from src.core.circuit_breaker import ModelRouter
+from src.core.llm_cache import InMemoryLLMCache
+from src.core.llm_client import GeminiClient
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    def __init__(self, tokens, fail_after=None):
+        self.tokens = tokens
+        self.fail_after = fail_after
+
+    async def __aiter__(self):
+        for i, token in enumerate(self.tokens):
+            if i == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield chunk(token)
+
+
+class FakeAsyncCompletions:
+    """Stands in for AsyncGroq chat.completions with stream=True"""
+
+    def __init__(self, streams):
+        self.streams = streams
+        self.calls = []
+
+    async def create(self, model, messages, stream=False, **kwargs):
+        self.calls.append(model)
+        result = self.streams.get(model)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def make_client(monkeypatch, streams, cache=False):
+    monkeypatch.setenv("GROQ_API_KEY", "test_key")
+    llm = GeminiClient(cache=cache, router=ModelRouter())
+    completions = FakeAsyncCompletions(streams)
+    llm.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return llm, completions
+
+
+async def collect(aiter):
+    return [item async for item in aiter]
+
+
+class TestStreamSanitizer:
+    """Test the incremental safety filter"""
+
+    def test_term_split_across_chunks_is_redacted(self):
+        sanitizer = StreamSanitizer(KIRA_FORBIDDEN_TERMS)
+        chunks = ["She like", "ly h", "as the flu, but"]
+
+        text = "".join(sanitizer.feed(c) for c in chunks) + sanitizer.flush()
+
+        assert text == sanitize("".join(chunks), KIRA_FORBIDDEN_TERMS)
+        assert text == "She [REDACTED] the flu, but"
+
+    def test_terms_match_regardless_of_case(self):
+        sanitizer = StreamSanitizer(KIRA_FORBIDDEN_TERMS)
+        chunks = ["LIKELY ", "HAS a cold. Likely", " Has"]
+
+        text = "".join(sanitizer.feed(c) for c in chunks) + sanitizer.flush()
+
+        assert text == "[REDACTED] a cold. [REDACTED]"
+        assert sanitize("Prescribe rest.") == "[REDACTED] rest."
+
+    def test_plain_text_passes_through_unchanged(self):
+        sanitizer = StreamSanitizer(KIRA_FORBIDDEN_TERMS)
+        chunks = ["Drink ", "plenty of ", "water."]
+
+        text = "".join(sanitizer.feed(c) for c in chunks) + sanitizer.flush()
+
+        assert text == "Drink plenty of water."
+
+
+class TestGeminiClientStreaming:
+    """Test astream() fallback and caching"""
+
+    def test_streams_tokens_and_caches_full_reply(self, monkeypatch):
+        cache = InMemoryLLMCache()
+        llm, completions = make_client(
+            monkeypatch, {"llama-3.3-70b-versatile": FakeStream([" Hello", ", ", "world"])}, cache=cache
+        )
+
+        tokens = asyncio.run(collect(llm.astream("hi")))
+        assert tokens == ["Hello", ", ", "world"]
+
+        assert asyncio.run(collect(llm.astream("hi"))) == ["Hello, world"]
+        assert len(completions.calls) == 1
+
+    def test_failure_before_first_token_falls_through(self, monkeypatch):
+        llm, completions = make_client(
+            monkeypatch,
+            {
+                "llama-3.3-70b-versatile": RuntimeError("model unavailable"),
+                "llama-3.1-70b-versatile": FakeStream(["from ", "backup"]),
+            },
+        )
+
+        tokens = asyncio.run(collect(llm.astream("hi")))
+
+        assert "".join(tokens) == "from backup"
+        assert completions.calls == ["llama-3.3-70b-versatile", "llama-3.1-70b-versatile"]
+
+    def test_failure_mid_stream_does_not_splice_answers(self, monkeypatch):
+        llm, completions = make_client(
+            monkeypatch,
+            {
+                "llama-3.3-70b-versatile": FakeStream(["partial ", "answer"], fail_after=1),
+                "llama-3.1-70b-versatile": FakeStream(["other answer"]),
+            },
+        )
+
+        tokens = asyncio.run(collect(llm.astream("hi")))
+
+        assert tokens == ["partial "]
+        assert completions.calls == ["llama-3.3-70b-versatile"]
+
+
+class TestStreamEndpoint:
+    """Test POST /api/chat/stream"""
+
+    def test_sse_events(self, monkeypatch):
+        async def fake_stream(message, history):
+            for token in ["Stay ", "hydrated."]:
+                yield token
+
+        monkeypatch.setattr(chat.agent, "astream_chat", fake_stream)
+        app = FastAPI()
+        app.include_router(chat.router)
+
+        response = TestClient(app).post("/api/chat/stream", json={"message": "hi", "history": []})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [e for e in response.text.split("\n\n") if e]
+        tokens = [json.loads(e[len("data: ") :])["token"] for e in events if e.startswith("data: ")]
+        assert tokens == ["Stay ", "hydrated."]
+        assert events[-1].startswith("event: done")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,82 @@
+"""
+Unit tests for the dependency-aware async task graph
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.task_graph import TaskGraph
+
+
+async def after(delay, value):
+    await asyncio.sleep(delay)
+    return value
+
+
+class TestTaskGraph:
+    """Test TaskGraph scheduling"""
+
+    def test_dependencies_receive_results(self):
+        graph = TaskGraph()
+        graph.add("summary", lambda: after(0, "summary"))
+        graph.add("soap", lambda summary: after(0, f"soap({summary})"), deps=["summary"])
+
+        results = asyncio.run(graph.run())
+
+        assert results == {"summary": "summary", "soap": "soap(summary)"}
+
+    def test_latency_is_longest_chain_not_sum(self):
+        # reports (0.3) runs alongside summary (0.2) -> soap (0.2): longest chain is 0.4s, sum is 0.7s
+        graph = TaskGraph()
+        graph.add("reports", lambda: after(0.3, "reports"))
+        graph.add("summary", lambda: after(0.2, "summary"))
+        graph.add("soap", lambda summary: after(0.2, "soap"), deps=["summary"])
+
+        start = time.monotonic()
+        asyncio.run(graph.run())
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.6
+
+    def test_failure_cancels_pending_tasks(self):
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def boom():
+            raise RuntimeError("LLM down")
+
+        graph = TaskGraph()
+        graph.add("slow", slow)
+        graph.add("boom", boom)
+
+        async def scenario():
+            with pytest.raises(RuntimeError):
+                await graph.run()
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+        assert cancelled == [True]
+
+    def test_cycles_and_unknown_dependencies_rejected(self):
+        graph = TaskGraph()
+        graph.add("a", lambda b: after(0, 1), deps=["b"])
+        graph.add("b", lambda a: after(0, 2), deps=["a"])
+        with pytest.raises(ValueError):
+            asyncio.run(graph.run())
+
+        graph = TaskGraph()
+        graph.add("a", lambda missing: after(0, 1), deps=["missing"])
+        with pytest.raises(ValueError):
+            asyncio.run(graph.run())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])